@@ -0,0 +1,166 @@
+"""
+Benchmark for BrightDataCollector.collect_all_trends
+
+Runs the collector against a local stub of the Bright Data request endpoint
+where every source answers with a fixed latency, and compares:
+1. The old blocking path (requests.post inside async def)
+2. The pooled async httpx path
+3. The pooled path with a warm response cache
+4. Deep collection (3 pages x 3 query variants per source)
+
+Also measures how long the event loop stalls while a scan is in flight.
+
+Usage:
+    python bench_collect_trends.py
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from brightdata_integration import BrightDataCollector
+from response_cache import ResponseCache
+
+# Simulated SERP latency per source (seconds), keyed by a marker in the query
+SOURCE_LATENCY = {
+    "producthunt.com": 0.40,
+    "github.com": 0.30,
+    "reddit.com": 0.50,
+    "news.ycombinator.com": 0.20,
+}
+
+
+class StubSerpHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        query = parse_qs(urlparse(body.get("url", "")).query).get("q", [""])[0]
+
+        delay = next((d for marker, d in SOURCE_LATENCY.items() if marker in query), 0.1)
+        time.sleep(delay)
+
+        payload = json.dumps({
+            "organic": [
+                {"title": f"Result {i} {uuid.uuid4().hex}", "link": f"https://example.com/{uuid.uuid4().hex}", "snippet": "stub"}
+                for i in range(10)
+            ]
+        }).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BlockingCollector(BrightDataCollector):
+    """The pre-httpx implementation: a blocking requests.post inside async def"""
+
+    async def _serp_search(self, search_query: str, ttl: float = 3600):
+        from urllib.parse import quote_plus
+        response = requests.post(
+            self.base_url,
+            json={
+                "zone": self.zone,
+                "url": f"https://www.google.com/search?q={quote_plus(search_query)}",
+                "format": "raw"
+            },
+            headers=self.headers,
+            timeout=30
+        )
+        response.raise_for_status()
+        return response.json().get("organic", [])
+
+
+async def measure(collector: BrightDataCollector, rounds: int = 3, expected_items: int = 40):
+    """Return (best wall-clock, worst event-loop stall) over several rounds"""
+    best_wall = float("inf")
+    worst_stall = 0.0
+
+    for _ in range(rounds):
+        stall = 0.0
+        done = False
+
+        async def heartbeat():
+            nonlocal stall
+            while not done:
+                before = time.perf_counter()
+                await asyncio.sleep(0.01)
+                stall = max(stall, time.perf_counter() - before - 0.01)
+
+        ticker = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        items = await collector.collect_all_trends("pets")
+        wall = time.perf_counter() - start
+        done = True
+        await ticker
+
+        assert len(items) == expected_items, f"expected {expected_items} items, got {len(items)}"
+        best_wall = min(best_wall, wall)
+        worst_stall = max(worst_stall, stall)
+
+    await collector.aclose()
+    return best_wall, worst_stall
+
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSerpHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/request"
+
+    total = sum(SOURCE_LATENCY.values())
+    slowest = max(SOURCE_LATENCY.values())
+
+    print("=" * 60)
+    print("collect_all_trends benchmark (local stub server)")
+    print("=" * 60)
+    print(f"Sum of source latencies: {total:.2f}s")
+    print(f"Slowest source:          {slowest:.2f}s\n")
+
+    blocking_wall, blocking_stall = await measure(
+        BlockingCollector(api_token="bench", base_url=base_url, use_cache=False, track_seen=False)
+    )
+    pooled_wall, pooled_stall = await measure(
+        BrightDataCollector(api_token="bench", base_url=base_url, use_cache=False, track_seen=False)
+    )
+
+    # Memory-only cache: the first round fills it, the best round is all hits
+    cached = BrightDataCollector(
+        api_token="bench", base_url=base_url,
+        cache=ResponseCache("bench_serp", cache_dir=None), track_seen=False
+    )
+    cached_wall, cached_stall = await measure(cached)
+
+    # 9 searches per source; the rate limit is lifted so only concurrency matters
+    deep = BrightDataCollector(
+        api_token="bench", base_url=base_url, use_cache=False, track_seen=False,
+        pages=3, query_variants=2, max_concurrent_requests=16,
+        max_connections=16, zone_rate_limit=1000, zone_burst=1000
+    )
+    deep_wall, deep_stall = await measure(deep, expected_items=360)
+
+    print(f"{'path':<22}{'wall-clock':>12}{'max loop stall':>18}")
+    print(f"{'blocking requests':<22}{blocking_wall:>11.2f}s{blocking_stall:>17.2f}s")
+    print(f"{'pooled httpx':<22}{pooled_wall:>11.2f}s{pooled_stall:>17.2f}s")
+    print(f"{'pooled + warm cache':<22}{cached_wall:>11.2f}s{cached_stall:>17.2f}s")
+    print(f"{'deep, 9x searches':<22}{deep_wall:>11.2f}s{deep_stall:>17.2f}s")
+    print(f"\nSpeedup: {blocking_wall / pooled_wall:.1f}x")
+    print(f"Deep collection: 9x the searches in {deep_wall / pooled_wall:.1f}x the time")
+    print(f"Cache stats: {cached.cache_stats()}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
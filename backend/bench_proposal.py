@@ -0,0 +1,146 @@
+"""
+Benchmark for proposal generation
+
+Runs OpenAIClient against a local stub of the chat completions endpoint whose
+latency grows with the number of tokens it writes (like a real model), and
+compares:
+1. generate_proposal: one completion that writes all 10 sections
+2. generate_proposal_parallel: an outline call, then concurrent per-section calls
+
+For both paths it reports wall-clock, token totals and what happens when a
+call fails (the single call, or the call for one section).
+
+Usage:
+    python bench_proposal.py
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai_integration import OpenAIClient, PROPOSAL_SECTIONS
+
+# Simulated model speed: fixed time to first token plus time per output token
+FIRST_TOKEN_LATENCY = 0.25
+SECONDS_PER_TOKEN = {"gpt-4o": 0.0012, "gpt-4o-mini": 0.0006}
+SECTION_WORDS = 220
+FAILING_MARKER = None  # Requests whose prompt contains this text answer 500
+
+
+def _section_text(title: str) -> str:
+    return f"## {title}\n" + " ".join(["insight"] * SECTION_WORDS)
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        prompt = body["messages"][-1]["content"]
+
+        if FAILING_MARKER and FAILING_MARKER in prompt:
+            self._reply(500, {"error": {"message": "stub failure", "type": "server_error"}})
+            return
+
+        if "Plan a startup proposal" in prompt:
+            content = {
+                "positioning": "The fastest way for small teams to do X",
+                "facts": ["Name: Stubly", "Price: $29/month"],
+                "sections": {title: ["point one", "point two"] for title, _, _ in PROPOSAL_SECTIONS}
+            }
+        elif "Write only the section" in prompt:
+            title = prompt.split('Write only the section "', 1)[1].split('"', 1)[0]
+            content = {"title": title, "content": _section_text(title)}
+        else:
+            content = {"sections": [
+                {"title": title, "content": _section_text(title)} for title, _, _ in PROPOSAL_SECTIONS
+            ]}
+
+        text = json.dumps(content)
+        completion_tokens = len(text) // 4
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        time.sleep(FIRST_TOKEN_LATENCY + completion_tokens * SECONDS_PER_TOKEN.get(body["model"], 0.001))
+
+        self._reply(200, {
+            "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+IDEA = {"id": "idea-1", "title": "Stubly", "tagline": "Bench idea", "wedge": "niche communities"}
+TREND = {"id": "trend-1", "title": "Bench trend", "painPoints": ["slow", "expensive"]}
+
+
+async def run(path: str, failing_marker=None):
+    """Return (wall-clock, usage, number of fallback sections) for one proposal"""
+    global FAILING_MARKER
+
+    FAILING_MARKER = failing_marker
+    client = OpenAIClient(use_cache=False)
+    client.client = client.client.with_options(max_retries=0)
+
+    start = time.perf_counter()
+    if path == "single":
+        proposal = await client.generate_proposal(IDEA, TREND)
+    else:
+        proposal = await client.generate_proposal_parallel(IDEA, TREND)
+    wall = time.perf_counter() - start
+
+    assert len(proposal) == 10, f"expected 10 sections, got {len(proposal)}"
+    if path == "single" and failing_marker:
+        fallbacks = 10  # the whole proposal is the canned fallback
+    else:
+        fallbacks = sum(1 for section in proposal if section.get("fallback"))
+    return wall, dict(client.usage), fallbacks
+
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    print("=" * 72)
+    print("Proposal generation benchmark (local stub server)")
+    print("=" * 72)
+
+    rows = [
+        ("single call", *await run("single")),
+        ("outline + sections", *await run("parallel")),
+        ("single call, fails", *await run("single", failing_marker="Write a comprehensive 10-section proposal")),
+        ("sections, 1 fails", *await run("parallel", failing_marker='section "Risks & Mitigations"')),
+    ]
+
+    print(f"{'path':<22}{'wall-clock':>11}{'calls':>7}{'prompt tok':>12}{'output tok':>12}{'fallback':>10}")
+    for name, wall, usage, fallbacks in rows:
+        print(f"{name:<22}{wall:>10.2f}s{usage['calls']:>7}{usage['prompt_tokens']:>12}"
+              f"{usage['completion_tokens']:>12}{fallbacks:>7}/10")
+
+    print(f"\nSpeedup: {rows[0][1] / rows[1][1]:.1f}x")
+    print("A failed single call loses the whole proposal; a failed section loses only that section.")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,16 +6,33 @@ Handles web scraping for trend collection from:
 - GitHub Trending
 - Reddit
 - Hacker News
+
+Sources are declared in SOURCE_REGISTRY; add one with register_source().
 """
 
 import os
-import requests
-from typing import List, Dict, Any
-from dataclasses import dataclass
+import time
+import asyncio
+import httpx
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
 
+from response_cache import ResponseCache, make_key, DEFAULT_CACHE_DIR
+from trend_dedup import TrendDeduplicator, canonicalize_url
+from resilience import TokenBucket, CircuitBreaker, SourceScoreboard, CircuitOpenError
+from seen_store import SeenUrlStore
+from page_enrichment import PageEnricher
+from single_flight import SingleFlight
+
 load_dotenv()
 
+# Upper bound for a whole collection run (seconds); sources still pending when
+# it expires are cancelled and reported as timed out
+DEFAULT_COLLECTION_DEADLINE = 15.0
+
 @dataclass
 class TrendData:
     id: str
@@ -28,194 +45,645 @@ class TrendData:
     pain_points: List[str]
     evidence: List[Dict[str, str]]
 
+@dataclass(frozen=True)
+class TrendSource:
+    """
+    A searchable trend source
+    
+    query_template is formatted with {query} (the user's domain). Sources whose
+    template doesn't use it are domain-independent and share one cached response.
+    variants are extra templates searched only in deep collection.
+    limit applies per result page.
+    """
+    name: str
+    label: str
+    query_template: str
+    limit: int = 10
+    weight: float = 1.0
+    deadline: float = 10.0
+    cache_ttl: float = 60 * 60
+    variants: Tuple[str, ...] = ()
+    
+    def build_query(self, query: str, template: Optional[str] = None) -> str:
+        return (template or self.query_template).format(query=query)
+
+
+@dataclass
+class SourceBatch:
+    """Items from one source, yielded by stream_trends() as soon as it finishes"""
+    source: str
+    status: str  # "completed", "timed_out", "failed", "skipped" or "fallback"
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    weight: float = 1.0
+    elapsed: float = 0.0
+    duplicates: int = 0
+
+
+@dataclass
+class CollectionResult:
+    items: List[Dict[str, Any]]
+    completed: List[str] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    used_fallback: bool = False
+    duplicates_removed: int = 0
+    new_items: Optional[int] = None
+    delta_since: Optional[str] = None
+    
+    def add(self, batch: SourceBatch):
+        """Record a streamed batch (items are appended in arrival order)"""
+        if batch.status == "fallback":
+            self.used_fallback = True
+        elif batch.status == "completed":
+            self.completed.append(batch.source)
+        elif batch.status == "timed_out":
+            self.timed_out.append(batch.source)
+        elif batch.status == "skipped":
+            self.skipped.append(batch.source)
+        else:
+            self.failed.append(batch.source)
+        self.items.extend(batch.items)
+        self.elapsed = max(self.elapsed, batch.elapsed)
+        self.duplicates_removed += batch.duplicates
+    
+    def report(self) -> Dict[str, Any]:
+        """Summary without the items, for logging and workflow state"""
+        return {
+            "completed": self.completed,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed": round(self.elapsed, 3),
+            "used_fallback": self.used_fallback,
+            "duplicates_removed": self.duplicates_removed,
+            "new_items": self.new_items,
+            "delta_since": self.delta_since,
+            "count": len(self.items)
+        }
+
+
+SOURCE_REGISTRY: Dict[str, TrendSource] = {}
+
+
+def register_source(source: TrendSource) -> TrendSource:
+    """Add or replace a source in the default registry"""
+    SOURCE_REGISTRY[source.name] = source
+    return source
+
+
+register_source(TrendSource(
+    name="product_hunt",
+    label="Product Hunt",
+    query_template="site:producthunt.com {query} trending",
+    weight=1.5,
+    deadline=12.0,
+    cache_ttl=30 * 60,
+    variants=("site:producthunt.com {query} launch", "site:producthunt.com {query} tool")
+))
+register_source(TrendSource(
+    name="github",
+    label="GitHub",
+    query_template="site:github.com trending repositories stars",
+    weight=1.0,
+    deadline=8.0,
+    cache_ttl=6 * 60 * 60,
+    variants=("site:github.com {query} open source stars", "site:github.com awesome {query}")
+))
+register_source(TrendSource(
+    name="reddit",
+    label="Reddit r/startups",
+    query_template="site:reddit.com/r/startups top upvoted",
+    weight=1.2,
+    deadline=10.0,
+    variants=("site:reddit.com {query} frustrating", "site:reddit.com {query} \"is there a tool\"")
+))
+register_source(TrendSource(
+    name="hacker_news",
+    label="Hacker News",
+    query_template="site:news.ycombinator.com points comments",
+    weight=1.0,
+    deadline=8.0,
+    variants=("site:news.ycombinator.com Show HN {query}", "site:news.ycombinator.com Ask HN {query}")
+))
+
+
 class BrightDataCollector:
-    def __init__(self, api_token: str = None):
+    def __init__(
+        self,
+        api_token: str = None,
+        base_url: str = None,
+        max_connections: int = 8,
+        use_cache: bool = True,
+        cache: Optional[ResponseCache] = None,
+        sources: Optional[List[TrendSource]] = None,
+        zone_rate_limit: float = 5.0,
+        zone_burst: float = 10.0,
+        pages: int = 1,
+        query_variants: int = 0,
+        max_concurrent_requests: int = 8,
+        track_seen: bool = True,
+        seen_store: Optional[SeenUrlStore] = None
+    ):
         self.api_token = api_token or os.getenv('BRIGHTDATA_API_TOKEN')
         self.headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
-        self.base_url = "https://api.brightdata.com/request"
+        self.base_url = base_url or os.getenv('BRIGHTDATA_API_URL', "https://api.brightdata.com/request")
+        self.zone = "serp_api1"
+        self.sources: Dict[str, TrendSource] = (
+            {s.name: s for s in sources} if sources is not None else dict(SOURCE_REGISTRY)
+        )
+        
+        # One keep-alive pool shared by every scan so the sources run in parallel
+        # without paying a TLS handshake per request
+        self.timeout = httpx.Timeout(30.0, connect=5.0)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0
+        )
+        # Built up front: loading the SSL context takes ~200ms and would
+        # otherwise stall the event loop on the first scan
+        self._client: Optional[httpx.AsyncClient] = self._new_client()
+        
+        # SERP responses keyed by (zone, search URL): in-memory LRU over SQLite
+        if cache is not None:
+            self.cache = cache
+        elif use_cache:
+            self.cache = ResponseCache("serp", max_memory_entries=256, max_disk_entries=5000, cache_dir=DEFAULT_CACHE_DIR)
+        else:
+            self.cache = None
+        
+        # Fail fast when Bright Data is throttling or a source is down instead
+        # of waiting out every deadline: one token bucket per zone, one
+        # circuit breaker per source, and a scoreboard that drops slow sources
+        self.zone_rate_limit = zone_rate_limit
+        self.zone_burst = zone_burst
+        self.zone_limiters: Dict[str, TokenBucket] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.scoreboard = SourceScoreboard()
+        
+        # Deep collection: result pages and extra query variants per source,
+        # fetched concurrently behind one global request limit
+        self.pages = pages
+        self.query_variants = query_variants
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
+        
+        # Per-domain seen-URL set on disk, for delta crawls
+        if seen_store is not None:
+            self.seen_store = seen_store
+        elif track_seen:
+            self.seen_store = SeenUrlStore(cache_dir=DEFAULT_CACHE_DIR)
+        else:
+            self.seen_store = None
+        
+        # Identical searches and collections already in flight (e.g. many
+        # sessions opening the same domain at once) are shared, not repeated
+        self.in_flight = SingleFlight("brightdata")
+        
+        self.enricher: Optional[PageEnricher] = None
     
-    async def scan_product_hunt(self, query: str = "AI") -> List[Dict[str, Any]]:
-        """Scrape Product Hunt for trending products using Google search"""
-        if not self.api_token:
-            return []
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            limits=self.limits
+        )
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared async HTTP client, reopening it after aclose()"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._new_client()
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    async def _serp_search(self, search_query: str, ttl: float = 3600, page: int = 0) -> List[Dict[str, Any]]:
+        """Run a Google search through the Bright Data SERP zone and return organic results"""
+        search_url = f"https://www.google.com/search?q={quote_plus(search_query)}"
+        if page:
+            search_url += f"&start={page * 10}"
+        cache_key = make_key(self.zone, search_url)
         
-        try:
-            from urllib.parse import quote_plus
-            search_query = f"site:producthunt.com {query} trending"
-            data = {
-                "zone": "serp_api1",
-                "url": f"https://www.google.com/search?q={quote_plus(search_query)}",
-                "format": "raw"
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        return await self.in_flight.run(cache_key, lambda: self._fetch_serp(search_url, cache_key, ttl))
+    
+    async def _fetch_serp(self, search_url: str, cache_key: str, ttl: float) -> List[Dict[str, Any]]:
+        await self.zone_limiter(self.zone).acquire()
+        
+        data = {
+            "zone": self.zone,
+            "url": search_url,
+            "format": "raw"
+        }
+        
+        async with self._request_slots:
+            response = await self._get_client().post(self.base_url, json=data)
+        response.raise_for_status()
+        results = response.json()
+        organic = results.get("organic", [])
+        
+        if self.cache is not None:
+            self.cache.set(cache_key, organic, ttl=ttl)
+        
+        return organic
+    
+    def zone_limiter(self, zone: str) -> TokenBucket:
+        """Token bucket shared by every request to a Bright Data zone"""
+        limiter = self.zone_limiters.get(zone)
+        if limiter is None:
+            limiter = self.zone_limiters[zone] = TokenBucket(self.zone_rate_limit, self.zone_burst)
+        return limiter
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the SERP response cache"""
+        return self.cache.get_stats() if self.cache is not None else {}
+    
+    def in_flight_stats(self) -> Dict[str, Any]:
+        """Requests started vs. coalesced onto one already in flight"""
+        return self.in_flight.get_stats()
+    
+    def source_health(self) -> Dict[str, Any]:
+        """Circuit breaker state and latency/error scoreboard per source"""
+        return {
+            "breakers": {name: breaker.snapshot() for name, breaker in self.breakers.items()},
+            "scoreboard": self.scoreboard.snapshot()
+        }
+    
+    def _to_raw_items(self, organic: List[Dict[str, Any]], source: TrendSource, page: int = 0) -> List[Dict[str, Any]]:
+        return [
+            {
+                "title": item.get("title", ""),
+                "url": item.get("link", ""),
+                "snippet": item.get("snippet", ""),
+                "source": source.label,
+                "rank": page * 10 + position + 1,
+                "weight": source.weight
             }
-            
-            response = requests.post(
-                self.base_url,
-                json=data,
-                headers=self.headers,
-                timeout=30
-            )
-            response.raise_for_status()
-            results = response.json()
-            
-            organic = results.get("organic", [])
-            return [
-                {
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "source": "Product Hunt"
-                }
-                for item in organic[:10]
-            ]
-        except Exception as e:
-            print(f"Product Hunt scraping failed: {e}")
-            return []
+            for position, item in enumerate(organic[:source.limit])
+        ]
     
-    async def scan_github_trending(self, language: str = "") -> List[Dict[str, Any]]:
-        """Scrape GitHub trending repositories using Google search"""
-        if not self.api_token:
-            return []
+    async def _fetch_source(
+        self,
+        source: TrendSource,
+        query: str,
+        pages: Optional[int] = None,
+        query_variants: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        pages = max(1, pages or self.pages)
+        query_variants = self.query_variants if query_variants is None else query_variants
+        templates = (source.query_template,) + source.variants[:query_variants]
+        
+        if pages == 1 and len(templates) == 1:
+            organic = await self._serp_search(source.build_query(query), ttl=source.cache_ttl)
+            return self._to_raw_items(organic, source)
         
+        searches = [(template, page) for template in templates for page in range(pages)]
+        results = await asyncio.gather(
+            *(
+                self._serp_search(source.build_query(query, template), ttl=source.cache_ttl, page=page)
+                for template, page in searches
+            ),
+            return_exceptions=True
+        )
+        
+        ranked = []
+        errors = []
+        for (template, page), result in zip(searches, results):
+            if isinstance(result, BaseException):
+                errors.append(result)
+                continue
+            ranked.extend(self._to_raw_items(result, source, page))
+        
+        # Every page failing is a source failure; a few missing pages are not
+        if errors and not ranked:
+            raise errors[0]
+        
+        # Merge variants by position: all rank-1 results first, then rank 2, ...
+        ranked.sort(key=lambda item: item["rank"])
+        merged = []
+        seen_urls = set()
+        for item in ranked:
+            url = canonicalize_url(item["url"])
+            if url and url in seen_urls:
+                continue
+            seen_urls.add(url)
+            merged.append(item)
+        
+        return merged
+    
+    async def _guarded_fetch(
+        self,
+        source: TrendSource,
+        query: str,
+        pages: Optional[int] = None,
+        query_variants: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch a source under its deadline, circuit breaker and scoreboard
+        
+        Raises CircuitOpenError without calling Bright Data when the source's
+        circuit is open or the scoreboard has dropped it.
+        """
+        if self.scoreboard.is_dropped(source.name):
+            raise CircuitOpenError(f"{source.label} dropped as persistently slow or failing")
+        
+        breaker = self.breakers.get(source.name)
+        if breaker is None:
+            breaker = self.breakers[source.name] = CircuitBreaker()
+        if not breaker.allow():
+            raise CircuitOpenError(f"{source.label} circuit open")
+        
+        start = time.monotonic()
         try:
-            from urllib.parse import quote_plus
-            search_query = f"site:github.com trending repositories stars"
-            data = {
-                "zone": "serp_api1",
-                "url": f"https://www.google.com/search?q={quote_plus(search_query)}",
-                "format": "raw"
-            }
-            
-            response = requests.post(
-                self.base_url,
-                json=data,
-                headers=self.headers,
-                timeout=30
+            items = await asyncio.wait_for(
+                self._fetch_source(source, query, pages, query_variants),
+                timeout=source.deadline
             )
-            response.raise_for_status()
-            results = response.json()
-            
-            organic = results.get("organic", [])
-            return [
-                {
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "source": "GitHub"
-                }
-                for item in organic[:10]
-            ]
-        except Exception as e:
-            print(f"GitHub trending scraping failed: {e}")
-            return []
+        except asyncio.CancelledError:
+            # Cancelled by the caller (global deadline, consumer gone), not the source's fault
+            breaker.abandon()
+            raise
+        except Exception:
+            breaker.record_failure()
+            self.scoreboard.record(source.name, time.monotonic() - start, ok=False)
+            raise
+        
+        breaker.record_success()
+        self.scoreboard.record(source.name, time.monotonic() - start, ok=True)
+        return items
     
-    async def scan_reddit(self, subreddit: str = "startups") -> List[Dict[str, Any]]:
-        """Scrape Reddit for trending posts using Google search"""
+    async def scan_source(self, source: TrendSource, query: str = "") -> List[Dict[str, Any]]:
+        """Scrape a single source, bounded by its own deadline"""
         if not self.api_token:
             return []
         
         try:
-            from urllib.parse import quote_plus
-            search_query = f"site:reddit.com/r/{subreddit} top upvoted"
-            data = {
-                "zone": "serp_api1",
-                "url": f"https://www.google.com/search?q={quote_plus(search_query)}",
-                "format": "raw"
-            }
-            
-            response = requests.post(
-                self.base_url,
-                json=data,
-                headers=self.headers,
-                timeout=30
-            )
-            response.raise_for_status()
-            results = response.json()
-            
-            organic = results.get("organic", [])
-            return [
-                {
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "source": f"Reddit r/{subreddit}"
-                }
-                for item in organic[:10]
-            ]
+            return await self._guarded_fetch(source, query)
+        except asyncio.TimeoutError:
+            print(f"{source.label} scraping timed out after {source.deadline}s")
+            return []
+        except CircuitOpenError as e:
+            print(f"Skipping {source.label}: {e}")
+            return []
         except Exception as e:
-            print(f"Reddit scraping failed: {e}")
+            print(f"{source.label} scraping failed: {e}")
             return []
     
+    async def scan_product_hunt(self, query: str = "AI") -> List[Dict[str, Any]]:
+        """Scrape Product Hunt for trending products using Google search"""
+        return await self.scan_source(SOURCE_REGISTRY["product_hunt"], query)
+    
+    async def scan_github_trending(self, language: str = "") -> List[Dict[str, Any]]:
+        """Scrape GitHub trending repositories using Google search"""
+        return await self.scan_source(SOURCE_REGISTRY["github"])
+    
+    async def scan_reddit(self, subreddit: str = "startups") -> List[Dict[str, Any]]:
+        """Scrape Reddit for trending posts using Google search"""
+        source = replace(
+            SOURCE_REGISTRY["reddit"],
+            label=f"Reddit r/{subreddit}",
+            query_template=f"site:reddit.com/r/{subreddit} top upvoted",
+            variants=()
+        )
+        return await self.scan_source(source)
+    
     async def scan_hacker_news(self) -> List[Dict[str, Any]]:
         """Scrape Hacker News for trending stories using Google search"""
-        if not self.api_token:
-            return []
+        return await self.scan_source(SOURCE_REGISTRY["hacker_news"])
+    
+    async def stream_trends(
+        self,
+        domain: str = "",
+        deadline: Optional[float] = DEFAULT_COLLECTION_DEADLINE,
+        sources: Optional[List[str]] = None,
+        dedupe: bool = True,
+        pages: Optional[int] = None,
+        query_variants: Optional[int] = None
+    ) -> AsyncIterator[SourceBatch]:
+        """
+        Yield one SourceBatch per source as soon as it completes
         
-        try:
-            from urllib.parse import quote_plus
-            search_query = "site:news.ycombinator.com points comments"
-            data = {
-                "zone": "serp_api1",
-                "url": f"https://www.google.com/search?q={quote_plus(search_query)}",
-                "format": "raw"
+        Sources still pending when the global deadline expires (or when the
+        consumer stops iterating) are cancelled and yielded as timed out.
+        If no source produced items, a final "fallback" batch is yielded.
+        With dedupe, each batch only holds items not already seen in an
+        earlier batch; duplicates are merged into the earlier record.
+        """
+        start = time.monotonic()
+        search_domain = domain if domain else "startup trends"
+        selected = [self.sources[name] for name in (sources or self.sources) if name in self.sources]
+        yielded_items = False
+        dedup = TrendDeduplicator() if dedupe else None
+        
+        tasks: Dict[asyncio.Task, TrendSource] = {}
+        if self.api_token:
+            tasks = {
+                asyncio.create_task(self._guarded_fetch(source, search_domain, pages, query_variants)): source
+                for source in selected
             }
+        
+        try:
+            pending = set(tasks)
+            while pending:
+                remaining = None if deadline is None else deadline - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    break
+                
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                
+                for task in done:
+                    source = tasks[task]
+                    batch = SourceBatch(
+                        source=source.name,
+                        status="completed",
+                        weight=source.weight,
+                        elapsed=time.monotonic() - start
+                    )
+                    error = task.exception()
+                    if error is None:
+                        batch.items = task.result()
+                        if dedup is not None:
+                            unique = dedup.extend(batch.items)
+                            batch.duplicates = len(batch.items) - len(unique)
+                            batch.items = unique
+                        yielded_items = yielded_items or bool(batch.items)
+                    elif isinstance(error, asyncio.TimeoutError):
+                        print(f"{source.label} scraping timed out after {source.deadline}s")
+                        batch.status = "timed_out"
+                    elif isinstance(error, CircuitOpenError):
+                        print(f"Skipping {source.label}: {error}")
+                        batch.status = "skipped"
+                    else:
+                        print(f"{source.label} scraping failed: {error}")
+                        batch.status = "failed"
+                    yield batch
             
-            response = requests.post(
-                self.base_url,
-                json=data,
-                headers=self.headers,
-                timeout=30
-            )
-            response.raise_for_status()
-            results = response.json()
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for task in pending:
+                source = tasks[task]
+                yield SourceBatch(
+                    source=source.name,
+                    status="timed_out",
+                    weight=source.weight,
+                    elapsed=time.monotonic() - start
+                )
             
-            organic = results.get("organic", [])
-            return [
-                {
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "snippet": item.get("snippet", ""),
-                    "source": "Hacker News"
-                }
-                for item in organic[:10]
-            ]
-        except Exception as e:
-            print(f"Hacker News scraping failed: {e}")
-            return []
+            if not yielded_items:
+                print("⚠️  No data from Bright Data, using fallback sample data for testing")
+                yield SourceBatch(
+                    source="fallback",
+                    status="fallback",
+                    items=self._get_fallback_data(domain),
+                    elapsed=time.monotonic() - start
+                )
+        finally:
+            # Consumer stopped early: don't leave scans running in the background
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
     
-    async def collect_all_trends(self, domain: str = "") -> List[Dict[str, Any]]:
+    async def collect(
+        self,
+        domain: str = "",
+        deadline: Optional[float] = DEFAULT_COLLECTION_DEADLINE,
+        sources: Optional[List[str]] = None,
+        dedupe: bool = True,
+        pages: Optional[int] = None,
+        query_variants: Optional[int] = None,
+        delta: bool = False
+    ) -> CollectionResult:
         """
-        Collect trends from all sources in parallel
+        Collect trends from the registered sources in parallel
         
-        Returns raw data list for OpenAI clustering
+        Args:
+            domain: User's domain, substituted into domain-specific queries
+            deadline: Global budget in seconds; whatever has arrived when it
+                expires is returned and the rest is reported as timed out
+            sources: Source names to use (default: all registered)
+            dedupe: Merge URL and near-duplicate title/snippet duplicates
+            pages: Google result pages per query (default: self.pages)
+            query_variants: Extra query variants per source (default: self.query_variants)
+            delta: Only return items not seen in earlier delta crawls of this
+                domain, each stamped with "first_seen". Only delta crawls
+                mark items as seen; other runs just report new_items
+        
+        Concurrent calls with the same arguments share one collection.
+        
+        Returns:
+            CollectionResult with items ordered by source weight
         """
-        import asyncio
+        key = make_key("collect", domain, deadline, sources, dedupe, pages, query_variants, delta)
+        result = await self.in_flight.run(key, lambda: self._collect(
+            domain, deadline, sources, dedupe, pages, query_variants, delta
+        ))
+        # Own copy of the item list per caller; the items themselves are shared
+        return replace(result, items=list(result.items))
+    
+    async def _collect(
+        self,
+        domain: str,
+        deadline: Optional[float],
+        sources: Optional[List[str]],
+        dedupe: bool,
+        pages: Optional[int],
+        query_variants: Optional[int],
+        delta: bool
+    ) -> CollectionResult:
+        start = time.monotonic()
+        result = CollectionResult(items=[])
+        batches = []
         
-        search_domain = domain if domain else "startup trends"
+        async for batch in self.stream_trends(
+            domain,
+            deadline=deadline,
+            sources=sources,
+            dedupe=dedupe,
+            pages=pages,
+            query_variants=query_variants
+        ):
+            batches.append(batch)
         
-        tasks = [
-            self.scan_product_hunt(search_domain),
-            self.scan_github_trending(),
-            self.scan_reddit("startups"),
-            self.scan_hacker_news()
-        ]
+        # Heavier sources first so they survive prompt truncation
+        batches.sort(key=lambda b: b.weight, reverse=True)
+        for batch in batches:
+            result.add(batch)
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if self.seen_store is not None and not result.used_fallback:
+            if delta:
+                # Only delta runs (the scheduled refresh jobs) mark items as seen;
+                # an interactive collection must not hide items from the next job
+                previous_crawl = self.seen_store.last_crawl(domain)
+                now = time.time()
+                fresh = self.seen_store.record(domain, result.items, now=now)
+                first_seen = datetime.fromtimestamp(now, timezone.utc).isoformat()
+                for item in fresh:
+                    item["first_seen"] = first_seen
+                result.items = fresh
+                if previous_crawl is not None:
+                    result.delta_since = datetime.fromtimestamp(previous_crawl, timezone.utc).isoformat()
+            else:
+                fresh = self.seen_store.filter_new(domain, result.items)
+            result.new_items = len(fresh)
         
-        all_data = []
-        for result in results:
-            if isinstance(result, list):
-                all_data.extend(result)
-            elif isinstance(result, Exception):
-                print(f"Error in scraping: {result}")
+        result.elapsed = time.monotonic() - start
+        if result.timed_out:
+            print(f"⏱️  Sources timed out: {', '.join(result.timed_out)}")
         
-        if not all_data:
-            print("⚠️  No data from Bright Data, using fallback sample data for testing")
-            all_data = self._get_fallback_data(domain)
+        return result
+    
+    async def collect_all_trends(
+        self,
+        domain: str = "",
+        deadline: Optional[float] = DEFAULT_COLLECTION_DEADLINE,
+        pages: Optional[int] = None,
+        query_variants: Optional[int] = None,
+        delta: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Collect trends from all sources in parallel
+        
+        With delta=True only items that are new since the last crawl of the
+        domain are returned (for scheduled refresh jobs).
+        
+        Returns raw data list for OpenAI clustering
+        """
+        result = await self.collect(
+            domain,
+            deadline=deadline,
+            pages=pages,
+            query_variants=query_variants,
+            delta=delta
+        )
+        return result.items
+    
+    async def enrich(self, items: List[Dict[str, Any]], top_n: int = 10) -> Dict[str, int]:
+        """
+        Fetch the top_n result pages and attach a compressed main-text extract
+        to each item (see page_enrichment)
+        """
+        if not self.api_token or top_n <= 0:
+            return {"enriched": 0, "failed": 0}
         
-        return all_data
+        if self.enricher is None:
+            self.enricher = PageEnricher(self)
+        return await self.enricher.enrich(items, top_n=top_n)
     
     def _get_fallback_data(self, domain: str) -> List[Dict[str, Any]]:
         """Fallback data when Bright Data is unavailable"""
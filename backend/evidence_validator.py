@@ -0,0 +1,211 @@
+"""
+Evidence URL Validation
+
+Checks the evidence URLs of clustered trends before they reach the UI and
+drops the ones that are dead or made up. Every URL of a clustering result is
+checked concurrently (HEAD, falling back to GET) over a pooled client with
+tight timeouts, and each URL's verdict is cached across sessions.
+
+The whole batch is bounded by a time budget: URLs still unchecked when it
+expires are kept, and their checks finish in the background to warm the cache.
+
+The URLs come from the LLM and from scraped pages, so every hop, the first URL
+and each redirect target, must be a public host that resolves only to public
+addresses before it is requested. A URL redirecting to a local or private
+address counts as dead.
+"""
+
+import asyncio
+import ipaddress
+import socket
+from typing import List, Dict, Any, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from response_cache import ResponseCache, DEFAULT_CACHE_DIR
+
+# Servers that reject HEAD but may serve GET
+HEAD_UNSUPPORTED = {400, 403, 405, 501}
+
+MAX_REDIRECTS = 5
+
+
+def is_checkable(url: str) -> bool:
+    """Only public http(s) URLs are checked; never probe local or private hosts"""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return False
+
+    host = parts.hostname.lower()
+    if host == "localhost" or host.endswith(".local") or host.endswith(".internal"):
+        return False
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return True
+    return address.is_global
+
+
+def _is_public_address(address: str) -> bool:
+    try:
+        return ipaddress.ip_address(address.split("%", 1)[0]).is_global
+    except ValueError:
+        return False
+
+
+class EvidenceValidator:
+    def __init__(
+        self,
+        budget: float = 0.4,
+        timeout: float = 2.0,
+        concurrency: int = 16,
+        ok_ttl: float = 24 * 60 * 60,
+        bad_ttl: float = 60 * 60,
+        cache: Optional[ResponseCache] = None
+    ):
+        """
+        Args:
+            budget: Seconds validate_trends() may wait for checks
+            timeout: Per-request timeout (checks continue in the background past the budget)
+            concurrency: Maximum URLs checked at once
+            ok_ttl: Seconds a live URL stays cached
+            bad_ttl: Seconds a dead URL stays cached
+        """
+        self.budget = budget
+        self.ok_ttl = ok_ttl
+        self.bad_ttl = bad_ttl
+        self.cache = cache if cache is not None else ResponseCache(
+            "evidence_urls", max_memory_entries=2048, max_disk_entries=50000, cache_dir=DEFAULT_CACHE_DIR
+        )
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(1.0, timeout)),
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            # Redirects are followed by _probe, which checks each target first
+            follow_redirects=False,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; StartupHunter/2.0; evidence check)"}
+        )
+        self._slots = asyncio.Semaphore(concurrency)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"checked": 0, "removed": 0, "unknown": 0}
+
+    async def aclose(self):
+        for task in list(self._in_flight.values()):
+            task.cancel()
+        await self.client.aclose()
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        """IP addresses a host name resolves to"""
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return [info[4][0] for info in infos]
+
+    async def _is_safe_target(self, url: str) -> bool:
+        """Whether url is checkable and its host resolves to public addresses only"""
+        if not is_checkable(url):
+            return False
+        parts = urlsplit(url)
+        addresses = await self._resolve(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        return bool(addresses) and all(_is_public_address(address) for address in addresses)
+
+    async def _request(self, url: str) -> Tuple[int, Optional[str]]:
+        """Status of one hop and, for a redirect, where it points"""
+        response = await self.client.head(url)
+        if response.status_code in HEAD_UNSUPPORTED:
+            async with self.client.stream("GET", url) as streamed:
+                response = streamed
+        location = response.headers.get("location") if response.is_redirect else None
+        return response.status_code, location
+
+    async def _probe(self, url: str) -> Optional[bool]:
+        """True if the URL answers with a non-error status, False if dead, None if undecided"""
+        async with self._slots:
+            try:
+                for _ in range(MAX_REDIRECTS + 1):
+                    if not await self._is_safe_target(url):
+                        return False
+                    status, location = await self._request(url)
+                    if location is None:
+                        break
+                    url = urljoin(url, location)
+                else:
+                    return False
+            except (httpx.ConnectError, httpx.UnsupportedProtocol, socket.gaierror):
+                return False
+            except (httpx.HTTPError, OSError):
+                return None
+
+        if status in (401, 403, 429) or status >= 500:
+            # Bot walls, rate limits and flaky servers say nothing about the link itself
+            return None
+        return status < 400
+
+    async def check(self, url: str) -> Optional[bool]:
+        """Cached liveness of a URL (None when it couldn't be decided)"""
+        cached = self.cache.get(url)
+        if cached is not None:
+            return cached["ok"]
+
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._check_and_store(url))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        # Shielded so hitting the budget doesn't abort a check that will warm the cache
+        return await asyncio.shield(task)
+
+    async def _check_and_store(self, url: str) -> Optional[bool]:
+        ok = await self._probe(url)
+        self.stats["checked"] += 1
+        if ok is not None:
+            self.cache.set(url, {"ok": ok}, ttl=self.ok_ttl if ok else self.bad_ttl)
+        return ok
+
+    async def validate_trends(self, trends: List[Dict[str, Any]], budget: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Remove evidence entries whose URL is dead, in place, within the time budget
+
+        Evidence with non-http or unchecked URLs is kept.
+        """
+        urls: Set[str] = {
+            evidence.get("url", "")
+            for trend in trends
+            for evidence in trend.get("evidence", []) or []
+            if isinstance(evidence, dict) and is_checkable(evidence.get("url", ""))
+        }
+        if not urls:
+            return trends
+
+        checks = {url: asyncio.ensure_future(self.check(url)) for url in urls}
+        await asyncio.wait(checks.values(), timeout=self.budget if budget is None else budget)
+
+        dead = set()
+        live = 0
+        for url, future in checks.items():
+            if not future.done():
+                self.stats["unknown"] += 1
+                future.cancel()
+            elif future.exception() is None and future.result() is False:
+                dead.add(url)
+            elif future.exception() is None and future.result() is True:
+                live += 1
+        
+        if len(dead) > 1 and not live:
+            # Every link failing at once points at our own connectivity, not the evidence
+            print(f"⚠️  All {len(dead)} evidence URLs unreachable, keeping evidence unchanged")
+            return trends
+
+        for trend in trends:
+            evidence = trend.get("evidence")
+            if not isinstance(evidence, list):
+                continue
+            kept = [e for e in evidence if not (isinstance(e, dict) and e.get("url") in dead)]
+            self.stats["removed"] += len(evidence) - len(kept)
+            trend["evidence"] = kept
+
+        return trends
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cache": self.cache.get_stats()}
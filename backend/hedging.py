@@ -0,0 +1,121 @@
+"""
+Hedged Requests
+
+Cuts tail latency of LLM calls: when a call hasn't answered by a high
+percentile of recent latencies, an identical second request is sent and
+whichever answers first wins; the other is cancelled.
+
+- LatencyTracker: rolling window of recent latencies per call kind
+- HedgeBudget: caps the tokens spent on hedges at a fraction of all tokens
+- hedged(): race a call against a delayed duplicate
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Args:
+            window: Recent latencies kept per key
+            min_samples: Samples needed before a percentile is reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float):
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """q-th percentile (0-100) of the recent latencies of key, None until min_samples"""
+        samples = self._samples.get(key)
+        if samples is None or len(samples) < self.min_samples:
+            return None
+        return float(np.percentile(samples, q))
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            key: {
+                "samples": len(samples),
+                "p50": round(float(np.percentile(samples, 50)), 3),
+                "p95": round(float(np.percentile(samples, 95)), 3)
+            }
+            for key, samples in self._samples.items() if samples
+        }
+
+
+class HedgeBudget:
+    def __init__(self, ratio: float = 0.03, allowance: int = 20000):
+        """
+        Args:
+            ratio: Hedge tokens allowed as a fraction of all tokens spent
+            allowance: Hedge tokens allowed on top, so hedging can start
+                before much has been spent
+        """
+        self.ratio = ratio
+        self.allowance = allowance
+        self.total_tokens = 0
+        self.hedge_tokens = 0
+
+    def record(self, tokens: int):
+        """Tokens spent by any call, hedges included"""
+        self.total_tokens += tokens
+
+    def try_spend(self, tokens: int) -> bool:
+        """Reserve tokens for one hedge; False if it would exceed the budget"""
+        if self.hedge_tokens + tokens > self.ratio * self.total_tokens + self.allowance:
+            return False
+        self.hedge_tokens += tokens
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "total_tokens": self.total_tokens,
+            "hedge_tokens": self.hedge_tokens,
+            "hedge_share": round(self.hedge_tokens / self.total_tokens, 4) if self.total_tokens else 0.0
+        }
+
+
+async def hedged(
+    factory: Callable[[], Awaitable[Any]],
+    hedge_after: Optional[float],
+    allow_hedge: Callable[[], bool] = lambda: True
+) -> Tuple[Any, bool]:
+    """
+    Run factory(), starting a duplicate if it hasn't finished after hedge_after seconds
+
+    allow_hedge is asked right before the duplicate would start (e.g. to
+    charge a budget). The first successful result wins and the other call is
+    cancelled; an error only counts once both calls have failed.
+
+    Returns (result, whether the duplicate won).
+    """
+    primary = asyncio.create_task(factory())
+    tasks = {primary}
+    try:
+        if hedge_after is not None:
+            await asyncio.wait(tasks, timeout=hedge_after)
+            if not primary.done() and allow_hedge():
+                tasks.add(asyncio.create_task(factory()))
+
+        error = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), task is not primary
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,77 @@
+"""
+Incremental JSON Parsing
+
+Parses a JSON document while it is still being streamed from the LLM and
+hands out the elements of its first array as soon as each one is complete,
+e.g. the sections of {"sections": [{...}, {...}]} or of a bare [{...}].
+
+The scanner only tracks nesting and string state, so every streamed
+character is looked at once; each finished element is decoded with
+json.loads on its own slice.
+"""
+
+import json
+from typing import Any, List
+
+
+class JsonArrayStreamParser:
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._array_depth = None  # Stack depth of the array whose elements are emitted
+        self._element_start = None
+        self.closed = False  # The emitted array has ended
+        self.emitted = 0
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Add streamed text and return the array elements completed by it"""
+        self._text += chunk
+        completed = []
+
+        text = self._text
+        for pos in range(self._pos, len(text)):
+            char = text[pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._stack.append(char)
+                if char == "[" and self._array_depth is None:
+                    self._array_depth = len(self._stack)
+                elif (char == "{" and not self.closed and self._array_depth is not None
+                        and len(self._stack) == self._array_depth + 1):
+                    self._element_start = pos
+            elif char in "]}":
+                if not self._stack:
+                    continue
+                if (char == "}" and self._element_start is not None
+                        and len(self._stack) == self._array_depth + 1):
+                    try:
+                        completed.append(json.loads(text[self._element_start:pos + 1]))
+                        self.emitted += 1
+                    except ValueError:
+                        pass
+                    self._element_start = None
+                elif char == "]" and len(self._stack) == self._array_depth:
+                    self.closed = True
+                self._stack.pop()
+
+        self._pos = len(text)
+        return completed
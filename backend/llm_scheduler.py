@@ -0,0 +1,161 @@
+"""
+Rate-Limit-Aware LLM Scheduler
+
+Keeps LLM calls inside the account's OpenAI limits instead of firing them
+blindly and falling back when the API answers 429:
+- one requests-per-minute and one tokens-per-minute TokenBucket per model
+- each call is charged its estimated prompt + completion tokens before it
+  is sent and waits in line (FIFO) until both buckets allow it
+- the estimate is corrected with the real usage once the answer is in
+- the x-ratelimit-* response headers replace the configured limits with the
+  account's real ones and keep the buckets from running ahead of the server
+- a 429 pauses the model's buckets until the server's reset time
+"""
+
+import re
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from resilience import TokenBucket
+
+# (requests per minute, tokens per minute) assumed until the API reports the real limits
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (500, 200000),
+    "gpt-4o": (500, 30000),
+}
+FALLBACK_RATE_LIMIT = (500, 30000)
+
+# Buckets hold this many seconds worth of quota, so a burst can't use up a
+# whole minute at once (OpenAI enforces limits over shorter windows as well)
+BURST_SECONDS = 10.0
+
+MAX_RATE_LIMIT_PAUSE = 60.0
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds in an x-ratelimit-reset-* header ("20ms", "1s", "6m0s")"""
+    if not value:
+        return None
+    parts = _DURATION.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class ModelQuota:
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm / 60, capacity=max(1.0, rpm / 60 * BURST_SECONDS))
+        self.tokens = TokenBucket(tpm / 60, capacity=max(1.0, tpm / 60 * BURST_SECONDS))
+        self.rpm = rpm
+        self.tpm = tpm
+
+    def set_limits(self, rpm: Optional[float], tpm: Optional[float]):
+        if rpm and rpm != self.rpm:
+            self.rpm = rpm
+            self.requests.rate = rpm / 60
+            self.requests.capacity = max(1.0, rpm / 60 * BURST_SECONDS)
+        if tpm and tpm != self.tpm:
+            self.tpm = tpm
+            self.tokens.rate = tpm / 60
+            self.tokens.capacity = max(1.0, tpm / 60 * BURST_SECONDS)
+
+
+class LLMScheduler:
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            limits: (requests per minute, tokens per minute) per model; models
+                not listed start from DEFAULT_RATE_LIMITS
+        """
+        self.limits = {**DEFAULT_RATE_LIMITS, **(limits or {})}
+        self.quotas: Dict[str, ModelQuota] = {}
+        self.stats = {"requests": 0, "queued": 0, "wait_seconds": 0.0, "rate_limited": 0, "limit_updates": 0}
+
+    def quota(self, model: str) -> ModelQuota:
+        quota = self.quotas.get(model)
+        if quota is None:
+            quota = self.quotas[model] = ModelQuota(*self.limits.get(model, FALLBACK_RATE_LIMIT))
+        return quota
+
+    async def acquire(self, model: str, tokens: int) -> float:
+        """Wait until model's quota allows one request of tokens; returns the seconds waited"""
+        quota = self.quota(model)
+        start = time.monotonic()
+        await quota.requests.acquire()
+        await quota.tokens.acquire(tokens)
+        waited = time.monotonic() - start
+
+        self.stats["requests"] += 1
+        self.stats["wait_seconds"] += waited
+        if waited > 0.001:
+            self.stats["queued"] += 1
+        return waited
+
+    def has_capacity(self, model: str, tokens: int) -> bool:
+        """Whether a request of tokens could start now without queueing (doesn't take anything)"""
+        quota = self.quota(model)
+        return quota.requests.available >= 1 and quota.tokens.available >= min(tokens, quota.tokens.capacity)
+
+    def settle(self, model: str, estimated: int, actual: int):
+        """Correct the tokens charged for a call to what it really used"""
+        self.quota(model).tokens.credit(estimated - actual)
+
+    def observe_headers(self, model: str, headers: Mapping[str, str]):
+        """Adopt the limits and remaining quota reported by the x-ratelimit-* headers"""
+        quota = self.quota(model)
+        rpm = _header_number(headers, "x-ratelimit-limit-requests")
+        tpm = _header_number(headers, "x-ratelimit-limit-tokens")
+        if (rpm and rpm != quota.rpm) or (tpm and tpm != quota.tpm):
+            quota.set_limits(rpm, tpm)
+            self.stats["limit_updates"] += 1
+
+        # The server knows about calls from other processes; never run ahead of it
+        for bucket, name in ((quota.requests, "requests"), (quota.tokens, "tokens")):
+            remaining = _header_number(headers, f"x-ratelimit-remaining-{name}")
+            if remaining is not None and bucket.available > remaining:
+                bucket.credit(remaining - bucket.available)
+
+    def rate_limited(self, model: str, headers: Optional[Mapping[str, str]] = None):
+        """A 429 came back: hold every queued call of the model until the limit resets"""
+        headers = headers or {}
+        retry_after_ms = _header_number(headers, "retry-after-ms")
+        pause = retry_after_ms / 1000 if retry_after_ms else _header_number(headers, "retry-after")
+        if not pause:
+            # The reset headers tell when the limit is fully replenished; the
+            # earlier one is when there is room again
+            resets = [parse_reset(headers.get(f"x-ratelimit-reset-{name}")) for name in ("requests", "tokens")]
+            pause = min([reset for reset in resets if reset], default=1.0)
+        pause = min(pause, MAX_RATE_LIMIT_PAUSE)
+        quota = self.quota(model)
+        quota.requests.drain(pause)
+        quota.tokens.drain(pause)
+        self.stats["rate_limited"] += 1
+        print(f"⚠️  {model} rate limited, holding its queue for {pause:.1f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "wait_seconds": round(self.stats["wait_seconds"], 3),
+            "models": {
+                model: {
+                    "rpm": quota.rpm,
+                    "tpm": quota.tpm,
+                    "requests_available": round(quota.requests.available, 1),
+                    "tokens_available": round(quota.tokens.available)
+                }
+                for model, quota in self.quotas.items()
+            }
+        }
@@ -6,12 +6,18 @@ Replaces mock data with real Bright Data, OpenAI, Acontext, and ActionBook integ
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import asyncio
+import json
+import os
 import uuid
 
 from workflow import StartupHunterWorkflow, WorkflowState
+from model_routing import set_latency_tier
+from opportunity_scoring import ScoringWeights
+from prompt_builder import IDEA_FIELDS
 from acontext_integration import AcontextClient
 
 app = FastAPI(title="Startup Hunter API", version="2.0.0")
@@ -24,7 +30,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-workflow = StartupHunterWorkflow()
+workflow = StartupHunterWorkflow(
+    speculate=os.getenv("STARTUP_HUNTER_SPECULATE", "").lower() in ("1", "true", "yes"),
+    hedge_llm=os.getenv("STARTUP_HUNTER_HEDGE", "").lower() in ("1", "true", "yes"),
+    shadow_rate=float(os.getenv("STARTUP_HUNTER_SHADOW_RATE", "0") or 0)
+)
 acontext = AcontextClient()
 sessions: Dict[str, WorkflowState] = {}
 
@@ -32,6 +42,21 @@ class ChatRequest(BaseModel):
     message: str
     stage: str
     session_id: Optional[str] = None
+    regenerate: bool = False
+    tenant_id: Optional[str] = None
+    latency_tier: Optional[str] = None  # "interactive" (default) or "batch"
+
+class RerankRequest(BaseModel):
+    session_id: str
+    weights: Optional[Dict[str, float]] = None
+    tenant_id: Optional[str] = None
+    save: bool = False
+
+class IdeaEditRequest(BaseModel):
+    session_id: str
+    changes: Dict[str, Any]
+    regenerate: bool = False
+    latency_tier: Optional[str] = None
 
 class ChatResponse(BaseModel):
     message: str
@@ -44,6 +69,13 @@ class ChatResponse(BaseModel):
 async def root():
     return {"status": "ok", "service": "Startup Hunter API (Real Integrations)", "version": "2.0.0"}
 
+async def _claim_speculation(session_id: str, stage: str, item_id: str, regenerate: bool):
+    """Speculative result for the user's pick, None on a miss or when regenerating"""
+    if regenerate:
+        workflow.cancel_speculation(session_id)
+        return None
+    return await workflow.claim_speculation(session_id, stage, item_id)
+
 @app.post("/api/chat")
 async def chat(request: ChatRequest):
     """Main chat endpoint with real integrations"""
@@ -61,6 +93,7 @@ async def chat(request: ChatRequest):
             "stage": "input",
             "domain": None,
             "raw_trends": [],
+            "collection_report": None,
             "clustered_trends": [],
             "selected_trend": None,
             "ideas": [],
@@ -70,11 +103,21 @@ async def chat(request: ChatRequest):
             "test_report": None,
             "user_context": {},
             "acontext_memory": None,
+            "regenerate": False,
+            "tenant_id": request.tenant_id,
+            "latency_tier": request.latency_tier,
             "session_id": acontext_session,
             "error": None
         }
     
     state = sessions[session_id]
+    state["regenerate"] = request.regenerate
+    if request.tenant_id:
+        state["tenant_id"] = request.tenant_id
+    if request.latency_tier:
+        state["latency_tier"] = request.latency_tier
+    # LLM calls of this request, speculative ones included, route by the session's tier
+    set_latency_tier(state.get("latency_tier"))
     
     if stage == "input":
         state["domain"] = request.message
@@ -87,17 +130,14 @@ async def chat(request: ChatRequest):
             meta={"stage": "input"}
         )
         
-        result = await workflow.run_stage("collect_trends", state)
+        workflow.cancel_speculation(session_id)
+        result = await workflow.run_stage("collect_and_cluster", state)
         sessions[session_id] = result
         
         if result.get("error"):
             raise HTTPException(status_code=500, detail=result["error"])
         
-        result = await workflow.run_stage("cluster_trends", result)
-        sessions[session_id] = result
-        
-        if result.get("error"):
-            raise HTTPException(status_code=500, detail=result["error"])
+        workflow.speculate_ideas(session_id, result)
         
         return ChatResponse(
             message=f"Found {len(result['clustered_trends'])} trending opportunities! Here are the top ideas based on momentum, pain severity, and competition:",
@@ -124,12 +164,15 @@ async def chat(request: ChatRequest):
             meta={"stage": "trends", "trend_id": trend_id}
         )
         
-        result = await workflow.run_stage("generate_ideas", state)
+        prefetched = await _claim_speculation(session_id, "ideas", trend_id, request.regenerate)
+        result = await workflow.run_stage("generate_ideas", state, prefetched)
         sessions[session_id] = result
         
         if result.get("error"):
             raise HTTPException(status_code=500, detail=result["error"])
         
+        workflow.speculate_proposal(session_id, result)
+        
         return ChatResponse(
             message="I've generated 5 startup ideas. I'm recommending the first one based on your constraints:",
             stage="ideas",
@@ -155,7 +198,8 @@ async def chat(request: ChatRequest):
             meta={"stage": "ideas", "idea_id": idea_id}
         )
         
-        result = await workflow.run_stage("generate_proposal", state)
+        prefetched = await _claim_speculation(session_id, "proposal", idea_id, request.regenerate)
+        result = await workflow.run_stage("generate_proposal", state, prefetched)
         sessions[session_id] = result
         
         if result.get("error"):
@@ -207,6 +251,144 @@ async def chat(request: ChatRequest):
     else:
         raise HTTPException(status_code=400, detail=f"Unknown stage: {stage}")
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of the ideas -> proposal step
+    
+    Selects the idea like /api/chat does, then streams newline-delimited JSON:
+    a "start" event, one "section" event per proposal section as soon as it is
+    written, and a final "done" (or "error") event.
+    """
+    if request.stage != "ideas":
+        raise HTTPException(status_code=400, detail="Only the proposal step can be streamed")
+    
+    state = sessions.get(request.session_id or "")
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    state["regenerate"] = request.regenerate
+    if request.latency_tier:
+        state["latency_tier"] = request.latency_tier
+    set_latency_tier(state.get("latency_tier"))
+    
+    idea_id = request.message
+    selected = next((i for i in state.get("ideas", []) if i.get("id") == idea_id), None)
+    if not selected:
+        raise HTTPException(status_code=404, detail="Idea not found")
+    
+    state["selected_idea"] = selected
+    
+    await acontext.store_message(
+        session_id=state["session_id"],
+        role="user",
+        content=f"Selected idea: {selected.get('title')}",
+        meta={"stage": "ideas", "idea_id": idea_id}
+    )
+    
+    prefetched = await _claim_speculation(request.session_id, "proposal", idea_id, request.regenerate)
+    
+    async def events():
+        yield json.dumps({
+            "type": "start",
+            "message": "Here's a detailed 10-section proposal for your startup:",
+            "stage": "proposal",
+            "session_id": request.session_id,
+            "embedType": "proposal"
+        }) + "\n"
+        
+        index = 0
+        async for section in workflow.stream_proposal(state, prefetched):
+            yield json.dumps({"type": "section", "index": index, "data": section}) + "\n"
+            index += 1
+        
+        if state.get("error"):
+            yield json.dumps({"type": "error", "detail": state["error"]}) + "\n"
+        else:
+            yield json.dumps({"type": "done", "sections": index}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close shared HTTP connection pools"""
+    await workflow.aclose()
+
+@app.post("/api/trends/rerank")
+async def rerank_trends(request: RerankRequest):
+    """
+    Re-score a session's trends under new weights, without a new clustering run
+    
+    With save=True the weights become the tenant's default for later sessions.
+    """
+    state = sessions.get(request.session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if request.tenant_id:
+        state["tenant_id"] = request.tenant_id
+    tenant_id = state.get("tenant_id")
+    
+    try:
+        weights = ScoringWeights.from_dict(request.weights) if request.weights else workflow.weights_for(tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if request.save:
+        if not tenant_id:
+            raise HTTPException(status_code=400, detail="tenant_id is required to save weights")
+        workflow.set_weights(tenant_id, weights)
+    
+    return {
+        "session_id": request.session_id,
+        "weights": weights.to_dict(),
+        "trends": workflow.rerank_trends(state, weights)
+    }
+
+@app.post("/api/proposal/regenerate")
+async def regenerate_proposal(request: IdeaEditRequest):
+    """
+    Edit the selected idea (e.g. its wedge or mvpTime) and update the proposal
+    
+    Only the sections that depend on an edited field are rewritten; the rest
+    of the stored proposal is reused.
+    """
+    state = sessions.get(request.session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    unknown = set(request.changes) - set(IDEA_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown idea fields: {', '.join(sorted(unknown))} (editable: {', '.join(IDEA_FIELDS)})"
+        )
+    
+    state["regenerate"] = request.regenerate
+    if request.latency_tier:
+        state["latency_tier"] = request.latency_tier
+    set_latency_tier(state.get("latency_tier"))
+    
+    result, rewritten = await workflow.edit_idea(state, request.changes)
+    if result.get("error"):
+        raise HTTPException(status_code=500, detail=result["error"])
+    sessions[request.session_id] = result
+    
+    return {
+        "session_id": request.session_id,
+        "idea": result["selected_idea"],
+        "rewritten": rewritten,
+        "proposal": result["proposal"]
+    }
+
+@app.get("/api/scoring/weights/{tenant_id}")
+async def get_scoring_weights(tenant_id: str):
+    return workflow.weights_for(tenant_id).to_dict()
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit rates of the LLM, SERP and semantic caches"""
+    return workflow.cache_stats()
+
 @app.post("/api/cleanup/{session_id}")
 async def cleanup_server(session_id: str):
     """Cleanup MVP dev server for a session"""
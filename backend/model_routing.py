@@ -0,0 +1,224 @@
+"""
+Latency-Aware Model Routing
+
+Picks the model of each LLM call instead of hardcoding gpt-4o per stage:
+- a stage's preferred model is kept unless a rule below applies
+- prompts below a stage's size threshold go to the fast model
+- in interactive sessions, a stage whose strong-model p95 latency misses its
+  SLO goes to the fast model (while the fast model meets it); a few calls
+  still probe the strong model so its stats stay current
+- a model with a high recent error rate fails over to the other one
+
+Shadow evaluation runs a sample of calls through the other model as well,
+in the background, and logs latency and a quality proxy (valid items,
+agreement with the primary answer) per stage and model.
+
+The latency tier is per request ("interactive" or "batch"), set with
+set_latency_tier() in the request's context; tasks started from it inherit it.
+"""
+
+import os
+import re
+import json
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from hedging import LatencyTracker
+from output_schemas import OutputSchema
+from resilience import SourceScoreboard
+
+LATENCY_TIERS = ("interactive", "batch")
+
+_latency_tier: ContextVar[str] = ContextVar("latency_tier", default="interactive")
+
+
+def set_latency_tier(tier: Optional[str]):
+    """Latency tier of the LLM calls made from the current request (unknown tiers are interactive)"""
+    _latency_tier.set(tier if tier in LATENCY_TIERS else "interactive")
+
+
+def current_latency_tier() -> str:
+    return _latency_tier.get()
+
+
+@dataclass(frozen=True)
+class StagePolicy:
+    slo: float                       # p95 seconds an interactive session should wait
+    fast_below_tokens: int = 0       # smaller prompts go to the fast model
+
+
+STAGE_POLICIES = {
+    "cluster_trends": StagePolicy(slo=25.0, fast_below_tokens=1500),
+    "generate_ideas": StagePolicy(slo=15.0),
+    "generate_proposal": StagePolicy(slo=30.0),
+    "generate_mvp_plan": StagePolicy(slo=15.0),
+}
+
+
+@dataclass(frozen=True)
+class Route:
+    model: str
+    reason: str  # stage, small_prompt, slo, probe, failover
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: Any) -> set:
+    return set(_WORD.findall(str(text).lower()))
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def agreement(primary: List[Dict[str, Any]], shadow: List[Dict[str, Any]]) -> float:
+    """
+    0-1 overlap of two answers: each primary item is matched to its most
+    similar shadow item by title words (by content for untitled items)
+    """
+    if not primary or not shadow:
+        return 0.0
+    describe = lambda item: _words(item.get("title") or item.get("content") or item.get("message") or "")
+    shadow_words = [describe(item) for item in shadow]
+    return sum(max(_jaccard(describe(item), other) for other in shadow_words) for item in primary) / len(primary)
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        fast_model: str,
+        strong_model: str,
+        latencies: LatencyTracker,
+        policies: Optional[Dict[str, StagePolicy]] = None,
+        slo_percentile: float = 95.0,
+        probe_rate: float = 0.05,
+        shadow_rate: float = 0.0,
+        shadow_log: Optional[str] = None
+    ):
+        """
+        Args:
+            fast_model: Cheap, low-latency model
+            strong_model: Model preferred for quality
+            latencies: Recent latencies per "model:stage" (shared with hedging)
+            policies: StagePolicy per stage (default: STAGE_POLICIES)
+            slo_percentile: Latency percentile compared against a stage's SLO
+            probe_rate: Share of SLO-rerouted calls still sent to the strong model
+            shadow_rate: Share of calls also run through the other model for evaluation
+            shadow_log: JSONL file that receives one record per shadow comparison
+        """
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.latencies = latencies
+        self.policies = policies if policies is not None else STAGE_POLICIES
+        self.slo_percentile = slo_percentile
+        self.probe_rate = probe_rate
+        self.shadow_rate = shadow_rate
+        self.shadow_log = shadow_log
+        if shadow_log:
+            os.makedirs(os.path.dirname(shadow_log) or ".", exist_ok=True)
+        # Error rates only: slow models are handled by the SLO rule
+        self.health = SourceScoreboard(latency_threshold=float("inf"), error_threshold=0.5, drop_for=60.0)
+        self.routes: Dict[str, int] = {}
+        self.shadow: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def other(self, model: str) -> str:
+        return self.fast_model if model == self.strong_model else self.strong_model
+
+    def route(self, stage: Optional[str], preferred: str, prompt_tokens: int) -> Route:
+        """Model for one call of stage whose caller would use preferred"""
+        route = self._choose(stage, preferred, prompt_tokens)
+        counter = f"{stage}:{route.model}:{route.reason}"
+        self.routes[counter] = self.routes.get(counter, 0) + 1
+        return route
+
+    def _choose(self, stage: Optional[str], preferred: str, prompt_tokens: int) -> Route:
+        if preferred not in (self.fast_model, self.strong_model):
+            return Route(preferred, "stage")
+
+        alternative = self.other(preferred)
+        if self.health.is_dropped(preferred) and not self.health.is_dropped(alternative):
+            return Route(alternative, "failover")
+
+        policy = self.policies.get(stage)
+        if preferred == self.fast_model or policy is None:
+            return Route(preferred, "stage")
+
+        if prompt_tokens < policy.fast_below_tokens:
+            return Route(self.fast_model, "small_prompt")
+
+        if current_latency_tier() == "interactive":
+            strong = self.latencies.percentile(f"{self.strong_model}:{stage}", self.slo_percentile)
+            fast = self.latencies.percentile(f"{self.fast_model}:{stage}", self.slo_percentile)
+            if strong is not None and strong > policy.slo and (fast is None or fast <= policy.slo):
+                # Without the odd probe, the strong model's stats would never recover
+                if random.random() < self.probe_rate:
+                    return Route(self.strong_model, "probe")
+                return Route(self.fast_model, "slo")
+
+        return Route(preferred, "stage")
+
+    def record(self, model: str, latency: float, ok: bool):
+        """Outcome of one call, for failover"""
+        self.health.record(model, latency, ok)
+
+    def should_shadow(self) -> bool:
+        return self.shadow_rate > 0 and random.random() < self.shadow_rate
+
+    def record_shadow(
+        self,
+        stage: Optional[str],
+        schema: Optional[OutputSchema],
+        primary_model: str,
+        primary_content: str,
+        primary_latency: float,
+        shadow_model: str,
+        shadow_content: str,
+        shadow_latency: float
+    ) -> Dict[str, Any]:
+        """Compare a call's answer with the other model's answer to the same messages"""
+        if schema is not None:
+            primary_salvage, shadow_salvage = schema.salvage(primary_content), schema.salvage(shadow_content)
+            primary_items, shadow_items = primary_salvage.items, shadow_salvage.items
+            valid = {primary_model: not primary_salvage.problems, shadow_model: not shadow_salvage.problems}
+        else:
+            primary_items, shadow_items = [{"content": primary_content}], [{"content": shadow_content}]
+            valid = {primary_model: True, shadow_model: True}
+
+        record = {
+            "stage": stage,
+            "tier": current_latency_tier(),
+            "primary": {"model": primary_model, "latency": round(primary_latency, 3),
+                        "valid": valid[primary_model], "items": len(primary_items), "chars": len(primary_content or "")},
+            "shadow": {"model": shadow_model, "latency": round(shadow_latency, 3),
+                       "valid": valid[shadow_model], "items": len(shadow_items), "chars": len(shadow_content or "")},
+            "agreement": round(agreement(primary_items, shadow_items), 3)
+        }
+
+        per_model = self.shadow.setdefault(str(stage), {})
+        for side in ("primary", "shadow"):
+            stats = per_model.setdefault(record[side]["model"], {"samples": 0, "latency": 0.0, "valid": 0.0, "agreement": 0.0})
+            stats["samples"] += 1
+            n = stats["samples"]
+            stats["latency"] += (record[side]["latency"] - stats["latency"]) / n
+            stats["valid"] += (float(record[side]["valid"]) - stats["valid"]) / n
+            stats["agreement"] += (record["agreement"] - stats["agreement"]) / n
+
+        print(f"🔬 Shadow {stage}: {primary_model} {primary_latency:.1f}s vs {shadow_model} {shadow_latency:.1f}s, "
+              f"agreement {record['agreement']:.0%}")
+        if self.shadow_log:
+            with open(self.shadow_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "routes": dict(self.routes),
+            "health": self.health.snapshot(),
+            "shadow": {
+                stage: {model: {k: round(v, 3) for k, v in stats.items()} for model, stats in models.items()}
+                for stage, models in self.shadow.items()
+            }
+        }
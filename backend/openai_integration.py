@@ -9,36 +9,554 @@ Handles all LLM-powered operations:
 """
 
 import os
+import re
 import json
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import time
+import asyncio
+from typing import List, Dict, Any, Optional, AsyncIterator, Set, Tuple
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, RateLimitError
 from dotenv import load_dotenv
 
+from prompt_builder import (
+    PROMPT_BUDGETS, TREND_FIELDS, IDEA_FIELDS, compact_json, count_tokens, fit_object, pack_items,
+    raw_item_view, truncate
+)
+from trend_clustering import TrendCluster, pre_cluster
+from json_stream import JsonArrayStreamParser
+from single_flight import SingleFlight
+from hedging import LatencyTracker, HedgeBudget, hedged
+from llm_scheduler import LLMScheduler
+from model_routing import ModelRouter
+from output_schemas import OutputSchema, schema_for, TRENDS, CLUSTER_NAMES, IDEAS, PROPOSAL, SECTION, MVP_STEPS
+from response_cache import ResponseCache, make_key, DEFAULT_CACHE_DIR
+
 load_dotenv()
 
+# How long an identical prompt may be answered from cache, per method (seconds)
+LLM_CACHE_TTL = {
+    "cluster_trends": 6 * 60 * 60,
+    "generate_ideas": 24 * 60 * 60,
+    "generate_proposal": 24 * 60 * 60,
+    "generate_mvp_plan": 7 * 24 * 60 * 60,
+}
+
+# Upper bound on one completion per method, hedges and SDK retries included (seconds)
+LLM_TIMEOUTS = {
+    "cluster_trends": 60.0,
+    "generate_ideas": 45.0,
+    "generate_proposal": 120.0,
+    "generate_mvp_plan": 90.0,
+}
+DEFAULT_LLM_TIMEOUT = 60.0
+
+# Times a call that is still rate limited after the SDK's own retries goes
+# back into the scheduler queue before it fails
+RATE_LIMIT_RETRIES = 2
+
+# From this many raw items on, cluster_trends groups items locally and the
+# LLM only names the clusters
+PRE_CLUSTER_MIN_ITEMS = 12
+
+# The proposal sections as (title, what it covers, needs the advanced model)
+# for the fan-out proposal path; order is the order of the final proposal
+PROPOSAL_SECTIONS = [
+    ("Problem Statement", "pain, who, urgency, current state", False),
+    ("Target User Persona", "2 personas with jobs-to-be-done", False),
+    ("Current Alternatives", "3 competitors + weaknesses", True),
+    ("Unique Wedge", "unfair advantage, why now", True),
+    ("MVP Scope", "must-have features only, out-of-scope", False),
+    ("Key User Flows", "core flow, edge cases", False),
+    ("Data & Model Plan", "tech stack, APIs, storage, compliance", True),
+    ("Go-to-Market", "first 50 users strategy, pricing", True),
+    ("Risks & Mitigations", "3 risks with mitigation plans", True),
+    ("2-Week Roadmap", "daily milestones", False),
+]
+
+# Idea and trend fields each proposal section is written from. After an edit
+# to the idea, only the sections depending on a changed field are rewritten.
+# Every section depends on the idea's title and tagline as well.
+_SECTION_FIELDS = {
+    "Problem Statement": {"idea.reasoning", "idea.market", "trend.title", "trend.score", "trend.pain",
+                          "trend.painPoints", "trend.evidence"},
+    "Target User Persona": {"idea.market", "trend.painPoints"},
+    "Current Alternatives": {"idea.wedge", "trend.competition", "trend.evidence"},
+    "Unique Wedge": {"idea.reasoning", "idea.wedge", "trend.momentum", "trend.competition"},
+    "MVP Scope": {"idea.wedge", "idea.mvpTime", "trend.complexity"},
+    "Key User Flows": set(),
+    "Data & Model Plan": {"trend.complexity"},
+    "Go-to-Market": {"idea.market", "idea.wedge"},
+    "Risks & Mitigations": {"idea.market", "trend.competition", "trend.complexity"},
+    "2-Week Roadmap": {"idea.mvpTime"},
+}
+SECTION_DEPENDENCIES = {
+    title: fields | {"idea.title", "idea.tagline"} for title, fields in _SECTION_FIELDS.items()
+}
+
+
+
+def _section_key(title: str) -> str:
+    """Section title for matching ("3. Current alternatives" == "Current Alternatives")"""
+    return re.sub(r"[^a-z]", "", re.sub(r"^\s*\d+[.)]\s*", "", title.lower()))
+
+
+def changed_fields(
+    previous_idea: Dict[str, Any],
+    selected_idea: Dict[str, Any],
+    previous_trend: Optional[Dict[str, Any]] = None,
+    trend_context: Optional[Dict[str, Any]] = None
+) -> Set[str]:
+    """Proposal prompt fields ("idea.wedge", "trend.painPoints") whose value differs"""
+    changed = {f"idea.{name}" for name in IDEA_FIELDS if previous_idea.get(name) != selected_idea.get(name)}
+    if trend_context is not None:
+        previous_trend = previous_trend or {}
+        changed |= {f"trend.{name}" for name in TREND_FIELDS if previous_trend.get(name) != trend_context.get(name)}
+    return changed
+
+
+def affected_sections(changed: Set[str]) -> List[str]:
+    """Titles of the PROPOSAL_SECTIONS written from any of the changed fields"""
+    # A section without recorded dependencies is affected by any change
+    return [title for title, _, _ in PROPOSAL_SECTIONS if changed & SECTION_DEPENDENCIES.get(title, changed)]
+
+
+def _in_section_order(sections: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """PROPOSAL_SECTIONS order; sections under other titles keep their place at the end"""
+    order = {_section_key(title): index for index, (title, _, _) in enumerate(PROPOSAL_SECTIONS)}
+    return sorted(sections, key=lambda section: order.get(_section_key(section["title"]), len(order)))
+
+
+# One keep-alive connection pool per process, shared by every OpenAIClient, so
+# concurrent sessions multiplex their LLM calls instead of opening new sockets
+_shared_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0),
+            timeout=httpx.Timeout(120.0, connect=5.0)
+        )
+    return _shared_http_client
+
+
+async def close_shared_http_client():
+    global _shared_http_client
+    if _shared_http_client is not None and not _shared_http_client.is_closed:
+        await _shared_http_client.aclose()
+    _shared_http_client = None
+
+
 class OpenAIClient:
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        use_cache: bool = True,
+        cache: Optional[ResponseCache] = None,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_budget: float = 0.03,
+        rate_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        route_models: bool = True,
+        shadow_rate: float = 0.0,
+        shadow_log: Optional[str] = None
+    ):
+        """
+        Args:
+            hedge: Send a second identical request when a completion is slower
+                than hedge_percentile of recent ones of the same kind
+            hedge_percentile: Latency percentile (0-100) that triggers a hedge
+            hedge_budget: Hedge tokens allowed as a fraction of all tokens spent
+            rate_limits: (requests, tokens) per minute per model until the API
+                reports the account's real limits (default: llm_scheduler.DEFAULT_RATE_LIMITS)
+            route_models: Pick model or model_advanced per call from the stage, prompt
+                size, latency tier and live model stats (see model_routing)
+            shadow_rate: Share of calls also run through the other model to compare
+                latency and quality (0 disables shadow evaluation)
+            shadow_log: JSONL file receiving the shadow comparisons
+        """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = AsyncOpenAI(api_key=self.api_key, http_client=get_shared_http_client())
         self.model = "gpt-4o-mini"  # Fast and cost-effective
         self.model_advanced = "gpt-4o"  # For complex reasoning
+        self.embedding_model = "text-embedding-3-small"  # For the semantic cache
+        
+        # Completions keyed by (model, temperature, messages, response_format):
+        # in-memory LRU over SQLite, so repeated prompts skip the round trip
+        if cache is not None:
+            self.cache = cache
+        elif use_cache:
+            self.cache = ResponseCache("llm", max_memory_entries=512, max_disk_entries=20000, cache_dir=DEFAULT_CACHE_DIR)
+        else:
+            self.cache = None
+        
+        # Token totals reported by the API (cache hits cost nothing)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        
+        # Identical requests already in flight are shared, not sent twice
+        self.in_flight = SingleFlight("openai")
+        
+        # Tail latency: recent latencies per (model, method) pick the hedge delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.latencies = LatencyTracker()
+        self.hedge_budget = HedgeBudget(ratio=hedge_budget)
+        self._typical_completion_tokens: Dict[str, float] = {}
+        self.call_counters = {
+            "timeouts": 0, "hedged": 0, "hedge_wins": 0, "hedges_over_budget": 0,
+            "invalid_responses": 0, "rerequested_items": 0,
+            "sections_rewritten": 0, "sections_reused": 0
+        }
+        
+        # Calls wait for room in the per-model RPM/TPM quota instead of
+        # running into 429s and falling back to canned results
+        self.scheduler = LLMScheduler(rate_limits)
+        
+        # gpt-4o only where it is worth its price and latency
+        self.router = ModelRouter(
+            self.model, self.model_advanced, self.latencies, shadow_rate=shadow_rate, shadow_log=shadow_log
+        ) if route_models else None
+        self._shadow_tasks = set()
     
-    def cluster_trends(self, raw_data: List[Dict[str, Any]], domain: str = "") -> List[Dict[str, Any]]:
+    async def _complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        response_format: Optional[Dict[str, Any]] = None,
+        method: Optional[str] = None,
+        regenerate: bool = False
+    ) -> str:
+        """
+        Run one chat completion without blocking the event loop and return its content
+        
+        Answers come from the response cache when an identical request was
+        made within the method's TTL. regenerate skips the lookup (the fresh
+        answer still replaces the cached one). Concurrent identical requests
+        share one API call.
+        
+        model is the stage's preferred model: the cache key is built from it,
+        so an answer is reused whichever model the router picked for it.
+        """
+        response_format = response_format or {"type": "json_object"}
+        cache_key = make_key(model, temperature, messages, response_format)
+        
+        if self.cache is not None and not regenerate:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if self.router is not None:
+            model = self.router.route(method, model, count_tokens(compact_json(messages))).model
+        return await self.in_flight.run(cache_key, lambda: self._request_completion(
+            model, messages, temperature, response_format, method, cache_key
+        ))
+    
+    async def _request_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        response_format: Dict[str, Any],
+        method: Optional[str],
+        cache_key: str
+    ) -> str:
+        """One completion bounded by the method's timeout, hedged when enabled"""
+        kind = f"{model}:{method}"
+        hedge_after = self.latencies.percentile(kind, self.hedge_percentile) if self.hedge else None
+        
+        def allow_hedge() -> bool:
+            cost = self._estimate_tokens(messages, kind)
+            # Hedges only use spare quota, never push real calls into the queue
+            if not self.scheduler.has_capacity(model, cost) or not self.hedge_budget.try_spend(cost):
+                self.call_counters["hedges_over_budget"] += 1
+                return False
+            self.call_counters["hedged"] += 1
+            return True
+        
+        start = time.monotonic()
+        try:
+            response, hedge_won = await asyncio.wait_for(
+                hedged(
+                    lambda: self._create_completion(model, messages, temperature, response_format, kind),
+                    hedge_after,
+                    allow_hedge
+                ),
+                timeout=LLM_TIMEOUTS.get(method, DEFAULT_LLM_TIMEOUT)
+            )
+        except asyncio.TimeoutError:
+            self.call_counters["timeouts"] += 1
+            raise
+        
+        if hedge_won:
+            self.call_counters["hedge_wins"] += 1
+        content = response.choices[0].message.content
+        
+        if self.router is not None and self.router.should_shadow():
+            self._start_shadow(method, model, messages, temperature, response_format, content, time.monotonic() - start)
+        
+        if self.cache is not None and content and self._is_cacheable(content, response_format):
+            self.cache.set(cache_key, content, ttl=LLM_CACHE_TTL.get(method, 60 * 60))
+        
+        return content
+    
+    async def _create_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        response_format: Dict[str, Any],
+        kind: str
+    ):
+        estimate = self._estimate_tokens(messages, kind)
+        raw, start = await self._send(model, messages, temperature, response_format, kind, estimate)
+        
+        self.latencies.record(kind, time.monotonic() - start)
+        if self.router is not None:
+            self.router.record(model, time.monotonic() - start, ok=True)
+        response = raw.parse()
+        self._record_usage(model, kind, estimate, response.usage)
+        return response
+    
+    async def _send(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        response_format: Dict[str, Any],
+        kind: str,
+        estimate: int,
+        **options
+    ):
         """
-        Cluster raw scraped data into structured trends with opportunity scores
+        Send one completion request inside the model's RPM/TPM quota,
+        retrying after 429s
+        
+        Returns the raw response (headers already applied to the scheduler)
+        and when the request started.
+        """
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await self.scheduler.acquire(model, estimate)
+            start = time.monotonic()
+            try:
+                raw = await self.client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    response_format=response_format,
+                    **options
+                )
+                break
+            except asyncio.CancelledError:
+                # Lost a hedge race or timed out: it took at least this long, and
+                # leaving it out would bias the percentiles towards fast calls
+                self.latencies.record(kind, time.monotonic() - start)
+                raise
+            except RateLimitError as e:
+                self.scheduler.rate_limited(model, e.response.headers)
+                # An exhausted billing quota doesn't come back by waiting
+                if attempt == RATE_LIMIT_RETRIES or e.code == "insufficient_quota":
+                    raise
+            except Exception:
+                if self.router is not None:
+                    self.router.record(model, time.monotonic() - start, ok=False)
+                raise
+        
+        self.scheduler.observe_headers(model, raw.headers)
+        return raw, start
+    
+    def _record_usage(self, model: str, kind: str, estimate: int, usage):
+        """Count a finished call and settle its quota charge with the real token usage"""
+        self.usage["calls"] += 1
+        if usage is None:
+            return
+        self.usage["prompt_tokens"] += usage.prompt_tokens or 0
+        self.usage["completion_tokens"] += usage.completion_tokens or 0
+        self.scheduler.settle(model, estimate, usage.total_tokens or estimate)
+        self.hedge_budget.record(usage.total_tokens or 0)
+        typical = self._typical_completion_tokens.get(kind, usage.completion_tokens or 0)
+        self._typical_completion_tokens[kind] = 0.8 * typical + 0.2 * (usage.completion_tokens or 0)
+    
+    def _start_shadow(
+        self,
+        method: Optional[str],
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        response_format: Dict[str, Any],
+        content: str,
+        latency: float
+    ):
+        """Run the same call on the other model in the background and log the comparison"""
+        shadow_model = self.router.other(model)
+        kind = f"{shadow_model}:{method}"
+        # Evaluation only uses spare quota
+        if not self.scheduler.has_capacity(shadow_model, self._estimate_tokens(messages, kind)):
+            return
+        
+        async def shadow():
+            start = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    self._create_completion(shadow_model, messages, temperature, response_format, kind),
+                    timeout=LLM_TIMEOUTS.get(method, DEFAULT_LLM_TIMEOUT)
+                )
+            except Exception as e:
+                print(f"Shadow {method} on {shadow_model} failed: {e!r}")
+                return
+            self.router.record_shadow(
+                method, schema_for(response_format),
+                model, content, latency,
+                shadow_model, response.choices[0].message.content, time.monotonic() - start
+            )
+        
+        task = asyncio.create_task(shadow())
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+    
+    def _estimate_tokens(self, messages: List[Dict[str, str]], kind: str) -> int:
+        """Prompt tokens plus the typical completion size of this kind of call"""
+        return count_tokens(compact_json(messages)) + int(self._typical_completion_tokens.get(kind, 500))
+    
+    def _is_cacheable(self, content: str, response_format: Dict[str, Any]) -> bool:
+        """Never cache a JSON completion that doesn't parse, or it would be replayed"""
+        if response_format.get("type") == "text":
+            return True
+        try:
+            json.loads(content)
+            return True
+        except (TypeError, ValueError):
+            return False
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the completion cache"""
+        return self.cache.get_stats() if self.cache is not None else {}
+    
+    def in_flight_stats(self) -> Dict[str, Any]:
+        """Requests started vs. coalesced onto one already in flight"""
+        return self.in_flight.get_stats()
+    
+    def call_stats(self) -> Dict[str, Any]:
+        """Timeouts, hedging, the rate-limit queue and recent latencies per (model, method)"""
+        return {
+            **self.call_counters,
+            "hedge_budget": self.hedge_budget.snapshot(),
+            "scheduler": self.scheduler.get_stats(),
+            "routing": self.router.get_stats() if self.router is not None else {},
+            "latency": self.latencies.snapshot()
+        }
+    
+    async def _complete_items(
+        self,
+        schema: OutputSchema,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        method: str,
+        regenerate: bool = False,
+        expected: Optional[int] = None,
+        rerequest: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Schema-validated items of a structured completion
+        
+        Invalid items are dropped instead of the whole answer. If that leaves
+        fewer than expected items (without expected: if any were dropped),
+        one follow-up call asks for replacements of just those, unless
+        rerequest is off (e.g. where item order matters). Raises ValueError
+        if no valid item came back at all.
+        """
+        content = await self._complete(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            response_format=schema.response_format,
+            method=method,
+            regenerate=regenerate
+        )
+        salvage = schema.salvage(content)
+        if not salvage.problems:
+            return salvage.items
+        
+        self.call_counters["invalid_responses"] += 1
+        print(f"⚠️  {schema.name}: kept {len(salvage.items)} valid items ({'; '.join(salvage.problems)})")
+        wanted = expected - len(salvage.items) if expected else len(salvage.problems)
+        
+        if rerequest and wanted > 0:
+            kept = [item["title"] for item in salvage.items if item.get("title")]
+            request = (
+                f"Part of an earlier answer to this request was unusable ({'; '.join(salvage.problems)}). "
+                f'Return only {wanted} replacement item(s) in "{schema.key}"'
+                + (f", different from: {compact_json(kept)}" if kept else "")
+            )
+            try:
+                replacements = schema.salvage(await self._complete(
+                    model=model,
+                    messages=messages + [{"role": "user", "content": request}],
+                    temperature=temperature,
+                    response_format=schema.response_format,
+                    method=method,
+                    regenerate=regenerate
+                ))
+                salvage.items.extend(replacements.items[:wanted])
+                self.call_counters["rerequested_items"] += wanted
+            except Exception as e:
+                print(f"Error re-requesting {schema.name} items: {e}")
+        
+        if not salvage.items:
+            raise ValueError(f"no valid {schema.name} items")
+        return salvage.items
+    
+    async def embed(self, text: str) -> List[float]:
+        """Embedding of a short text (cached like completions, it never changes for a model)"""
+        cache_key = make_key("embedding", self.embedding_model, text)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        return await self.in_flight.run(cache_key, lambda: self._request_embedding(text, cache_key))
+    
+    async def _request_embedding(self, text: str, cache_key: str) -> List[float]:
+        response = await self.client.embeddings.create(model=self.embedding_model, input=text)
+        vector = response.data[0].embedding
+        
+        if self.cache is not None:
+            self.cache.set(cache_key, vector, ttl=30 * 24 * 60 * 60)
+        return vector
+    
+    async def cluster_trends(
+        self,
+        raw_data: List[Dict[str, Any]],
+        domain: str = "",
+        regenerate: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Cluster raw scraped data into structured trends with 0-10 sub-scores
+        
+        From PRE_CLUSTER_MIN_ITEMS items on, items are grouped locally first
+        and the LLM only names and scores the groups. The opportunity score
+        itself is computed from the sub-scores by opportunity_scoring.
         
         Args:
             raw_data: List of scraped items from Product Hunt, GitHub, Reddit, HN
             domain: Optional domain filter (e.g., "fintech", "healthcare")
+            regenerate: Bypass the response cache
         
         Returns:
-            List of TrendData objects with scores
+            List of TrendData objects with sub-scores
         """
         if not raw_data:
             return []
         
-        # Prepare data summary for LLM
-        data_summary = json.dumps(raw_data[:50], indent=2)  # Limit to 50 items
+        if len(raw_data) >= PRE_CLUSTER_MIN_ITEMS:
+            return await self._name_clusters(pre_cluster(raw_data), domain, regenerate)
+        
+        # Most relevant items that fit the budget, compact (enriched items carry their page text)
+        data_summary, packed = pack_items(raw_data, PROMPT_BUDGETS["cluster_trends"])
+        if packed < len(raw_data):
+            print(f"Clustering {packed} of {len(raw_data)} items within the prompt budget")
         
         prompt = f"""You are a trend analyst for startup ideas. Analyze this scraped data and identify 5 distinct trending opportunities.
 
@@ -57,70 +575,176 @@ For each trend, provide:
    - Competition: number of existing solutions (0 = many, 10 = few)
    - Complexity: build difficulty (0 = hard, 10 = easy)
 
-Calculate opportunity score: (Momentum × 2) + (Pain × 3) - Competition - Complexity
-
-Return JSON array with this structure:
-[
-  {{
-    "id": "trend-1",
-    "title": "Clear trend title",
-    "score": 85,
-    "momentum": 9,
-    "pain": 10,
-    "competition": 6,
-    "complexity": 4,
-    "painPoints": ["quote 1", "quote 2", "quote 3"],
-    "evidence": [
-      {{"source": "Product Hunt", "url": "url", "snippet": "evidence"}},
-      {{"source": "Reddit", "url": "url", "snippet": "evidence"}}
-    ]
-  }}
-]
+Return JSON:
+{{
+  "trends": [
+    {{
+      "id": "trend-1",
+      "title": "Clear trend title",
+      "momentum": 9,
+      "pain": 10,
+      "competition": 6,
+      "complexity": 4,
+      "painPoints": ["quote 1", "quote 2", "quote 3"],
+      "evidence": [
+        {{"source": "Product Hunt", "url": "url", "snippet": "evidence"}},
+        {{"source": "Reddit", "url": "url", "snippet": "evidence"}}
+      ]
+    }}
+  ]
+}}
 
 Return ONLY valid JSON, no markdown or explanations."""
 
         try:
-            response = self.client.chat.completions.create(
+            trends = await self._complete_items(
+                TRENDS,
                 model=self.model_advanced,
                 messages=[
                     {"role": "system", "content": "You are a startup trend analyst. Return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
-                response_format={"type": "json_object"}
+                method="cluster_trends",
+                regenerate=regenerate,
+                expected=5
             )
-            
-            content = response.choices[0].message.content
-            
-            # Parse JSON response
-            try:
-                # Handle if response is wrapped in a root object
-                parsed = json.loads(content)
-                if isinstance(parsed, dict) and 'trends' in parsed:
-                    return parsed['trends']
-                elif isinstance(parsed, list):
-                    return parsed
-                else:
-                    # Assume it's a dict with one key containing the array
-                    first_value = next(iter(parsed.values()))
-                    if isinstance(first_value, list):
-                        return first_value
-                    return []
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
-                print(f"Content: {content}")
-                return []
+            for number, trend in enumerate(trends, start=1):
+                trend["id"] = f"trend-{number}"
+            return trends
         
         except Exception as e:
             print(f"Error clustering trends: {e}")
             print("⚠️  Using fallback clustered trends for testing")
-            return self._get_fallback_trends(domain, raw_data)
+            return [{**trend, "fallback": True} for trend in self._get_fallback_trends(domain, raw_data)]
+    
+    async def _name_clusters(
+        self,
+        clusters: List[TrendCluster],
+        domain: str = "",
+        regenerate: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Have the LLM name, describe and score locally built clusters
+        
+        Only each cluster's top terms and representative items go into the
+        prompt, so its size doesn't depend on how many items were scraped.
+        Evidence comes from the representatives, so its URLs are real.
+        Clusters the LLM leaves out keep a locally generated description
+        (marked "fallback": True).
+        """
+        examples = max(len(c.representatives) for c in clusters)
+        while True:
+            clusters_view = [
+                {
+                    "cluster_id": cluster.cluster_id,
+                    "items": len(cluster.items),
+                    "sources": cluster.sources,
+                    "terms": cluster.terms,
+                    "examples": [raw_item_view(item) for item in cluster.representatives[:examples]]
+                }
+                for cluster in clusters
+            ]
+            data_summary = compact_json(clusters_view)
+            if examples <= 1 or count_tokens(data_summary) <= PROMPT_BUDGETS["cluster_trends"]:
+                break
+            examples -= 1
+        
+        prompt = f"""You are a trend analyst for startup ideas. Scraped items from Product Hunt, GitHub, Reddit and Hacker News were already grouped into clusters of related items. Describe the trending opportunity behind each cluster.
+
+Domain focus: {domain if domain else "Any domain"}
+
+Clusters (item count, sources, top terms and representative items):
+{data_summary}
+
+For each cluster, provide:
+1. A clear title (e.g., "AI voice notes for healthcare workers")
+2. Extracted pain points (specific quotes or patterns from the examples)
+3. Scores (0-10 scale):
+   - Momentum: upvote/star growth rate
+   - Pain: severity of problem
+   - Competition: number of existing solutions (0 = many, 10 = few)
+   - Complexity: build difficulty (0 = hard, 10 = easy)
+
+Return JSON:
+{{
+  "trends": [
+    {{
+      "cluster_id": "c1",
+      "title": "Clear trend title",
+      "momentum": 9,
+      "pain": 10,
+      "competition": 6,
+      "complexity": 4,
+      "painPoints": ["quote 1", "quote 2", "quote 3"]
+    }}
+  ]
+}}
+
+Return ONLY valid JSON, no markdown or explanations."""
+
+        named: Dict[str, Dict[str, Any]] = {}
+        try:
+            content = await self._complete(
+                model=self.model_advanced,
+                messages=[
+                    {"role": "system", "content": "You are a startup trend analyst. Return only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                response_format=CLUSTER_NAMES.response_format,
+                method="cluster_trends",
+                regenerate=regenerate
+            )
+            # Invalid entries are not re-requested: their clusters keep the local description
+            salvage = CLUSTER_NAMES.salvage(content)
+            if salvage.problems:
+                self.call_counters["invalid_responses"] += 1
+                print(f"⚠️  Describing some clusters locally: {'; '.join(salvage.problems)}")
+            named = {entry["cluster_id"]: entry for entry in salvage.items}
+        except Exception as e:
+            print(f"Error naming trend clusters: {e}")
+            print("⚠️  Using locally described clusters")
+        
+        trends = []
+        for number, cluster in enumerate(clusters, start=1):
+            trend = self._describe_cluster_locally(cluster)
+            if cluster.cluster_id in named:
+                trend.update({k: v for k, v in named[cluster.cluster_id].items() if k != "cluster_id"})
+            else:
+                trend["fallback"] = True
+            trend.update({
+                "id": f"trend-{number}",
+                "itemCount": len(cluster.items),
+                "evidence": [
+                    {
+                        "source": item.get("source", ""),
+                        "url": item.get("url", ""),
+                        "snippet": truncate(item.get("snippet") or item.get("title", ""), 200)
+                    }
+                    for item in cluster.representatives
+                ]
+            })
+            trends.append(trend)
+        return trends
+    
+    def _describe_cluster_locally(self, cluster: TrendCluster) -> Dict[str, Any]:
+        """Description of a cluster from its top terms and titles, with neutral sub-scores"""
+        return {
+            "title": " / ".join(term.capitalize() for term in cluster.terms[:3]) or "Emerging trend",
+            "momentum": 5,
+            "pain": 5,
+            "competition": 5,
+            "complexity": 5,
+            "painPoints": [truncate(item.get("title", ""), 120) for item in cluster.representatives[:3]]
+        }
     
-    def generate_ideas(
+    async def generate_ideas(
         self, 
         selected_trend: Dict[str, Any],
         user_context: Optional[Dict[str, Any]] = None,
-        acontext_memory: Optional[str] = None
+        acontext_memory: Optional[str] = None,
+        regenerate: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Generate startup ideas based on selected trend and user context
@@ -129,12 +753,13 @@ Return ONLY valid JSON, no markdown or explanations."""
             selected_trend: The trend user selected
             user_context: User preferences (domain, constraints, target market)
             acontext_memory: Memory from Acontext (rejected ideas, preferences)
+            regenerate: Bypass the response cache
         
         Returns:
             List of startup idea objects
         """
-        trend_summary = json.dumps(selected_trend, indent=2)
-        context_str = json.dumps(user_context or {}, indent=2)
+        trend_summary = fit_object(selected_trend, TREND_FIELDS, PROMPT_BUDGETS["generate_ideas"])
+        context_str = compact_json(user_context or {})
         memory_str = acontext_memory or "No previous context"
         
         prompt = f"""You are a startup idea generator. Based on this trend and user context, generate 5 distinct startup ideas.
@@ -158,55 +783,53 @@ Generate 5 startup ideas with:
 7. Recommended flag (true for best idea, false for others)
 
 Return JSON:
-[
-  {{
-    "id": "idea-1",
-    "title": "Product Name",
-    "tagline": "One-line value prop",
-    "reasoning": "I noticed X from the trend. Combined with Y from your context. This solves Z. The wedge is W.",
-    "market": "X users/companies, $Y price = $Z TAM",
-    "wedge": "Start with niche segment (specifics)",
-    "mvpTime": "N weeks",
-    "recommended": true
-  }}
-]
+{{
+  "ideas": [
+    {{
+      "id": "idea-1",
+      "title": "Product Name",
+      "tagline": "One-line value prop",
+      "reasoning": "I noticed X from the trend. Combined with Y from your context. This solves Z. The wedge is W.",
+      "market": "X users/companies, $Y price = $Z TAM",
+      "wedge": "Start with niche segment (specifics)",
+      "mvpTime": "N weeks",
+      "recommended": true
+    }}
+  ]
+}}
 
 Make reasoning personal by referencing Acontext memory. Return ONLY valid JSON."""
 
         try:
-            response = self.client.chat.completions.create(
+            ideas = await self._complete_items(
+                IDEAS,
                 model=self.model_advanced,
                 messages=[
                     {"role": "system", "content": "You are a startup advisor. Return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.8,
-                response_format={"type": "json_object"}
+                method="generate_ideas",
+                regenerate=regenerate,
+                expected=5
             )
-            
-            content = response.choices[0].message.content
-            parsed = json.loads(content)
-            
-            # Extract array from response
-            if isinstance(parsed, dict) and 'ideas' in parsed:
-                return parsed['ideas']
-            elif isinstance(parsed, list):
-                return parsed
-            else:
-                first_value = next(iter(parsed.values()))
-                if isinstance(first_value, list):
-                    return first_value
-                return []
+            # Exactly one recommended idea, the model's first pick
+            recommended = next((idea for idea in ideas if idea["recommended"]), ideas[0])
+            for number, idea in enumerate(ideas, start=1):
+                idea["id"] = f"idea-{number}"
+                idea["recommended"] = idea is recommended
+            return ideas
         
         except Exception as e:
             print(f"Error generating ideas: {e}")
             print("⚠️  Using fallback ideas for testing")
-            return self._get_fallback_ideas(selected_trend)
+            return [{**idea, "fallback": True} for idea in self._get_fallback_ideas(selected_trend)]
     
-    def generate_proposal(
+    async def generate_proposal(
         self,
         selected_idea: Dict[str, Any],
-        trend_context: Dict[str, Any]
+        trend_context: Dict[str, Any],
+        regenerate: bool = False
     ) -> List[Dict[str, str]]:
         """
         Generate a detailed 10-section startup proposal
@@ -214,12 +837,348 @@ Make reasoning personal by referencing Acontext memory. Return ONLY valid JSON."
         Args:
             selected_idea: The idea user selected
             trend_context: Original trend data for evidence
+            regenerate: Bypass the response cache
+        
+        Returns:
+            List of proposal sections (the fallback proposal's marked "fallback": True)
+        """
+        try:
+            content = await self._complete(
+                model=self.model_advanced,
+                messages=self._proposal_messages(selected_idea, trend_context),
+                temperature=0.7,
+                response_format=PROPOSAL.response_format,
+                method="generate_proposal",
+                regenerate=regenerate
+            )
+            salvage = PROPOSAL.salvage(content)
+            if not salvage.items:
+                raise ValueError(f"no valid proposal sections: {'; '.join(salvage.problems)}")
+            if not salvage.problems:
+                return salvage.items
+            
+            # Only the sections that were lost are written again, one call each
+            self.call_counters["invalid_responses"] += 1
+            print(f"⚠️  Rewriting the invalid proposal sections: {'; '.join(salvage.problems)}")
+            written = await self._write_missing_sections(salvage.items, selected_idea, trend_context, regenerate)
+            self.call_counters["rerequested_items"] += len(written)
+            return _in_section_order(salvage.items + written)
+        
+        except Exception as e:
+            print(f"Error generating proposal: {e}")
+            print("⚠️  Using fallback proposal for testing")
+            return [{**section, "fallback": True} for section in self._get_fallback_proposal(selected_idea)]
+    
+    async def generate_proposal_parallel(
+        self,
+        selected_idea: Dict[str, Any],
+        trend_context: Dict[str, Any],
+        regenerate: bool = False,
+        concurrency: int = 5
+    ) -> List[Dict[str, str]]:
+        """
+        Generate the proposal as one short outline call followed by one call
+        per section, run concurrently
+        
+        Every section sees the same outline so they stay consistent. Simple
+        sections use self.model, hard ones self.model_advanced. A section that
+        fails is replaced by its fallback text (marked "fallback": True)
+        instead of failing the whole proposal.
+        
+        Args:
+            selected_idea: The idea user selected
+            trend_context: Original trend data for evidence
+            regenerate: Bypass the response cache
+            concurrency: Sections generated at once
         
         Returns:
-            List of proposal sections
+            List of proposal sections in PROPOSAL_SECTIONS order
+        """
+        outline = await self._proposal_outline(selected_idea, trend_context, regenerate)
+        slots = asyncio.Semaphore(concurrency)
+        
+        async def write_section(index: int) -> Dict[str, str]:
+            async with slots:
+                return await self._write_section(index, selected_idea, trend_context, outline, regenerate)
+        
+        return list(await asyncio.gather(*(write_section(index) for index in range(len(PROPOSAL_SECTIONS)))))
+    
+    async def _write_section(
+        self,
+        index: int,
+        selected_idea: Dict[str, Any],
+        trend_context: Dict[str, Any],
+        outline: Dict[str, Any],
+        regenerate: bool = False
+    ) -> Dict[str, str]:
+        """One PROPOSAL_SECTIONS section on its own call, or its fallback text (marked "fallback": True)"""
+        title, scope, hard = PROPOSAL_SECTIONS[index]
+        try:
+            content = await self._complete(
+                model=self.model_advanced if hard else self.model,
+                messages=self._section_messages(selected_idea, trend_context, outline, title, scope),
+                temperature=0.7,
+                response_format=SECTION.response_format,
+                method="generate_proposal",
+                regenerate=regenerate
+            )
+            section, problem = SECTION.validate_item(json.loads(content))
+            if section is None:
+                raise ValueError(problem)
+            return {"title": title, "content": section["content"]}
+        except Exception as e:
+            print(f"Error generating proposal section '{title}': {e}")
+            return {**self._get_fallback_proposal(selected_idea)[index], "fallback": True}
+    
+    async def _write_missing_sections(
+        self,
+        sections: List[Dict[str, str]],
+        selected_idea: Dict[str, Any],
+        trend_context: Dict[str, Any],
+        regenerate: bool = False
+    ) -> List[Dict[str, str]]:
+        """The PROPOSAL_SECTIONS missing from sections, each written on its own call"""
+        present = {_section_key(section["title"]) for section in sections}
+        missing = [index for index, (title, _, _) in enumerate(PROPOSAL_SECTIONS) if _section_key(title) not in present]
+        return list(await asyncio.gather(*(
+            self._write_section(index, selected_idea, trend_context, {}, regenerate) for index in missing
+        )))
+    
+    async def regenerate_proposal_sections(
+        self,
+        proposal: List[Dict[str, str]],
+        previous_idea: Dict[str, Any],
+        selected_idea: Dict[str, Any],
+        trend_context: Dict[str, Any],
+        regenerate: bool = False
+    ) -> Tuple[List[Dict[str, str]], List[str]]:
         """
-        idea_summary = json.dumps(selected_idea, indent=2)
-        trend_summary = json.dumps(trend_context, indent=2)
+        Update a proposal for an edited idea, rewriting only the sections
+        that depend on a changed field (SECTION_DEPENDENCIES), one call each
+        
+        Sections missing from proposal or holding fallback text are written
+        as well; every other section is reused as is.
+        
+        Args:
+            proposal: Proposal written for previous_idea
+            previous_idea: The idea before the edit
+            selected_idea: The edited idea
+            trend_context: Original trend data for evidence
+            regenerate: Bypass the response cache
+        
+        Returns:
+            (proposal in PROPOSAL_SECTIONS order, titles of the rewritten sections)
+        """
+        stale = {_section_key(title) for title in affected_sections(changed_fields(previous_idea, selected_idea))}
+        kept = [
+            section for section in proposal
+            if _section_key(section["title"]) not in stale and not section.get("fallback")
+        ]
+        written = await self._write_missing_sections(kept, selected_idea, trend_context, regenerate)
+        self.call_counters["sections_rewritten"] += len(written)
+        self.call_counters["sections_reused"] += len(kept)
+        return _in_section_order(kept + written), [section["title"] for section in written]
+    
+    async def _proposal_outline(
+        self,
+        selected_idea: Dict[str, Any],
+        trend_context: Dict[str, Any],
+        regenerate: bool = False
+    ) -> Dict[str, Any]:
+        """Shared positioning plus 2-3 key points per section ({} if the call fails)"""
+        idea_summary, trend_summary = self._proposal_context(selected_idea, trend_context)
+        section_list = "\n".join(f"- {title} ({scope})" for title, scope, _ in PROPOSAL_SECTIONS)
+        prompt = f"""Plan a startup proposal before it is written section by section.
+
+Selected Idea:
+{idea_summary}
+
+Original Trend Context:
+{trend_summary}
+
+Sections:
+{section_list}
+
+Return JSON:
+{{
+  "positioning": "one sentence every section must agree with",
+  "facts": ["product name, price point, target user and other facts sections must share"],
+  "sections": {{"Problem Statement": ["key point", "key point"], ...}}
+}}
+
+Return ONLY valid JSON."""
+
+        try:
+            content = await self._complete(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are a startup strategist. Return only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.5,
+                method="generate_proposal",
+                regenerate=regenerate
+            )
+            outline = json.loads(content)
+            return outline if isinstance(outline, dict) else {}
+        except Exception as e:
+            print(f"Error generating proposal outline, writing sections without it: {e}")
+            return {}
+    
+    def _proposal_context(self, selected_idea: Dict[str, Any], trend_context: Dict[str, Any]) -> Tuple[str, str]:
+        """Compact idea and trend summaries sharing the proposal prompt budget"""
+        budget = PROMPT_BUDGETS["generate_proposal"]
+        return (
+            fit_object(selected_idea, IDEA_FIELDS, budget // 2),
+            fit_object(trend_context, TREND_FIELDS, budget // 2)
+        )
+    
+    def _section_messages(
+        self,
+        selected_idea: Dict[str, Any],
+        trend_context: Dict[str, Any],
+        outline: Dict[str, Any],
+        title: str,
+        scope: str
+    ) -> List[Dict[str, str]]:
+        idea_summary, trend_summary = self._proposal_context(selected_idea, trend_context)
+        sections = outline.get("sections")
+        key_points = sections.get(title, []) if isinstance(sections, dict) else []
+        prompt = f"""You are a startup strategist writing one section of a 10-section proposal.
+
+Selected Idea:
+{idea_summary}
+
+Original Trend Context:
+{trend_summary}
+
+Positioning: {outline.get("positioning", "")}
+Shared facts: {json.dumps(outline.get("facts", []))}
+
+Write only the section "{title}" ({scope}).
+Key points to cover: {json.dumps(key_points)}
+
+The section should be 2-4 paragraphs, concrete and actionable.
+
+Return JSON:
+{{"title": "{title}", "content": "detailed markdown content here..."}}
+
+Return ONLY valid JSON."""
+
+        return [
+            {"role": "system", "content": "You are a startup strategist. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    async def stream_proposal(
+        self,
+        selected_idea: Dict[str, Any],
+        trend_context: Dict[str, Any],
+        regenerate: bool = False
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Same proposal as generate_proposal, but yields each section as soon
+        as the model has finished writing it
+        
+        Shares the response cache with generate_proposal. Invalid sections
+        are skipped and written again on their own call at the end. If the
+        stream breaks or outlasts the generate_proposal timeout, the sections
+        not yet received come from the fallback proposal (marked "fallback": True).
+        """
+        messages = self._proposal_messages(selected_idea, trend_context)
+        response_format = PROPOSAL.response_format
+        # Same key as generate_proposal, from the preferred model
+        cache_key = make_key(self.model_advanced, 0.7, messages, response_format)
+        
+        cached = self.cache.get(cache_key) if self.cache is not None and not regenerate else None
+        if cached is not None:
+            for section in PROPOSAL.salvage(cached).items:
+                yield section
+            return
+        
+        model = self.model_advanced
+        if self.router is not None:
+            model = self.router.route("generate_proposal", model, count_tokens(compact_json(messages))).model
+        
+        sections = []
+        invalid = 0
+        parser = JsonArrayStreamParser()
+        kind = f"{model}:generate_proposal"
+        estimate = self._estimate_tokens(messages, kind)
+        timeout = LLM_TIMEOUTS["generate_proposal"]
+        deadline = time.monotonic() + timeout
+        stream = None
+        start = None
+        usage = None
+        error = None
+        try:
+            raw, start = await asyncio.wait_for(self._send(
+                model, messages, 0.7, response_format, kind, estimate,
+                stream=True, stream_options={"include_usage": True}
+            ), timeout)
+            stream = raw.parse()
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - time.monotonic()))
+                except StopAsyncIteration:
+                    break
+                # The last chunk carries the token usage and no choices
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                for entry in parser.feed(delta):
+                    section, _ = PROPOSAL.validate_item(entry)
+                    if section is None:
+                        invalid += 1
+                        continue
+                    sections.append(section)
+                    yield section
+        
+        except Exception as e:
+            error = e
+        finally:
+            # Also runs when the client disconnects (GeneratorExit) or the
+            # request is cancelled, so the upstream connection is released
+            if stream is not None:
+                await stream.close()
+            if start is not None:
+                self.latencies.record(kind, time.monotonic() - start)
+        
+        if error is not None:
+            if isinstance(error, asyncio.TimeoutError):
+                self.call_counters["timeouts"] += 1
+            elif start is not None and self.router is not None:
+                # _send records failed requests; this stream broke after it started
+                self.router.record(model, time.monotonic() - start, ok=False)
+            print(f"Error streaming proposal: {error!r}")
+            print("⚠️  Using fallback proposal for the remaining sections")
+            present = {_section_key(section["title"]) for section in sections}
+            for index, section in enumerate(self._get_fallback_proposal(selected_idea)):
+                if _section_key(PROPOSAL_SECTIONS[index][0]) not in present:
+                    yield {**section, "fallback": True}
+            return
+        
+        if self.router is not None:
+            self.router.record(model, time.monotonic() - start, ok=True)
+        self._record_usage(model, kind, estimate, usage)
+        
+        if invalid or not parser.closed:
+            self.call_counters["invalid_responses"] += 1
+            print(f"⚠️  Rewriting {invalid} invalid proposal section(s)")
+            written = await self._write_missing_sections(sections, selected_idea, trend_context, regenerate)
+            self.call_counters["rerequested_items"] += len(written)
+            for section in written:
+                yield section
+            return
+        
+        if self.cache is not None and self._is_cacheable(parser.text, response_format):
+            self.cache.set(cache_key, parser.text, ttl=LLM_CACHE_TTL["generate_proposal"])
+    
+    def _proposal_messages(self, selected_idea: Dict[str, Any], trend_context: Dict[str, Any]) -> List[Dict[str, str]]:
+        idea_summary, trend_summary = self._proposal_context(selected_idea, trend_context)
         
         prompt = f"""You are a startup strategist writing a detailed proposal.
 
@@ -245,47 +1204,24 @@ Write a comprehensive 10-section proposal:
 Each section should be 2-4 paragraphs, concrete and actionable.
 
 Return JSON:
-[
-  {{
-    "title": "Problem Statement",
-    "content": "detailed markdown content here..."
-  }},
-  ...
-]
+{{
+  "sections": [
+    {{
+      "title": "Problem Statement",
+      "content": "detailed markdown content here..."
+    }},
+    ...
+  ]
+}}
 
 Return ONLY valid JSON."""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model_advanced,
-                messages=[
-                    {"role": "system", "content": "You are a startup strategist. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"}
-            )
-            
-            content = response.choices[0].message.content
-            parsed = json.loads(content)
-            
-            # Extract array
-            if isinstance(parsed, dict) and 'sections' in parsed:
-                return parsed['sections']
-            elif isinstance(parsed, list):
-                return parsed
-            else:
-                first_value = next(iter(parsed.values()))
-                if isinstance(first_value, list):
-                    return first_value
-                return []
-        
-        except Exception as e:
-            print(f"Error generating proposal: {e}")
-            print("⚠️  Using fallback proposal for testing")
-            return self._get_fallback_proposal(selected_idea)
+        return [
+            {"role": "system", "content": "You are a startup strategist. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
     
-    def generate_mvp_plan(self, proposal: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    async def generate_mvp_plan(self, proposal: List[Dict[str, str]], regenerate: bool = False) -> List[Dict[str, str]]:
         """
         Generate MVP build steps from proposal
         
@@ -307,39 +1243,30 @@ Generate 10-15 build steps for a Next.js MVP with:
 - Sample data seeding
 
 Return JSON:
-[
-  {{"step": "init", "message": "🎯 Initializing project: [name]"}},
-  {{"step": "scaffold", "message": "📁 Creating Next.js 14 app structure..."}},
-  ...
-  {{"step": "complete", "message": "🚀 MVP ready! Run: cd [name] && npm run dev"}}
-]
+{{
+  "steps": [
+    {{"step": "init", "message": "🎯 Initializing project: [name]"}},
+    {{"step": "scaffold", "message": "📁 Creating Next.js 14 app structure..."}},
+    ...
+    {{"step": "complete", "message": "🚀 MVP ready! Run: cd [name] && npm run dev"}}
+  ]
+}}
 
 Return ONLY valid JSON."""
 
         try:
-            response = self.client.chat.completions.create(
+            return await self._complete_items(
+                MVP_STEPS,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a developer. Return only valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5,
-                response_format={"type": "json_object"}
+                method="generate_mvp_plan",
+                regenerate=regenerate,
+                rerequest=False  # replacements would land after the final step
             )
-            
-            content = response.choices[0].message.content
-            parsed = json.loads(content)
-            
-            # Extract array
-            if isinstance(parsed, dict) and 'steps' in parsed:
-                return parsed['steps']
-            elif isinstance(parsed, list):
-                return parsed
-            else:
-                first_value = next(iter(parsed.values()))
-                if isinstance(first_value, list):
-                    return first_value
-                return []
         
         except Exception as e:
             print(f"Error generating MVP plan: {e}")
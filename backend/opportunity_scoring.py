@@ -0,0 +1,91 @@
+"""
+Opportunity Scoring
+
+Computes trend opportunity scores locally from the LLM's 0-10 sub-scores
+instead of trusting a score the model made up:
+
+    raw = Σ weight × sub-score         (default: 2·momentum + 3·pain - competition - complexity)
+    score = raw scaled to 0-100 over the range the weights allow
+
+Scoring is one matrix-vector product over all trends, so re-ranking stored
+trends under different weights (e.g. per tenant) never needs the LLM.
+"""
+
+import math
+from dataclasses import dataclass, asdict, fields
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SUB_SCORES = ("momentum", "pain", "competition", "complexity")
+NEUTRAL_SUB_SCORE = 5.0
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    momentum: float = 2.0
+    pain: float = 3.0
+    competition: float = -1.0
+    complexity: float = -1.0
+
+    @classmethod
+    def from_dict(cls, values: Optional[Dict[str, Any]]) -> "ScoringWeights":
+        """Weights from a partial mapping; unknown keys are rejected"""
+        values = values or {}
+        unknown = set(values) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown scoring weights: {', '.join(sorted(unknown))}")
+        weights = cls(**{name: float(value) for name, value in values.items()})
+        # JSON bodies may carry NaN or Infinity, which would poison every score
+        if not all(math.isfinite(weight) for weight in weights.vector()):
+            raise ValueError("Scoring weights must be finite numbers")
+        if not any(weights.vector()):
+            raise ValueError("At least one scoring weight must be non-zero")
+        return weights
+
+    def vector(self) -> np.ndarray:
+        return np.array([getattr(self, name) for name in SUB_SCORES], dtype=np.float64)
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+DEFAULT_WEIGHTS = ScoringWeights()
+
+
+def sub_score_matrix(trends: List[Dict[str, Any]]) -> np.ndarray:
+    """n x 4 matrix of sub-scores clipped to 0-10 (missing or invalid ones are neutral)"""
+    matrix = np.full((len(trends), len(SUB_SCORES)), NEUTRAL_SUB_SCORE)
+    for row, trend in enumerate(trends):
+        for column, name in enumerate(SUB_SCORES):
+            try:
+                matrix[row, column] = float(trend.get(name, NEUTRAL_SUB_SCORE))
+            except (TypeError, ValueError):
+                pass
+    np.nan_to_num(matrix, copy=False, nan=NEUTRAL_SUB_SCORE)
+    return np.clip(matrix, 0.0, 10.0)
+
+
+def compute_scores(trends: List[Dict[str, Any]], weights: ScoringWeights = DEFAULT_WEIGHTS) -> np.ndarray:
+    """0-100 opportunity scores of all trends"""
+    if not trends:
+        return np.zeros(0)
+
+    w = weights.vector()
+    raw = sub_score_matrix(trends) @ w
+    lowest = np.minimum(w, 0).sum() * 10
+    highest = np.maximum(w, 0).sum() * 10
+    return np.rint((raw - lowest) / (highest - lowest) * 100)
+
+
+def rank_trends(trends: List[Dict[str, Any]], weights: ScoringWeights = DEFAULT_WEIGHTS) -> List[Dict[str, Any]]:
+    """
+    Copies of the trends scored under weights, best first
+
+    The input trends are left untouched; they may be shared with other
+    sessions (e.g. through the semantic cache).
+    """
+    scores = compute_scores(trends, weights)
+    scored = [{**trend, "score": int(score)} for trend, score in zip(trends, scores)]
+    # Stable: ties keep their clustering order
+    return [scored[i] for i in np.argsort(-scores, kind="stable")]
@@ -0,0 +1,233 @@
+"""
+Structured Output Schemas
+
+One schema per LLM stage (trends, cluster names, ideas, proposal sections,
+MVP steps), used twice:
+- as a strict json_schema response format, so the model can only return
+  the expected shape instead of one of several shapes we have to guess
+- as a compiled pydantic validator for the answer, run per item, so a bad
+  item costs only that item instead of the whole paid completion
+
+Validation repairs what it safely can (scores clamped to 0-10, numbers as
+text, a string where a list of strings belongs, defaults for optional
+fields). Items that still fail are reported, so the caller can re-request
+only those.
+"""
+
+import re
+import json
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, ValidationError, create_model
+
+from json_stream import JsonArrayStreamParser
+
+# JSON Schema keywords kept in the strict response format; the rest (titles,
+# defaults, string lengths) are only checked locally
+STRICT_KEYWORDS = {
+    "type", "properties", "required", "additionalProperties", "items", "enum",
+    "minimum", "maximum", "description", "anyOf", "$ref", "$defs"
+}
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _clamp_score(value: Any) -> Any:
+    """9, "9", "9/10" or 12 -> a 0-10 integer; anything else is left for the validator to reject"""
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        value = float(match.group()) if match else value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return min(10, max(0, round(value)))
+    return value
+
+
+def _as_list(value: Any) -> Any:
+    return [value] if isinstance(value, str) else value
+
+
+def _objects_only(value: Any) -> Any:
+    return [entry for entry in value if isinstance(entry, dict)] if isinstance(value, list) else value
+
+
+def _as_text(value: Any) -> Any:
+    return json.dumps(value, indent=2) if isinstance(value, (dict, list)) else value
+
+
+Score = Annotated[int, BeforeValidator(_clamp_score), Field(ge=0, le=10)]
+Text = Annotated[str, Field(min_length=1)]
+Strings = Annotated[List[str], BeforeValidator(_as_list)]
+
+
+class _Item(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True, str_strip_whitespace=True)
+
+
+class Evidence(_Item):
+    source: str
+    url: str
+    snippet: str
+
+
+class Trend(_Item):
+    id: str
+    title: Text
+    momentum: Score
+    pain: Score
+    competition: Score
+    complexity: Score
+    painPoints: Strings
+    evidence: Annotated[List[Evidence], BeforeValidator(_objects_only)]
+
+
+class ClusterName(_Item):
+    cluster_id: Text
+    title: Text
+    momentum: Score
+    pain: Score
+    competition: Score
+    complexity: Score
+    painPoints: Strings
+
+
+class Idea(_Item):
+    id: str
+    title: Text
+    tagline: Text
+    reasoning: Text
+    market: str
+    wedge: str
+    mvpTime: str
+    recommended: bool
+
+
+class Section(_Item):
+    title: Text
+    content: Annotated[Text, BeforeValidator(_as_text)]
+
+
+class MvpStep(_Item):
+    step: str
+    message: Text
+
+
+def strict_schema(schema: Any) -> Any:
+    """Copy of a pydantic JSON schema as OpenAI strict mode accepts it"""
+    if isinstance(schema, list):
+        return [strict_schema(value) for value in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    strict = {}
+    for keyword, value in schema.items():
+        if keyword in ("properties", "$defs"):
+            strict[keyword] = {name: strict_schema(sub) for name, sub in value.items()}
+        elif keyword in STRICT_KEYWORDS:
+            strict[keyword] = strict_schema(value)
+    if strict.get("type") == "object":
+        strict["required"] = list(strict.get("properties", {}))
+        strict["additionalProperties"] = False
+    return strict
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}" for e in error.errors()[:3]
+    )
+
+
+@dataclass
+class Salvage:
+    items: List[Dict[str, Any]]
+    problems: List[str] = field(default_factory=list)
+
+
+class OutputSchema:
+    def __init__(self, name: str, item: Type[BaseModel], key: Optional[str] = None, defaults: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            name: Schema name sent to the API
+            item: Model of one item
+            key: Field of the root object holding the list of items (None if
+                the root object is the single item)
+            defaults: Values for fields an item may leave out
+        """
+        self.name = name
+        self.item = item
+        self.key = key
+        self.defaults = defaults or {}
+        self.root = create_model(name, **{key: (List[item], ...)}) if key else item
+        self.response_format = {
+            "type": "json_schema",
+            "json_schema": {"name": name, "strict": True, "schema": strict_schema(self.root.model_json_schema())}
+        }
+
+    def salvage(self, content: Optional[str]) -> Salvage:
+        """
+        Valid items of a response, repaired where possible, plus a
+        description of everything that had to be dropped
+        """
+        # Fast path: the whole response is valid, checked in one pass without json.loads
+        try:
+            root = self.root.model_validate_json(content or "")
+            items = getattr(root, self.key) if self.key else [root]
+            return Salvage([item.model_dump() for item in items])
+        except ValidationError:
+            pass
+
+        problems = []
+        try:
+            data = json.loads(content or "")
+        except ValueError:
+            # Cut off or malformed: keep the array elements that are complete
+            data = {self.key: JsonArrayStreamParser().feed(content or "")} if self.key else None
+            problems.append("the JSON was cut off or malformed")
+
+        if self.key:
+            entries = data.get(self.key) if isinstance(data, dict) else data
+        else:
+            entries = [data] if data is not None else []
+        if not isinstance(entries, list):
+            entries = []
+            problems.append(f'missing the "{self.key}" list')
+
+        items = []
+        for position, entry in enumerate(entries, start=1):
+            item, problem = self.validate_item(entry)
+            if item is not None:
+                items.append(item)
+            else:
+                problems.append(f"item {position}: {problem}")
+        return Salvage(items, problems)
+
+    def validate_item(self, entry: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(repaired item, None) or (None, what is wrong with it)"""
+        if isinstance(entry, dict):
+            entry = {**self.defaults, **{k: v for k, v in entry.items() if v is not None}}
+        try:
+            return self.item.model_validate(entry).model_dump(), None
+        except ValidationError as e:
+            return None, _describe(e)
+
+
+TRENDS = OutputSchema("trends", Trend, key="trends", defaults={"id": "", "painPoints": [], "evidence": []})
+CLUSTER_NAMES = OutputSchema(
+    "cluster_names", ClusterName, key="trends",
+    defaults={"momentum": 5, "pain": 5, "competition": 5, "complexity": 5, "painPoints": []}
+)
+IDEAS = OutputSchema(
+    "ideas", Idea, key="ideas",
+    defaults={"id": "", "market": "", "wedge": "", "mvpTime": "", "recommended": False}
+)
+PROPOSAL = OutputSchema("proposal", Section, key="sections")
+SECTION = OutputSchema("proposal_section", Section)
+MVP_STEPS = OutputSchema("mvp_steps", MvpStep, key="steps", defaults={"step": "step"})
+
+SCHEMAS = {schema.name: schema for schema in (TRENDS, CLUSTER_NAMES, IDEAS, PROPOSAL, SECTION, MVP_STEPS)}
+
+
+def schema_for(response_format: Optional[Dict[str, Any]]) -> Optional[OutputSchema]:
+    """The OutputSchema a json_schema response format was built from (None for plain JSON)"""
+    json_schema = (response_format or {}).get("json_schema") or {}
+    return SCHEMAS.get(json_schema.get("name"))
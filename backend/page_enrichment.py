@@ -0,0 +1,177 @@
+"""
+Page Enrichment
+
+Fetches the pages behind the top raw trend items through the Bright Data
+request endpoint and keeps a compressed main-text extract next to each item,
+so clustering sees more than the SERP snippet.
+
+Memory stays flat regardless of how many pages are enriched:
+- responses are streamed and cut off after max_bytes
+- HTML is parsed incrementally and only max_chars of text are kept
+- at most `concurrency` pages are in flight
+"""
+
+import os
+import re
+import zlib
+import base64
+import codecs
+import asyncio
+from html.parser import HTMLParser
+from typing import List, Dict, Any, Optional
+
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "nav", "header", "footer", "aside", "form", "button", "select"
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "li", "br", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "td", "th", "blockquote"
+}
+WHITESPACE = re.compile(r"\s+")
+
+
+class MainTextExtractor(HTMLParser):
+    """Incremental HTML-to-text extractor that stops keeping text after max_chars"""
+
+    def __init__(self, max_chars: int = 4000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.title = ""
+        self._parts: List[str] = []
+        self._length = 0
+        self._skip_depth = 0
+        self._in_title = False
+
+    @property
+    def full(self) -> bool:
+        return self._length >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in BLOCK_TAGS and self._parts and self._parts[-1] != "\n":
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title = (self.title + data).strip()[:300]
+            return
+        if self._skip_depth or self.full:
+            return
+
+        # Text nodes arrive in pieces split wherever a network chunk ended,
+        # so pieces are joined as is and whitespace is normalized in text()
+        text = WHITESPACE.sub(" ", data)
+        if not text.strip():
+            if self._parts and self._parts[-1] not in (" ", "\n"):
+                self._parts.append(" ")
+            return
+
+        text = text[:self.max_chars - self._length]
+        self._parts.append(text)
+        self._length += len(text)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self._parts).split("\n"))
+        return "\n".join(line for line in lines if line)[:self.max_chars]
+
+
+def compress_extract(text: str) -> str:
+    return base64.b64encode(zlib.compress(text.encode("utf-8"), 6)).decode("ascii")
+
+
+def decompress_extract(item: Dict[str, Any]) -> str:
+    """Main text stored on an enriched item, or "" if it wasn't enriched"""
+    blob = item.get("extract_z")
+    if not blob:
+        return ""
+    return zlib.decompress(base64.b64decode(blob)).decode("utf-8")
+
+
+class PageEnricher:
+    def __init__(
+        self,
+        collector,
+        zone: Optional[str] = None,
+        concurrency: int = 4,
+        max_bytes: int = 512 * 1024,
+        max_chars: int = 4000,
+        timeout: float = 10.0
+    ):
+        """
+        Args:
+            collector: BrightDataCollector whose pooled client, token and rate limiters are reused
+            zone: Bright Data Web Unlocker zone used to fetch pages
+            concurrency: Pages fetched at once (global for this enricher)
+            max_bytes: Bytes read per page before the download is cut off
+            max_chars: Characters of main text kept per page
+            timeout: Seconds per page download, not counting the wait for a
+                free slot or the zone's rate limit
+        """
+        self.collector = collector
+        self.zone = zone or os.getenv('BRIGHTDATA_UNLOCKER_ZONE', "web_unlocker1")
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def fetch_extract(self, url: str) -> Dict[str, Any]:
+        """Stream one page and return its title and main text"""
+        extractor = MainTextExtractor(self.max_chars)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        await self.collector.zone_limiter(self.zone).acquire()
+
+        async with self._slots:
+            # Only the download is timed, so pages queued behind the limits still get their turn
+            received = await asyncio.wait_for(self._stream_page(url, extractor, decoder), timeout=self.timeout)
+
+        extractor.feed(decoder.decode(b"", final=True))
+        extractor.close()
+        return {"title": extractor.title, "text": extractor.text(), "bytes": min(received, self.max_bytes)}
+
+    async def _stream_page(self, url: str, extractor: MainTextExtractor, decoder: codecs.IncrementalDecoder) -> int:
+        """Feed the page to extractor until max_bytes or max_chars; returns the bytes received"""
+        received = 0
+        client = self.collector._get_client()
+        data = {"zone": self.zone, "url": url, "format": "raw"}
+        async with client.stream("POST", self.collector.base_url, json=data, timeout=self.timeout) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                extractor.feed(decoder.decode(chunk[:max(0, self.max_bytes - (received - len(chunk)))]))
+                if received >= self.max_bytes or extractor.full:
+                    break
+        return received
+
+    async def enrich(self, items: List[Dict[str, Any]], top_n: int = 10) -> Dict[str, int]:
+        """
+        Attach compressed extracts to the first top_n items with a URL (in place)
+
+        Returns counts of enriched and failed pages.
+        """
+        targets = [item for item in items if item.get("url", "").startswith("http") and "extract_z" not in item][:top_n]
+
+        async def enrich_one(item):
+            try:
+                page = await self.fetch_extract(item["url"])
+            except Exception as e:
+                print(f"Page enrichment failed for {item['url']}: {e!r}")
+                return False
+            if not page["text"]:
+                return False
+            item["extract_z"] = compress_extract(page["text"])
+            item["extract_chars"] = len(page["text"])
+            return True
+
+        results = await asyncio.gather(*(enrich_one(item) for item in targets))
+        enriched = sum(results)
+        return {"enriched": enriched, "failed": len(results) - enriched}
@@ -0,0 +1,138 @@
+"""
+Prompt Builder
+
+Compact, token-budgeted serialization of the data that goes into LLM prompts:
+- only the fields a stage needs, no indentation, long text truncated
+- items ranked by relevance and packed until the stage's token budget is used
+
+Tokens are counted with tiktoken when its encoding is available and
+estimated from the character count otherwise (e.g. offline, where tiktoken
+cannot download its encoding files).
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from page_enrichment import decompress_extract
+
+# Input token budgets per stage (the prompt template itself comes on top)
+PROMPT_BUDGETS = {
+    "cluster_trends": 6000,
+    "generate_ideas": 1200,
+    "generate_proposal": 1200,
+}
+
+# Fields kept per kind of object, with the character limit of each text field
+RAW_ITEM_FIELDS = {"title": 160, "source": 40, "url": 200, "snippet": 280, "page_text": 600}
+TREND_FIELDS = {"title": 160, "score": None, "momentum": None, "pain": None, "competition": None,
+                "complexity": None, "painPoints": 200, "evidence": None}
+EVIDENCE_FIELDS = {"source": 40, "url": 200, "snippet": 200}
+IDEA_FIELDS = {"title": 160, "tagline": 200, "reasoning": 600, "market": 200, "wedge": 300, "mvpTime": 40}
+
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o / gpt-4o-mini
+        except Exception as e:
+            print(f"⚠️  tiktoken encoding unavailable, estimating tokens from length: {e}")
+            _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def truncate(text: str, limit: Optional[int]) -> str:
+    text = " ".join(str(text).split())
+    if limit is None or len(text) <= limit:
+        return text
+    return text[:limit - 1].rstrip() + "…"
+
+
+def slim(obj: Dict[str, Any], fields: Dict[str, Optional[int]]) -> Dict[str, Any]:
+    """Copy of obj with only the listed fields, text truncated to each field's limit"""
+    slimmed = {}
+    for field, limit in fields.items():
+        value = obj.get(field)
+        if value is None or value == "" or value == []:
+            continue
+        if field == "evidence" and isinstance(value, list):
+            value = [slim(e, EVIDENCE_FIELDS) for e in value[:5] if isinstance(e, dict)]
+        elif isinstance(value, str):
+            value = truncate(value, limit)
+        elif isinstance(value, list) and limit is not None:
+            value = [truncate(v, limit) if isinstance(v, str) else v for v in value[:5]]
+        slimmed[field] = value
+    return slimmed
+
+
+def raw_item_view(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Prompt fields of a scraped item (enriched items carry their page text)"""
+    view = dict(item)
+    if "extract_z" in item:
+        view["page_text"] = decompress_extract(item)
+    slimmed = slim(view, RAW_ITEM_FIELDS)
+    if item.get("also_seen"):
+        slimmed["also_on"] = sorted({s.get("source", "") for s in item["also_seen"] if isinstance(s, dict)})
+    return slimmed
+
+
+def raw_item_relevance(item: Dict[str, Any]) -> float:
+    """Higher for well-ranked results of heavier sources that other sources corroborate"""
+    rank = item.get("rank") or 10
+    corroboration = 1 + 0.5 * len(item.get("also_seen") or [])
+    enriched = 1.2 if "extract_z" in item else 1.0
+    return item.get("weight", 1.0) * corroboration * enriched / (1 + 0.1 * rank)
+
+
+def pack_items(
+    items: Iterable[Dict[str, Any]],
+    budget: int,
+    view: Callable[[Dict[str, Any]], Dict[str, Any]] = raw_item_view,
+    relevance: Callable[[Dict[str, Any]], float] = raw_item_relevance
+) -> Tuple[str, int]:
+    """
+    Serialize the most relevant items that fit in budget tokens
+
+    Returns the compact JSON array and the number of items packed. Items too
+    big for the remaining budget are skipped so smaller ones can still fit.
+    """
+    ranked = sorted(items, key=relevance, reverse=True)
+    packed: List[str] = []
+    used = 2  # the brackets
+
+    for item in ranked:
+        serialized = compact_json(view(item))
+        cost = count_tokens(serialized) + 1
+        if used + cost > budget:
+            continue
+        packed.append(serialized)
+        used += cost
+
+    return "[" + ",".join(packed) + "]", len(packed)
+
+
+def fit_object(obj: Dict[str, Any], fields: Dict[str, Optional[int]], budget: int) -> str:
+    """Compact JSON of one object's fields, halving text limits until it fits budget tokens"""
+    limits = dict(fields)
+    serialized = compact_json(slim(obj, limits))
+    while count_tokens(serialized) > budget and any(limit and limit > 40 for limit in limits.values()):
+        limits = {field: (limit // 2 if limit and limit > 40 else limit) for field, limit in limits.items()}
+        serialized = compact_json(slim(obj, limits))
+    return serialized
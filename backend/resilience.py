@@ -0,0 +1,186 @@
+"""
+Resilience Primitives
+
+Shared by the integrations that call rate-limited external APIs:
+- TokenBucket: async rate limiter (requests or tokens per second)
+- CircuitBreaker: stop calling a dependency after repeated failures
+- SourceScoreboard: rolling latency/error stats that drop persistently bad sources
+"""
+
+import time
+import asyncio
+from typing import Dict, Any, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency that is currently switched off"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Burst size (defaults to one second worth of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """Take tokens without waiting; False if not enough are available"""
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    async def acquire(self, amount: float = 1.0):
+        """
+        Wait until amount tokens are available and take them (FIFO between waiters)
+
+        An amount above capacity waits for a full bucket and is then charged in
+        full, leaving the bucket in debt until the refill has paid it back.
+        """
+        needed = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= needed:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((needed - self.tokens) / self.rate)
+
+    def credit(self, amount: float):
+        """Give back (or, if negative, take) tokens after the real cost is known"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self, seconds: float):
+        """Empty the bucket so that no tokens are available for the next seconds"""
+        self._refill()
+        self.tokens = min(self.tokens, -self.rate * seconds)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before letting one probe through
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (half-open admits a single probe)"""
+        if self.state == "closed":
+            return True
+
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self.state = "half_open"
+            self._probe_in_flight = False
+
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self._opened_at = time.monotonic()
+
+    def abandon(self):
+        """A call was cancelled by the caller: neither success nor failure"""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures}
+
+
+class SourceScoreboard:
+    def __init__(
+        self,
+        latency_threshold: float = 8.0,
+        error_threshold: float = 0.5,
+        min_samples: int = 5,
+        drop_for: float = 300.0,
+        alpha: float = 0.3
+    ):
+        """
+        Args:
+            latency_threshold: EWMA latency (seconds) above which a source is dropped
+            error_threshold: EWMA error rate above which a source is dropped
+            min_samples: Calls needed before a source can be judged
+            drop_for: Seconds a dropped source is skipped before it gets another chance
+            alpha: EWMA smoothing factor
+        """
+        self.latency_threshold = latency_threshold
+        self.error_threshold = error_threshold
+        self.min_samples = min_samples
+        self.drop_for = drop_for
+        self.alpha = alpha
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, name: str) -> Dict[str, float]:
+        return self._stats.setdefault(
+            name, {"samples": 0, "latency": 0.0, "error_rate": 0.0, "calls": 0, "errors": 0, "dropped_until": 0.0}
+        )
+
+    def record(self, name: str, latency: float, ok: bool):
+        entry = self._entry(name)
+        first = entry["samples"] == 0
+        entry["samples"] += 1
+        entry["calls"] += 1
+        entry["errors"] += 0 if ok else 1
+        entry["latency"] = latency if first else (1 - self.alpha) * entry["latency"] + self.alpha * latency
+        error = 0.0 if ok else 1.0
+        entry["error_rate"] = error if first else (1 - self.alpha) * entry["error_rate"] + self.alpha * error
+
+        if entry["samples"] >= self.min_samples and (
+            entry["latency"] > self.latency_threshold or entry["error_rate"] > self.error_threshold
+        ):
+            print(f"⚠️  Dropping source {name} for {self.drop_for:.0f}s "
+                  f"(latency {entry['latency']:.1f}s, error rate {entry['error_rate']:.0%})")
+            entry["dropped_until"] = time.monotonic() + self.drop_for
+            entry["samples"] = 0
+
+    def is_dropped(self, name: str) -> bool:
+        return self._entry(name)["dropped_until"] > time.monotonic()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "latency": round(entry["latency"], 3),
+                "error_rate": round(entry["error_rate"], 3),
+                "calls": int(entry["calls"]),
+                "errors": int(entry["errors"]),
+                "dropped": self.is_dropped(name)
+            }
+            for name, entry in self._stats.items()
+        }
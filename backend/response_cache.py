@@ -0,0 +1,251 @@
+"""
+Response Cache
+
+Two-tier TTL cache shared by the integrations:
+- In-memory LRU for hot keys
+- SQLite store on disk so entries survive restarts and are shared by workers
+
+Disk writes are batched: new rows and last-access times are queued and written
+in one transaction at most flush_interval seconds later (sooner once
+max_pending entries are queued), so lookups and sets on the event loop don't
+pay for a commit each. A timer thread writes the queue out when no later call
+does.
+
+Values must be JSON-serializable.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_DIR = Path(os.getenv('STARTUP_HUNTER_CACHE_DIR', Path(__file__).parent / ".cache"))
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts"""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        name: str,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 5000,
+        default_ttl: float = 3600,
+        cache_dir: Optional[Path] = None,
+        flush_interval: float = 1.0,
+        max_pending: int = 64
+    ):
+        """
+        Args:
+            name: Table/file name, one per cache user (e.g. "serp", "llm")
+            max_memory_entries: LRU size of the in-memory tier
+            max_disk_entries: Row limit of the on-disk tier (least recently used rows are evicted)
+            default_ttl: Seconds an entry stays valid when set() gets no ttl
+            cache_dir: Directory for the SQLite file, None for memory-only
+            flush_interval: Seconds queued disk writes may wait before they are committed
+            max_pending: Queued disk writes that force a commit regardless of the interval
+        """
+        self.name = name
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.default_ttl = default_ttl
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "flushes": 0}
+
+        # Disk writes not committed yet: new rows (key -> value JSON, expires_at, accessed_at)
+        # and the last-access times of disk hits (key -> accessed_at)
+        self._pending: Dict[str, Tuple[str, float, float]] = {}
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.time()
+        self._flush_timer: Optional[threading.Timer] = None
+
+        self._db: Optional[sqlite3.Connection] = None
+        if cache_dir is not None:
+            try:
+                Path(cache_dir).mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(Path(cache_dir) / f"{name}.sqlite3"), check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON entries(accessed_at)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Disk cache '{name}' unavailable, using memory only: {e}")
+                self._db = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None if missing/expired"""
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    # A row still waiting to be written is newer than anything on disk
+                    row = self._pending.get(key)
+                    if row is None:
+                        row = self._db.execute(
+                            "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+                        ).fetchone()
+                    # Expired rows are left for the next flush to delete
+                    if row is not None and row[1] > now:
+                        value = json.loads(row[0])
+                        self._remember(key, row[1], value)
+                        self.stats["disk_hits"] += 1
+                        if key not in self._pending:
+                            self._touched[key] = now
+                        self._maybe_flush(now)
+                        return value
+                except sqlite3.Error as e:
+                    print(f"⚠️  Disk cache '{self.name}' read failed: {e}")
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a value in both tiers"""
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.default_ttl)
+
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self.stats["sets"] += 1
+
+            if self._db is not None:
+                try:
+                    self._pending[key] = (json.dumps(value), expires_at, now)
+                except (TypeError, ValueError) as e:
+                    print(f"⚠️  Disk cache '{self.name}' write failed: {e}")
+                    return
+                self._touched.pop(key, None)
+                self._maybe_flush(now)
+
+    def flush(self):
+        """Write queued rows and access times to disk now"""
+        with self._lock:
+            self._flush(time.time())
+
+    def delete(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+            self._pending.pop(key, None)
+            self._touched.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._pending.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._flush(time.time())
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current sizes and hit rate"""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _maybe_flush(self, now: float):
+        if (
+            len(self._pending) + len(self._touched) >= self.max_pending
+            or now - self._last_flush >= self.flush_interval
+        ):
+            self._flush(now)
+        elif (self._pending or self._touched) and self._flush_timer is None:
+            # Quiet traffic: don't leave the queue waiting for the next call
+            self._flush_timer = threading.Timer(self.flush_interval - (now - self._last_flush), self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+            self._flush(time.time())
+
+    def _flush(self, now: float):
+        """Write the queued rows and access times in one transaction (caller holds the lock)"""
+        pending, touched = self._pending, self._touched
+        self._pending, self._touched = {}, {}
+        self._last_flush = now
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._db is None or not (pending or touched):
+            return
+
+        try:
+            if pending:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    [(key, value, expires_at, accessed_at) for key, (value, expires_at, accessed_at) in pending.items()]
+                )
+            if touched:
+                self._db.executemany(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                    [(accessed_at, key) for key, accessed_at in touched.items()]
+                )
+            # Recent access times are on disk before the least recently used rows are picked
+            self._evict_disk(now)
+            self._db.commit()
+            self.stats["flushes"] += 1
+        except sqlite3.Error as e:
+            self._db.rollback()
+            print(f"⚠️  Disk cache '{self.name}' write failed: {e}")
+
+    def _evict_disk(self, now: float):
+        """Drop expired rows, then the least recently used ones above the size limit"""
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.stats["evictions"] += overflow
@@ -0,0 +1,156 @@
+"""
+Seen-URL Store
+
+Persistent per-domain record of the trend URLs already collected, used for
+delta crawls that only return items that are new since the last run.
+
+Each URL is stored as an 8-byte hash of its canonical form, so the on-disk
+set stays compact even for domains that are refreshed often. URLs are
+forgotten ttl seconds after they were first seen, so the set doesn't grow
+without bound and a long-lived page can count as new again.
+"""
+
+import time
+import struct
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+
+from trend_dedup import canonicalize_url
+
+
+def url_fingerprint(item: Dict[str, Any]) -> int:
+    """Signed 64-bit hash of the item's canonical URL (title when it has none)"""
+    key = canonicalize_url(item.get("url", "")) or item.get("title", "").strip().lower()
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return struct.unpack(">q", digest)[0]
+
+
+def normalize_domain(domain: str) -> str:
+    return " ".join((domain or "startup trends").lower().split())
+
+
+class SeenUrlStore:
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        name: str = "seen_urls",
+        ttl: Optional[float] = 30 * 24 * 60 * 60
+    ):
+        """
+        Args:
+            cache_dir: Directory for the SQLite file, None for memory-only
+            name: File name of the store
+            ttl: Seconds a URL stays seen after it was first seen (None: forever)
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # first_seen per fingerprint, per domain
+        self._loaded: Dict[str, Dict[int, float]] = {}
+
+        path = ":memory:"
+        if cache_dir is not None:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            path = str(Path(cache_dir) / f"{name}.sqlite3")
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "domain TEXT NOT NULL, fingerprint INTEGER NOT NULL, first_seen REAL NOT NULL, "
+            "PRIMARY KEY (domain, fingerprint)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS crawls (domain TEXT PRIMARY KEY, last_crawl REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def _fingerprints(self, domain: str) -> Dict[int, float]:
+        if domain not in self._loaded:
+            rows = self._db.execute("SELECT fingerprint, first_seen FROM seen WHERE domain = ?", (domain,))
+            self._loaded[domain] = {fingerprint: first_seen for fingerprint, first_seen in rows}
+        return self._loaded[domain]
+
+    def _seen_after(self, now: float) -> float:
+        """Earliest first_seen that still counts as seen"""
+        return now - self.ttl if self.ttl is not None else float("-inf")
+
+    def filter_new(self, domain: str, items: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Items not seen for domain yet, without recording anything"""
+        now = now if now is not None else time.time()
+        cutoff = self._seen_after(now)
+        with self._lock:
+            seen = self._fingerprints(normalize_domain(domain))
+            fresh = []
+            batch: Set[int] = set()
+            for item in items:
+                fingerprint = url_fingerprint(item)
+                if seen.get(fingerprint, cutoff) > cutoff or fingerprint in batch:
+                    continue
+                batch.add(fingerprint)
+                fresh.append(item)
+        return fresh
+
+    def last_crawl(self, domain: str) -> Optional[float]:
+        """Unix time of the previous crawl of this domain, None if never crawled"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT last_crawl FROM crawls WHERE domain = ?", (normalize_domain(domain),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, domain: str, items: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Mark items as seen for domain and return the ones that were new
+
+        The returned items are the same dicts; callers decide whether to
+        annotate them.
+        """
+        domain = normalize_domain(domain)
+        now = now if now is not None else time.time()
+        cutoff = self._seen_after(now)
+
+        with self._lock:
+            seen = self._fingerprints(domain)
+            expired = [fingerprint for fingerprint, first_seen in seen.items() if first_seen <= cutoff]
+            for fingerprint in expired:
+                del seen[fingerprint]
+
+            fresh = []
+            rows = []
+            for item in items:
+                fingerprint = url_fingerprint(item)
+                if fingerprint in seen:
+                    continue
+                seen[fingerprint] = now
+                fresh.append(item)
+                rows.append((domain, fingerprint, now))
+
+            if expired:
+                self._db.execute("DELETE FROM seen WHERE domain = ? AND first_seen <= ?", (domain, cutoff))
+            self._db.executemany("INSERT OR REPLACE INTO seen (domain, fingerprint, first_seen) VALUES (?, ?, ?)", rows)
+            self._db.execute("INSERT OR REPLACE INTO crawls (domain, last_crawl) VALUES (?, ?)", (domain, now))
+            self._db.commit()
+
+        return fresh
+
+    def count(self, domain: str, now: Optional[float] = None) -> int:
+        """URLs currently counted as seen for domain"""
+        cutoff = self._seen_after(now if now is not None else time.time())
+        with self._lock:
+            return sum(1 for first_seen in self._fingerprints(normalize_domain(domain)).values() if first_seen > cutoff)
+
+    def forget(self, domain: str):
+        """Drop the seen-set of a domain so the next delta crawl returns everything"""
+        domain = normalize_domain(domain)
+        with self._lock:
+            self._loaded.pop(domain, None)
+            self._db.execute("DELETE FROM seen WHERE domain = ?", (domain,))
+            self._db.execute("DELETE FROM crawls WHERE domain = ?", (domain,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
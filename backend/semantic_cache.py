@@ -0,0 +1,299 @@
+"""
+Semantic Cache
+
+Reuses the result of an earlier request that means nearly the same thing
+("pets", "pet care", "pet products") instead of only exact repeats.
+
+Requests are stored as unit-length embedding vectors in a NumPy matrix and
+looked up by brute-force cosine similarity, which stays well under a
+millisecond for the few thousand entries the size cap allows. Entries are
+persisted to SQLite so the index survives restarts, and the least recently
+used ones are evicted above max_entries. Hits only queue their access time;
+queued times are written in one transaction at most flush_interval seconds
+later, as in ResponseCache.
+
+Results that depend on more than the embedded text (e.g. a user's context)
+are stored under a partition and only reused by lookups of the same partition.
+"""
+
+import copy
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_vector(vector: Sequence[float]) -> np.ndarray:
+    """float32 copy of the vector scaled to unit length"""
+    array = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        name: str,
+        threshold: float = 0.85,
+        max_entries: int = 2000,
+        default_ttl: float = 24 * 60 * 60,
+        cache_dir: Optional[Path] = None,
+        flush_interval: float = 1.0,
+        max_pending: int = 64
+    ):
+        """
+        Args:
+            name: File name of the index, one per cached stage (e.g. "trends", "ideas")
+            threshold: Minimum cosine similarity for a stored result to be reused
+            max_entries: Entries kept; the least recently used are evicted above this
+            default_ttl: Seconds an entry stays valid when store() gets no ttl
+            cache_dir: Directory for the SQLite file, None for memory-only
+            flush_interval: Seconds queued access times may wait before they are committed
+            max_pending: Queued access times that force a commit regardless of the interval
+        """
+        self.name = name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._keys: List[str] = []
+        self._texts: List[str] = []
+        self._partitions: List[str] = []
+        self._values: List[Any] = []
+        self._expires: List[float] = []
+        self._accessed: List[float] = []
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        # Last-access times of hits not written to disk yet (key -> accessed_at)
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.time()
+        self._flush_timer: Optional[threading.Timer] = None
+
+        self._db: Optional[sqlite3.Connection] = None
+        if cache_dir is not None:
+            try:
+                Path(cache_dir).mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(Path(cache_dir) / f"semantic_{name}.sqlite3"), check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, text TEXT NOT NULL, vector BLOB NOT NULL, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, accessed_at REAL NOT NULL, partition TEXT NOT NULL DEFAULT '')"
+                )
+                columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+                if "partition" not in columns:
+                    self._db.execute("ALTER TABLE entries ADD COLUMN partition TEXT NOT NULL DEFAULT ''")
+                self._db.commit()
+                self._load()
+            except sqlite3.Error as e:
+                print(f"⚠️  Semantic cache '{name}' unavailable on disk, using memory only: {e}")
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _load(self):
+        now = time.time()
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        rows = self._db.execute(
+            "SELECT key, text, vector, value, expires_at, accessed_at, partition FROM entries "
+            "ORDER BY accessed_at DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        vectors = []
+        for key, text, blob, value, expires_at, accessed_at, partition in rows:
+            vectors.append(np.frombuffer(blob, dtype=np.float32))
+            self._keys.append(key)
+            self._texts.append(text)
+            self._partitions.append(partition)
+            self._values.append(json.loads(value))
+            self._expires.append(expires_at)
+            self._accessed.append(accessed_at)
+        if vectors and len({v.shape[0] for v in vectors}) == 1:
+            self._vectors = np.vstack(vectors)
+        elif vectors:
+            # Mixed dimensions means the embedding model changed; start over
+            self._keys, self._texts, self._values, self._expires, self._accessed = [], [], [], [], []
+            self._partitions = []
+            self._db.execute("DELETE FROM entries")
+        self._db.commit()
+
+    def lookup(self, vector: Sequence[float], partition: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Most similar live entry of partition above the threshold, or None
+
+        Returns {"value", "text", "similarity"}.
+        """
+        query = normalize_vector(vector)
+        now = time.time()
+
+        with self._lock:
+            if not self._keys or self._vectors.shape[1] != query.shape[0]:
+                self.stats["misses"] += 1
+                return None
+
+            similarities = self._vectors @ query
+            expired = np.asarray(self._expires) <= now
+            similarities[expired] = -1.0
+            similarities[np.asarray(self._partitions) != partition] = -1.0
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+
+            if similarity < self.threshold:
+                self.stats["misses"] += 1
+                return None
+
+            self._accessed[best] = now
+            self.stats["hits"] += 1
+            if self._db is not None:
+                self._touched[self._keys[best]] = now
+                self._maybe_flush(now)
+            # A copy, so callers can't change what other requests get back
+            value = copy.deepcopy(self._values[best])
+            return {"value": value, "text": self._texts[best], "similarity": round(similarity, 4)}
+
+    def store(
+        self,
+        key: str,
+        text: str,
+        vector: Sequence[float],
+        value: Any,
+        ttl: Optional[float] = None,
+        partition: str = ""
+    ):
+        """Add (or replace) the result for a request"""
+        unit = normalize_vector(vector)
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.default_ttl)
+
+        with self._lock:
+            if self._keys and self._vectors.shape[1] != unit.shape[0]:
+                self._drop(list(range(len(self._keys))))
+
+            if key in self._keys:
+                self._drop([self._keys.index(key)])
+
+            self._vectors = unit[None, :] if not self._keys else np.vstack([self._vectors, unit])
+            self._keys.append(key)
+            self._texts.append(text)
+            self._partitions.append(partition)
+            self._values.append(value)
+            self._expires.append(expires_at)
+            self._accessed.append(now)
+            self.stats["stores"] += 1
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries (key, text, vector, value, expires_at, accessed_at, partition) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, text, unit.tobytes(), json.dumps(value), expires_at, now, partition)
+                    )
+                    self._touched.pop(key, None)
+                    # Committed together with any queued access times
+                    self._flush(now)
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    print(f"⚠️  Semantic cache '{self.name}' write failed: {e}")
+
+            self._evict(now)
+
+    def clear(self):
+        with self._lock:
+            self._drop(list(range(len(self._keys))))
+
+    def flush(self):
+        """Write queued access times to disk now"""
+        with self._lock:
+            self._flush(time.time())
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._flush(time.time())
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._keys),
+            "threshold": self.threshold
+        }
+
+    def _maybe_flush(self, now: float):
+        if len(self._touched) >= self.max_pending or now - self._last_flush >= self.flush_interval:
+            self._flush(now)
+        elif self._flush_timer is None:
+            # Quiet traffic: don't leave the queue waiting for the next call
+            self._flush_timer = threading.Timer(self.flush_interval - (now - self._last_flush), self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+            self._flush(time.time())
+
+    def _flush(self, now: float):
+        """Write the queued access times and commit (caller holds the lock)"""
+        touched, self._touched = self._touched, {}
+        self._last_flush = now
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._db is None:
+            return
+
+        try:
+            if touched:
+                self._db.executemany(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                    [(accessed_at, key) for key, accessed_at in touched.items()]
+                )
+            self._db.commit()
+        except sqlite3.Error as e:
+            self._db.rollback()
+            print(f"⚠️  Semantic cache '{self.name}' update failed: {e}")
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used ones above max_entries"""
+        stale = [i for i, expires_at in enumerate(self._expires) if expires_at <= now]
+        overflow = len(self._keys) - len(stale) - self.max_entries
+        if overflow > 0:
+            stale_set = set(stale)
+            live = sorted((i for i in range(len(self._keys)) if i not in stale_set), key=self._accessed.__getitem__)
+            stale += live[:overflow]
+            self.stats["evictions"] += overflow
+        if stale:
+            self._drop(stale)
+
+    def _drop(self, indices: List[int]):
+        dropped = set(indices)
+        keep = [i for i in range(len(self._keys)) if i not in dropped]
+        removed = [self._keys[i] for i in indices]
+        for key in removed:
+            self._touched.pop(key, None)
+
+        self._vectors = self._vectors[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+        self._keys = [self._keys[i] for i in keep]
+        self._texts = [self._texts[i] for i in keep]
+        self._partitions = [self._partitions[i] for i in keep]
+        self._values = [self._values[i] for i in keep]
+        self._expires = [self._expires[i] for i in keep]
+        self._accessed = [self._accessed[i] for i in keep]
+
+        if self._db is not None and removed:
+            try:
+                self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in removed])
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Semantic cache '{self.name}' eviction failed: {e}")
@@ -0,0 +1,74 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent identical requests (same key) share one in-flight call instead
+of each hitting the API: the first caller starts it, later callers attach
+to it and all of them get the same result or exception.
+
+Cancellation is per waiter. A caller that goes away (e.g. a disconnected
+client) only detaches; the shared call is cancelled once its last waiter
+is gone, so nobody pays for work nobody waits for.
+
+Results are shared objects: callers must not mutate them.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = {"calls": 0, "coalesced": 0, "cancelled": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of factory(), shared with every concurrent caller of the same key"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+            self.stats["calls"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            # shield: cancelling this waiter must not cancel the others' call
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                # Later callers must start afresh, not join the dying call
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                self.stats["cancelled"] += 1
+
+    def _finish(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Retrieve the exception even if every waiter left, so it isn't reported as unhandled
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["calls"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "coalesce_rate": round(self.stats["coalesced"] / requests, 4) if requests else 0.0,
+            "in_flight": self.in_flight
+        }
@@ -0,0 +1,93 @@
+"""
+Speculative Pre-Generation
+
+Starts the likely next stage in the background while the user is still
+reading the current one (e.g. ideas for the top trends while trend cards are
+shown), so the click that follows can reuse the finished or in-flight result.
+
+Tasks are grouped per session (scope). Claiming one task cancels the rest of
+its scope: once the user has picked, the other guesses are wasted work.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+Key = Tuple[str, str]  # (stage, id of the selected trend or idea)
+
+
+class SpeculativeScheduler:
+    def __init__(self, max_tasks: int = 16):
+        """
+        Args:
+            max_tasks: Speculative tasks allowed in flight across all sessions;
+                new guesses are skipped beyond this
+        """
+        self.max_tasks = max_tasks
+        self._tasks: Dict[str, Dict[Key, asyncio.Task]] = {}
+        self.stats = {"started": 0, "hits": 0, "misses": 0, "cancelled": 0, "failed": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return sum(1 for tasks in self._tasks.values() for task in tasks.values() if not task.done())
+
+    def start(self, scope: str, key: Key, factory: Callable[[], Awaitable[Any]]) -> bool:
+        """Run factory() in the background for scope/key unless already running or at capacity"""
+        tasks = self._tasks.setdefault(scope, {})
+        if key in tasks or self.in_flight >= self.max_tasks:
+            return False
+
+        task = asyncio.create_task(factory())
+        # Retrieve the exception of tasks nobody claims, so it isn't reported as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        tasks[key] = task
+        self.stats["started"] += 1
+        return True
+
+    async def claim(self, scope: str, key: Key) -> Optional[Any]:
+        """
+        Result of the speculative task for key, waiting for it if still running
+
+        Returns None on a miss (nothing speculated, or the task failed); in
+        both cases the caller runs the stage itself. The scope's other tasks
+        are cancelled either way.
+        """
+        task = self._tasks.get(scope, {}).pop(key, None)
+        self.cancel(scope)
+
+        if task is None:
+            self.stats["misses"] += 1
+            return None
+
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise  # the caller itself was cancelled
+            self.stats["misses"] += 1
+            return None
+        except Exception as e:
+            print(f"⚠️  Speculative {key[0]} failed, running it now: {e}")
+            self.stats["failed"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return result
+
+    def cancel(self, scope: str):
+        """Cancel every speculative task of a scope"""
+        for task in self._tasks.pop(scope, {}).values():
+            if not task.done():
+                task.cancel()
+                self.stats["cancelled"] += 1
+
+    def cancel_all(self):
+        for scope in list(self._tasks):
+            self.cancel(scope)
+
+    def get_stats(self) -> Dict[str, Any]:
+        claims = self.stats["hits"] + self.stats["misses"] + self.stats["failed"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / claims, 4) if claims else 0.0,
+            "in_flight": self.in_flight
+        }
@@ -0,0 +1,113 @@
+"""
+Unit test for streamed collection overlapped with clustering
+"""
+
+import asyncio
+import os
+
+from brightdata_integration import SourceBatch
+from semantic_cache import SemanticCache
+from workflow import StartupHunterWorkflow
+
+
+def _workflow(batches, fail_after=None, **kwargs) -> StartupHunterWorkflow:
+    """Workflow whose Bright Data stream yields batches ([(source, n_items, delay)])"""
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    workflow = StartupHunterWorkflow(validate_evidence=False, semantic_cache=False, **kwargs)
+
+    async def stream_trends(domain, **options):
+        for i, (source, count, delay) in enumerate(batches):
+            if i == fail_after:
+                raise RuntimeError("scan crashed")
+            await asyncio.sleep(delay)
+            items = [{"title": f"{source} {n}", "url": f"https://{source}.example.com/{n}"} for n in range(count)]
+            yield SourceBatch(source=source, status="completed", items=items)
+
+    async def cluster_trends(raw_trends, domain, regenerate=False):
+        workflow.clustered_inputs.append(len(raw_trends))
+        return [{"id": "trend-1", "title": "Pet health", "pain": 8, "urgency": 7, "willingnessToPay": 6}]
+
+    workflow.clustered_inputs = []
+    workflow.brightdata.stream_trends = stream_trends
+    workflow.openai.cluster_trends = cluster_trends
+    return workflow
+
+
+def test_clustering_starts_once_enough_items_streamed_in():
+    workflow = _workflow([("google", 12, 0.0), ("hackernews", 10, 0.0), ("reddit", 10, 0.5)], early_cluster_min_items=20)
+
+    state = asyncio.run(workflow.run_stage("collect_and_cluster", {"domain": "pets"}))
+
+    assert state["stage"] == "trends_ready"
+    assert workflow.clustered_inputs == [22]
+    assert state["collection_report"]["clustered_items"] == 22
+    assert state["clustered_trends"][0]["title"] == "Pet health"
+
+
+def test_failing_stream_returns_an_error_instead_of_hanging():
+    workflow = _workflow([("google", 5, 0.0), ("reddit", 5, 0.0)], fail_after=1)
+
+    async def run():
+        return await asyncio.wait_for(workflow.run_stage("collect_and_cluster", {"domain": "pets"}), timeout=2)
+
+    state = asyncio.run(run())
+    assert state["stage"] == "error"
+    assert "scan crashed" in state["error"]
+    assert workflow.clustered_inputs == []
+
+
+def test_fallback_trends_are_not_cached():
+    workflow = _workflow([("google", 6, 0.0)])
+    workflow.trend_cache = SemanticCache("trends", threshold=0.9)
+    calls = []
+
+    async def embed(text):
+        return [1.0, 0.0]
+
+    async def complete_items(schema, **kwargs):
+        calls.append(kwargs["method"])
+        raise RuntimeError("503 Service Unavailable")
+
+    del workflow.openai.cluster_trends  # the real one, falling back to canned trends
+    workflow.openai.embed = embed
+    workflow.openai._complete_items = complete_items
+
+    async def run():
+        return [await workflow.run_stage("collect_and_cluster", {"domain": "pets"}) for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert first["stage"] == second["stage"] == "trends_ready"
+    assert all(trend["fallback"] for trend in first["clustered_trends"])
+    assert calls == ["cluster_trends", "cluster_trends"]
+    assert len(workflow.trend_cache) == 0
+
+
+def test_only_a_clustering_of_every_source_is_cached():
+    async def embed(text):
+        return [1.0, 0.0]
+
+    async def run(workflow):
+        return await workflow.run_stage("collect_and_cluster", {"domain": "pets"})
+
+    # Reddit arrives after clustering started on the first two sources
+    partial = _workflow([("google", 12, 0.0), ("hackernews", 10, 0.0), ("reddit", 10, 0.3)], early_cluster_min_items=20)
+    partial.trend_cache = SemanticCache("trends", threshold=0.9)
+    partial.openai.embed = embed
+    asyncio.run(run(partial))
+    assert partial.clustered_inputs == [22]
+    assert len(partial.trend_cache) == 0
+
+    complete = _workflow([("google", 12, 0.0), ("reddit", 10, 0.05)], early_cluster_min_items=0)
+    complete.trend_cache = SemanticCache("trends", threshold=0.9)
+    complete.openai.embed = embed
+    asyncio.run(run(complete))
+    assert complete.clustered_inputs == [22]
+    assert len(complete.trend_cache) == 1
+
+
+if __name__ == "__main__":
+    test_clustering_starts_once_enough_items_streamed_in()
+    test_failing_stream_returns_an_error_instead_of_hanging()
+    test_fallback_trends_are_not_cached()
+    test_only_a_clustering_of_every_source_is_cached()
+    print("✅ Collect and cluster tests passed")
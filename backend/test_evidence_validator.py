@@ -0,0 +1,79 @@
+"""
+Unit test for evidence URL validation
+"""
+
+import asyncio
+
+import httpx
+
+from evidence_validator import EvidenceValidator, is_checkable
+from response_cache import ResponseCache
+
+# Public addresses as literals, so no DNS lookup is needed
+SITE = "http://93.184.216.34"
+
+
+def _validator(routes, resolved=None):
+    """Validator whose HTTP calls are answered from routes ({url: (status, location)})"""
+    requested = []
+
+    def handler(request):
+        url = str(request.url)
+        requested.append((request.method, url))
+        status, location = routes.get(url, (404, None))
+        if request.method == "HEAD" and status == 405:
+            return httpx.Response(405)
+        return httpx.Response(200 if status == 405 else status, headers={"location": location} if location else {})
+
+    validator = EvidenceValidator(budget=2.0, cache=ResponseCache("evidence_urls_test"))
+    validator.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    if resolved is not None:
+        async def resolve(host, port):
+            return resolved.get(host, [host])
+        validator._resolve = resolve
+    return validator, requested
+
+
+def test_only_public_http_urls_are_checkable():
+    assert is_checkable("https://example.com/post")
+    assert is_checkable(f"{SITE}/post")
+    for url in ("http://localhost:8000/", "http://10.0.0.1/", "http://169.254.169.254/latest",
+                "http://[::1]/", "file:///etc/passwd", "http://db.internal/", "not a url"):
+        assert not is_checkable(url), url
+
+
+def test_redirects_to_private_addresses_are_not_followed():
+    validator, requested = _validator({
+        f"{SITE}/metadata": (302, "http://169.254.169.254/latest/meta-data/"),
+        f"{SITE}/intranet": (301, "https://intranet.example.com/admin"),
+    }, resolved={"intranet.example.com": ["10.0.0.5"]})
+
+    async def run():
+        return await validator.check(f"{SITE}/metadata"), await validator.check(f"{SITE}/intranet")
+
+    assert asyncio.run(run()) == (False, False)
+    assert {httpx.URL(url).host for _, url in requested} == {"93.184.216.34"}
+
+
+def test_public_redirects_are_followed_and_dead_links_removed():
+    validator, requested = _validator({
+        f"{SITE}/old": (302, "/new"),
+        f"{SITE}/new": (405, None),  # HEAD not allowed, GET works
+        f"{SITE}/loop": (302, "/loop"),
+    })
+    trends = [{"evidence": [
+        {"url": f"{SITE}/old"}, {"url": f"{SITE}/gone"}, {"url": f"{SITE}/loop"}, {"url": "http://localhost/x"}
+    ]}]
+
+    asyncio.run(validator.validate_trends(trends))
+
+    assert [e["url"] for e in trends[0]["evidence"]] == [f"{SITE}/old", "http://localhost/x"]
+    assert ("GET", f"{SITE}/new") in requested
+    assert {httpx.URL(url).host for _, url in requested} == {"93.184.216.34"}
+
+
+if __name__ == "__main__":
+    test_only_public_http_urls_are_checkable()
+    test_redirects_to_private_addresses_are_not_followed()
+    test_public_redirects_are_followed_and_dead_links_removed()
+    print("✅ Evidence validator tests passed")
@@ -0,0 +1,90 @@
+"""
+Unit test for hedged requests
+"""
+
+import asyncio
+import time
+
+from hedging import LatencyTracker, HedgeBudget, hedged
+
+
+def test_hedge_wins_over_stuck_call_and_cancels_it():
+    async def run():
+        started, cancelled = [], []
+
+        async def completion():
+            attempt = len(started)
+            started.append(attempt)
+            try:
+                await asyncio.sleep(10 if attempt == 0 else 0.01)
+                return f"answer {attempt}"
+            except asyncio.CancelledError:
+                cancelled.append(attempt)
+                raise
+
+        start = time.perf_counter()
+        result = await hedged(completion, hedge_after=0.02)
+        return result, time.perf_counter() - start, cancelled
+
+    (answer, hedge_won), elapsed, cancelled = asyncio.run(run())
+    assert answer == "answer 1" and hedge_won
+    assert elapsed < 1 and cancelled == [0]
+
+
+def test_no_hedge_for_fast_calls_or_without_budget():
+    async def run():
+        calls = []
+
+        async def completion():
+            calls.append(1)
+            await asyncio.sleep(0.03)
+            return "ok"
+
+        fast = await hedged(completion, hedge_after=1.0)
+        refused = await hedged(completion, hedge_after=0.01, allow_hedge=lambda: False)
+        return fast, refused, len(calls)
+
+    fast, refused, calls = asyncio.run(run())
+    assert fast == ("ok", False) and refused == ("ok", False) and calls == 2
+
+
+def test_error_waits_for_the_other_call():
+    async def run():
+        attempts = []
+
+        async def completion():
+            attempts.append(1)
+            if len(attempts) == 1:
+                await asyncio.sleep(0.03)
+                raise RuntimeError("server error")
+            await asyncio.sleep(0.05)
+            return "hedge answer"
+
+        return await hedged(completion, hedge_after=0.01)
+
+    assert asyncio.run(run()) == ("hedge answer", True)
+
+
+def test_latency_percentile_and_budget():
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for i in range(5):
+        tracker.record("gpt-4o:generate_ideas", 1.0)
+    assert tracker.percentile("gpt-4o:generate_ideas", 95) is None  # not enough samples yet
+
+    for i in range(100):
+        tracker.record("gpt-4o:generate_ideas", i / 10)
+    assert 9.3 < tracker.percentile("gpt-4o:generate_ideas", 95) < 9.6
+
+    budget = HedgeBudget(ratio=0.03, allowance=0)
+    budget.record(100000)
+    assert budget.try_spend(2000)
+    assert not budget.try_spend(2000)  # would be 4% of the spend
+    assert budget.snapshot()["hedge_share"] == 0.02
+
+
+if __name__ == "__main__":
+    test_hedge_wins_over_stuck_call_and_cancels_it()
+    test_no_hedge_for_fast_calls_or_without_budget()
+    test_error_waits_for_the_other_call()
+    test_latency_percentile_and_budget()
+    print("✅ Hedging tests passed")
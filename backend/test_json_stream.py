@@ -0,0 +1,31 @@
+"""
+Unit test for the incremental JSON array parser
+"""
+
+import json
+
+from json_stream import JsonArrayStreamParser
+
+
+def test_sections_are_emitted_as_soon_as_complete():
+    sections = [
+        {"title": "Problem Statement", "content": "Braces } and [brackets] and \"quotes\" in text"},
+        {"title": "MVP Scope", "content": {"must_have": ["auth", "billing"]}}
+    ]
+    document = json.dumps({"sections": sections, "meta": {"extra": {"title": "not a section"}}})
+
+    parser = JsonArrayStreamParser()
+    first_cut = document.index("MVP Scope")
+    assert parser.feed(document[:first_cut]) == [sections[0]]
+
+    emitted = []
+    for i in range(first_cut, len(document), 7):
+        emitted += parser.feed(document[i:i + 7])
+    assert emitted == [sections[1]]
+    assert parser.closed and parser.emitted == 2
+    assert json.loads(parser.text)["sections"] == sections
+
+
+if __name__ == "__main__":
+    test_sections_are_emitted_as_soon_as_complete()
+    print("✅ JSON stream parser tests passed")
@@ -0,0 +1,74 @@
+"""
+Unit test for the LLM response cache in OpenAIClient
+"""
+
+import asyncio
+import json
+
+import httpx
+from openai import AsyncOpenAI
+
+from openai_integration import OpenAIClient
+from response_cache import ResponseCache
+
+
+def _client():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "id": "c", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": json.dumps({"answer": len(requests)})}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        })
+
+    client = OpenAIClient(api_key="test", cache=ResponseCache("llm_cache_test"), route_models=False)
+    client.client = AsyncOpenAI(
+        api_key="test", max_retries=0, http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return client, requests
+
+
+def test_identical_requests_are_answered_from_the_cache():
+    client, requests = _client()
+    messages = [{"role": "user", "content": "ideas for pets"}]
+
+    async def run():
+        return [
+            await client._complete("gpt-4o", messages, 0.8, method="generate_ideas"),
+            await client._complete("gpt-4o", messages, 0.8, method="generate_ideas"),
+            # Everything that shapes the answer is part of the key
+            await client._complete("gpt-4o", messages, 0.7, method="generate_ideas"),
+            await client._complete("gpt-4o", [{"role": "user", "content": "ideas for cats"}], 0.8),
+            await client._complete("gpt-4o-mini", messages, 0.8, method="generate_ideas"),
+            await client._complete("gpt-4o", messages, 0.8, response_format={"type": "text"}),
+        ]
+
+    answers = asyncio.run(run())
+    assert answers[0] == answers[1] == '{"answer": 1}'
+    assert len(set(answers[1:])) == 5
+    assert len(requests) == 5
+
+
+def test_regenerate_bypasses_and_refreshes_the_cache():
+    client, requests = _client()
+    messages = [{"role": "user", "content": "proposal for PetPal"}]
+
+    async def run():
+        first = await client._complete("gpt-4o", messages, 0.7, method="generate_proposal")
+        fresh = await client._complete("gpt-4o", messages, 0.7, method="generate_proposal", regenerate=True)
+        later = await client._complete("gpt-4o", messages, 0.7, method="generate_proposal")
+        return first, fresh, later
+
+    first, fresh, later = asyncio.run(run())
+    assert first != fresh
+    assert later == fresh
+    assert len(requests) == 2
+
+
+if __name__ == "__main__":
+    test_identical_requests_are_answered_from_the_cache()
+    test_regenerate_bypasses_and_refreshes_the_cache()
+    print("✅ LLM cache tests passed")
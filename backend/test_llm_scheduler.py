@@ -0,0 +1,76 @@
+"""
+Unit test for the rate-limit-aware LLM scheduler
+"""
+
+import asyncio
+import time
+
+from llm_scheduler import LLMScheduler, parse_reset
+
+
+def test_calls_queue_for_token_quota_instead_of_failing():
+    async def run():
+        # 6000 tokens per minute = 100/s, with 1000 in the bucket
+        scheduler = LLMScheduler({"gpt-4o": (6000, 6000)})
+        start = time.monotonic()
+        await scheduler.acquire("gpt-4o", 900)
+        await scheduler.acquire("gpt-4o", 130)  # waits ~0.3s for the refill
+        return time.monotonic() - start, scheduler.get_stats()
+
+    elapsed, stats = asyncio.run(run())
+    assert 0.2 <= elapsed < 1.0
+    assert stats["requests"] == 2 and stats["queued"] == 1
+
+
+def test_usage_and_headers_adjust_the_buckets():
+    scheduler = LLMScheduler({"gpt-4o-mini": (60, 6000)})
+    quota = scheduler.quota("gpt-4o-mini")
+    tokens = quota.tokens.available
+
+    assert quota.tokens.try_acquire(500)
+    scheduler.settle("gpt-4o-mini", estimated=500, actual=200)
+    assert abs(quota.tokens.available - (tokens - 200)) < 1
+
+    scheduler.observe_headers("gpt-4o-mini", {
+        "x-ratelimit-limit-requests": "5000",
+        "x-ratelimit-limit-tokens": "2000000",
+        "x-ratelimit-remaining-requests": "3",
+        "x-ratelimit-remaining-tokens": "150",
+    })
+    assert quota.rpm == 5000 and quota.tpm == 2000000
+    assert quota.requests.available < 4 and quota.tokens.available < 200
+    assert scheduler.get_stats()["limit_updates"] == 1
+
+
+def test_calls_above_the_burst_size_are_charged_in_full():
+    # 30000 tokens per minute: the bucket holds 5000
+    scheduler = LLMScheduler({"gpt-4o": (500, 30000)})
+    quota = scheduler.quota("gpt-4o")
+
+    asyncio.run(scheduler.acquire("gpt-4o", 9000))
+    scheduler.settle("gpt-4o", estimated=9000, actual=9000)
+    assert quota.tokens.available < -3900
+    assert not scheduler.has_capacity("gpt-4o", 100)
+
+    # An overestimate is given back in full as well
+    asyncio.run(scheduler.acquire("gpt-4o-mini", 40000))
+    scheduler.settle("gpt-4o-mini", estimated=40000, actual=10000)
+    assert abs(scheduler.quota("gpt-4o-mini").tokens.available - (33333 - 10000)) < 100
+
+
+def test_rate_limit_pauses_the_queue():
+    scheduler = LLMScheduler({"gpt-4o": (600, 60000)})
+    scheduler.rate_limited("gpt-4o", {"retry-after-ms": "500"})
+    assert not scheduler.has_capacity("gpt-4o", 10)
+    assert scheduler.has_capacity("gpt-4o-mini", 10)
+
+    assert parse_reset("6m0s") == 360 and parse_reset("20ms") == 0.02 and parse_reset("1.5s") == 1.5
+    assert parse_reset("") is None
+
+
+if __name__ == "__main__":
+    test_calls_queue_for_token_quota_instead_of_failing()
+    test_usage_and_headers_adjust_the_buckets()
+    test_calls_above_the_burst_size_are_charged_in_full()
+    test_rate_limit_pauses_the_queue()
+    print("✅ LLM scheduler tests passed")
@@ -0,0 +1,124 @@
+"""
+Unit test for latency-aware model routing and shadow evaluation
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+import httpx
+from openai import AsyncOpenAI
+
+from hedging import LatencyTracker
+from model_routing import ModelRouter, agreement, set_latency_tier
+from openai_integration import OpenAIClient
+from output_schemas import IDEAS
+from response_cache import ResponseCache
+
+
+def _router(**kwargs) -> ModelRouter:
+    return ModelRouter("gpt-4o-mini", "gpt-4o", LatencyTracker(min_samples=5), probe_rate=0, **kwargs)
+
+
+def test_small_prompts_and_stage_preference():
+    router = _router()
+    assert router.route("cluster_trends", "gpt-4o", prompt_tokens=400).reason == "small_prompt"
+    assert router.route("cluster_trends", "gpt-4o", prompt_tokens=4000).model == "gpt-4o"
+    assert router.route("generate_mvp_plan", "gpt-4o-mini", prompt_tokens=100).model == "gpt-4o-mini"
+    assert router.route("unknown_stage", "gpt-4o", prompt_tokens=100).model == "gpt-4o"
+
+
+def test_slow_strong_model_is_skipped_only_for_interactive_sessions():
+    router = _router()
+    for i in range(10):
+        router.latencies.record("gpt-4o:generate_proposal", 45.0)
+
+    async def route(tier):
+        # Each task gets its own copy of the context, like each API request
+        set_latency_tier(tier)
+        return router.route("generate_proposal", "gpt-4o", prompt_tokens=2000)
+
+    async def run():
+        return await asyncio.gather(asyncio.create_task(route("interactive")), asyncio.create_task(route("batch")))
+
+    interactive, batch = asyncio.run(run())
+    assert (interactive.model, interactive.reason) == ("gpt-4o-mini", "slo")
+    assert (batch.model, batch.reason) == ("gpt-4o", "stage")
+
+    # No reroute when the fast model misses the SLO as well
+    for i in range(10):
+        router.latencies.record("gpt-4o-mini:generate_proposal", 40.0)
+    assert router.route("generate_proposal", "gpt-4o", prompt_tokens=2000).model == "gpt-4o"
+
+
+def test_failover_after_errors():
+    router = _router()
+    for i in range(6):
+        router.record("gpt-4o", 1.0, ok=False)
+    route = router.route("generate_ideas", "gpt-4o", prompt_tokens=2000)
+    assert (route.model, route.reason) == ("gpt-4o-mini", "failover")
+    assert router.get_stats()["routes"] == {"generate_ideas:gpt-4o-mini:failover": 1}
+
+
+def test_shadow_comparison_is_logged():
+    log = os.path.join(tempfile.mkdtemp(), "shadow_eval.jsonl")
+    router = _router(shadow_rate=1.0, shadow_log=log)
+    assert router.should_shadow()
+
+    idea = {"id": "idea-1", "title": "Pet sitter marketplace", "tagline": "t", "reasoning": "r"}
+    primary = json.dumps({"ideas": [idea]})
+    shadow = json.dumps({"ideas": [{**idea, "title": "Marketplace for pet sitters"}, {"title": ""}]})
+    record = router.record_shadow("generate_ideas", IDEAS, "gpt-4o", primary, 12.0, "gpt-4o-mini", shadow, 3.0)
+
+    assert record["primary"]["valid"] and not record["shadow"]["valid"]
+    assert record["shadow"]["items"] == 1
+    assert record["agreement"] == 0.4  # 2 of 5 distinct title words shared
+    with open(log) as f:
+        assert json.loads(f.readline())["shadow"]["model"] == "gpt-4o-mini"
+
+    stats = router.get_stats()["shadow"]["generate_ideas"]
+    assert stats["gpt-4o"]["latency"] == 12.0 and stats["gpt-4o-mini"]["valid"] == 0.0
+    assert agreement([], [{"title": "x"}]) == 0.0
+
+
+def test_cache_is_shared_by_routed_and_unrouted_calls():
+    models = []
+
+    def handler(request):
+        models.append(json.loads(request.content)["model"])
+        return httpx.Response(200, json={
+            "id": "c", "object": "chat.completion", "created": 0, "model": models[-1],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "{}"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+        })
+
+    cache = ResponseCache("llm_routing_test")
+    cache.clear()
+    client = OpenAIClient(api_key="test", cache=cache)
+    client.client = AsyncOpenAI(
+        api_key="test", max_retries=0, http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    client.router.probe_rate = 0
+    for i in range(25):
+        client.latencies.record("gpt-4o:generate_ideas", 40.0)
+
+    async def complete(tier):
+        set_latency_tier(tier)
+        return await client._complete("gpt-4o", [{"role": "user", "content": "ideas"}], 0.8, method="generate_ideas")
+
+    async def run():
+        await asyncio.create_task(complete("interactive"))
+        await asyncio.create_task(complete("batch"))
+
+    asyncio.run(run())
+    assert models == ["gpt-4o-mini"]
+
+
+if __name__ == "__main__":
+    test_small_prompts_and_stage_preference()
+    test_slow_strong_model_is_skipped_only_for_interactive_sessions()
+    test_failover_after_errors()
+    test_shadow_comparison_is_logged()
+    test_cache_is_shared_by_routed_and_unrouted_calls()
+    print("✅ Model routing tests passed")
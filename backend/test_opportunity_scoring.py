@@ -0,0 +1,62 @@
+"""
+Unit test for local opportunity scoring
+"""
+
+from opportunity_scoring import ScoringWeights, compute_scores, rank_trends
+from semantic_cache import SemanticCache
+
+
+def _trends():
+    return [
+        {"id": "trend-1", "momentum": 9, "pain": 10, "competition": 6, "complexity": 4},
+        {"id": "trend-2", "momentum": 3, "pain": 4, "competition": 9, "complexity": 9},
+        {"id": "trend-3", "momentum": "7", "pain": None, "competition": 2, "complexity": 15},
+    ]
+
+
+def test_default_formula_scaled_to_100():
+    # (9*2 + 10*3 - 6 - 4) = 38 on a -20..50 range
+    scores = compute_scores(_trends())
+    assert scores[0] == round((38 + 20) / 70 * 100)
+    assert all(0 <= score <= 100 for score in scores)
+
+
+def test_rerank_under_tenant_weights():
+    trends = _trends()
+    assert [t["id"] for t in rank_trends(trends)] == ["trend-1", "trend-3", "trend-2"]
+
+    # A tenant that favours easy builds in uncrowded spaces
+    easy_wins = ScoringWeights.from_dict({"momentum": 0, "pain": 1, "competition": 3, "complexity": 3})
+    reranked = rank_trends(trends, easy_wins)
+    assert reranked[0]["id"] == "trend-2"
+    assert reranked[0]["score"] > reranked[-1]["score"]
+
+    for bad in ({"virality": 2}, {"pain": float("nan")}, {"momentum": float("inf")}):
+        try:
+            ScoringWeights.from_dict(bad)
+            assert False, f"{bad} accepted"
+        except ValueError:
+            pass
+
+
+def test_tenants_ranking_shared_cached_trends_keep_their_own_scores():
+    cache = SemanticCache("trends", threshold=0.9)
+    cache.store("pets", "pets", [1.0, 0.0], {"clustered_trends": _trends()})
+    easy_wins = ScoringWeights.from_dict({"momentum": 0, "pain": 1, "competition": 3, "complexity": 3})
+
+    session_a = rank_trends(cache.lookup([1.0, 0.0])["value"]["clustered_trends"])
+    scores_a = [(t["id"], t["score"]) for t in session_a]
+
+    session_b = rank_trends(cache.lookup([1.0, 0.0])["value"]["clustered_trends"], easy_wins)
+    rank_trends(session_b, ScoringWeights.from_dict({"momentum": 1, "pain": 0, "competition": 0, "complexity": 0}))
+
+    assert [(t["id"], t["score"]) for t in session_a] == scores_a
+    assert [t["id"] for t in session_b] != [t["id"] for t in session_a]
+    assert "score" not in cache.lookup([1.0, 0.0])["value"]["clustered_trends"][0]
+
+
+if __name__ == "__main__":
+    test_default_formula_scaled_to_100()
+    test_rerank_under_tenant_weights()
+    test_tenants_ranking_shared_cached_trends_keep_their_own_scores()
+    print("✅ Opportunity scoring tests passed")
@@ -0,0 +1,78 @@
+"""
+Unit test for the structured output schemas and partial salvage
+"""
+
+import json
+
+from output_schemas import TRENDS, IDEAS, PROPOSAL, SECTION
+
+
+def _trend(title, **fields):
+    return {"id": "t", "title": title, "momentum": 8, "pain": 7, "competition": 5, "complexity": 4,
+            "painPoints": ["slow"], "evidence": [], **fields}
+
+
+def test_strict_response_format():
+    schema = TRENDS.response_format["json_schema"]
+    assert TRENDS.response_format["type"] == "json_schema" and schema["strict"]
+
+    def check(node):
+        if isinstance(node, dict):
+            if node.get("type") == "object":
+                assert node["additionalProperties"] is False
+                assert set(node["required"]) == set(node["properties"])
+            assert "default" not in node and "title" not in node.get("properties", {}).get("title", {})
+            for value in node.values():
+                check(value)
+        elif isinstance(node, list):
+            for value in node:
+                check(value)
+
+    check(schema["schema"])
+
+
+def test_valid_response_passes_untouched():
+    content = json.dumps({"trends": [_trend("A"), _trend("B")]})
+    salvage = TRENDS.salvage(content)
+    assert not salvage.problems and [t["title"] for t in salvage.items] == ["A", "B"]
+
+
+def test_invalid_items_are_repaired_or_dropped_individually():
+    content = json.dumps({"trends": [
+        _trend("Repairable", momentum="9/10", pain=14, painPoints="one quote", evidence=["junk", {"source": "HN", "url": "u", "snippet": "s"}]),
+        _trend(""),
+        {"title": "Defaults", "momentum": 1, "pain": 2, "competition": 3, "complexity": 4},
+    ]})
+    salvage = TRENDS.salvage(content)
+
+    repaired, defaulted = salvage.items
+    assert repaired["momentum"] == 9 and repaired["pain"] == 10
+    assert repaired["painPoints"] == ["one quote"] and len(repaired["evidence"]) == 1
+    assert defaulted["painPoints"] == [] and defaulted["evidence"] == []
+    assert len(salvage.problems) == 1 and salvage.problems[0].startswith("item 2: title")
+
+
+def test_cut_off_response_keeps_complete_items():
+    idea = {"id": "i", "title": "Stubly", "tagline": "t", "reasoning": "r", "market": "m",
+            "wedge": "w", "mvpTime": 3, "recommended": True}
+    content = json.dumps({"ideas": [idea, idea]})[:-40]
+    salvage = IDEAS.salvage(content)
+    assert len(salvage.items) == 1 and salvage.items[0]["mvpTime"] == "3"
+    assert "cut off" in salvage.problems[0]
+
+    assert PROPOSAL.salvage("not json").items == []
+
+
+def test_single_item_schema():
+    section, problem = SECTION.validate_item({"title": "Go-to-Market", "content": {"pricing": "$29"}})
+    assert problem is None and json.loads(section["content"]) == {"pricing": "$29"}
+    assert SECTION.validate_item({"title": "Risks"})[0] is None
+
+
+if __name__ == "__main__":
+    test_strict_response_format()
+    test_valid_response_passes_untouched()
+    test_invalid_items_are_repaired_or_dropped_individually()
+    test_cut_off_response_keeps_complete_items()
+    test_single_item_schema()
+    print("✅ Output schema tests passed")
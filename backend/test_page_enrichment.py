@@ -0,0 +1,84 @@
+"""
+Unit test for page enrichment
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from brightdata_integration import BrightDataCollector
+from page_enrichment import MainTextExtractor, PageEnricher
+
+PAGE = (
+    "<html><head><title>Dog walkers wanted</title><script>var x = 1;</script></head>"
+    "<body><nav>Home | About</nav><article><h1>Owners can't find walkers</h1>"
+    "<p>Most walkers are booked &amp; weeks out.</p></article><footer>Copyright</footer></body></html>"
+)
+
+
+def _enricher(handler, **kwargs) -> PageEnricher:
+    collector = BrightDataCollector(api_token="test", use_cache=False, track_seen=False, zone_rate_limit=1000)
+    collector._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return PageEnricher(collector, zone="unlocker_test", **kwargs)
+
+
+def test_main_text_skips_chrome_and_scripts():
+    extractor = MainTextExtractor(max_chars=200)
+    for i in range(0, len(PAGE), 17):  # fed in arbitrary pieces, like a stream
+        extractor.feed(PAGE[i:i + 17])
+    extractor.close()
+
+    assert extractor.title == "Dog walkers wanted"
+    assert extractor.text() == "Owners can't find walkers\nMost walkers are booked & weeks out."
+
+    short = MainTextExtractor(max_chars=10)
+    short.feed(PAGE)
+    assert short.full and len(short.text()) == 10
+
+
+def test_download_is_cut_off_at_max_bytes():
+    sent = []
+
+    async def body():
+        yield b"<html><body><p>" + b"walkers " * 100
+        for _ in range(50):
+            sent.append(1)
+            yield b"more text " * 100
+
+    def handler(request):
+        assert json.loads(request.content)["url"] == "https://example.com/post"
+        return httpx.Response(200, content=body())
+
+    enricher = _enricher(handler, max_bytes=3000, max_chars=100000)
+    page = asyncio.run(enricher.fetch_extract("https://example.com/post"))
+
+    assert page["bytes"] == 3000
+    assert len(page["text"]) < 3000 and page["text"].startswith("walkers")
+    assert len(sent) < 50
+
+
+def test_timeout_covers_the_download_not_the_queue():
+    async def handler(request):
+        url = json.loads(request.content)["url"]
+        await asyncio.sleep(1.0 if "slow" in url else 0.15)
+        return httpx.Response(200, text=PAGE)
+
+    # One page at a time: the last of four waits ~0.45s, longer than the timeout
+    enricher = _enricher(handler, concurrency=1, timeout=0.3)
+    items = [{"url": f"https://example.com/{i}"} for i in range(4)] + [{"url": "https://example.com/slow"}]
+
+    start = time.perf_counter()
+    counts = asyncio.run(enricher.enrich(items))
+
+    assert counts == {"enriched": 4, "failed": 1}
+    assert time.perf_counter() - start < 2
+    assert "extract_z" not in items[-1]
+
+
+if __name__ == "__main__":
+    test_main_text_skips_chrome_and_scripts()
+    test_download_is_cut_off_at_max_bytes()
+    test_timeout_covers_the_download_not_the_queue()
+    print("✅ Page enrichment tests passed")
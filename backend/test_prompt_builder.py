@@ -0,0 +1,44 @@
+"""
+Unit test for the token-budgeted prompt builder
+"""
+
+import json
+
+from prompt_builder import count_tokens, fit_object, pack_items, TREND_FIELDS
+
+
+def _item(rank, weight=1.0, snippet="stub"):
+    return {"title": f"Item {rank}", "url": f"https://example.com/{rank}", "snippet": snippet,
+            "source": "GitHub", "rank": rank, "weight": weight, "first_seen": 0}
+
+
+def test_pack_items_respects_budget_and_relevance():
+    items = [_item(rank, snippet="word " * 200) for rank in range(1, 41)]
+    items.append(_item(5, weight=1.5))
+
+    packed, count = pack_items(items, budget=800)
+    parsed = json.loads(packed)
+
+    assert count == len(parsed) < len(items)
+    assert count_tokens(packed) <= 800
+    # The heavier source outranks a slightly better rank
+    assert [p["title"] for p in parsed[:2]] == ["Item 5", "Item 1"]
+    assert "rank" not in parsed[0] and "first_seen" not in parsed[0]
+    assert len(parsed[0]["snippet"]) <= 280
+
+
+def test_fit_object_shrinks_long_text():
+    trend = {"title": "Pet telehealth", "score": 80, "painPoints": ["vet visits are slow " * 30] * 3,
+             "evidence": [{"source": "Reddit", "url": "https://reddit.com/r/pets", "snippet": "x" * 500}],
+             "internal": "dropped"}
+
+    serialized = fit_object(trend, TREND_FIELDS, budget=150)
+    assert count_tokens(serialized) <= 150
+    parsed = json.loads(serialized)
+    assert parsed["title"] == "Pet telehealth" and "internal" not in parsed
+
+
+if __name__ == "__main__":
+    test_pack_items_respects_budget_and_relevance()
+    test_fit_object_shrinks_long_text()
+    print("✅ Prompt builder tests passed")
@@ -0,0 +1,146 @@
+"""
+Unit test for incremental proposal regeneration
+"""
+
+import asyncio
+import json
+
+import httpx
+from openai import AsyncOpenAI
+
+from openai_integration import (
+    OpenAIClient, PROPOSAL_SECTIONS, SECTION_DEPENDENCIES, affected_sections, changed_fields
+)
+from prompt_builder import IDEA_FIELDS, TREND_FIELDS
+
+IDEA = {
+    "id": "idea-1", "title": "PetPal", "tagline": "Vet answers in minutes", "reasoning": "Clinics are booked out",
+    "market": "Urban dog owners", "wedge": "Chat triage", "mvpTime": "2 weeks", "recommended": True
+}
+
+
+def test_every_prompt_field_is_a_recorded_dependency():
+    recorded = set().union(*SECTION_DEPENDENCIES.values())
+    assert {f"idea.{name}" for name in IDEA_FIELDS} <= recorded
+    assert {f"trend.{name}" for name in TREND_FIELDS} <= recorded
+    assert set(SECTION_DEPENDENCIES) == {title for title, _, _ in PROPOSAL_SECTIONS}
+
+
+def test_small_edits_touch_few_sections():
+    assert changed_fields(IDEA, {**IDEA, "recommended": False}) == set()
+    assert changed_fields(IDEA, {**IDEA, "mvpTime": "4 weeks"}) == {"idea.mvpTime"}
+    assert affected_sections({"idea.mvpTime"}) == ["MVP Scope", "2-Week Roadmap"]
+    assert len(affected_sections({"idea.title"})) == len(PROPOSAL_SECTIONS)
+    assert changed_fields(IDEA, IDEA, {"pain": 7}, {"pain": 9}) == {"trend.pain"}
+
+
+def test_only_affected_and_fallback_sections_are_rewritten():
+    client = OpenAIClient(api_key="test", use_cache=False)
+    written = []
+
+    async def write_section(index, selected_idea, trend_context, outline, regenerate=False):
+        written.append(index)
+        return {"title": PROPOSAL_SECTIONS[index][0], "content": f"for {selected_idea['mvpTime']}"}
+
+    client._write_section = write_section
+    proposal = [{"title": title, "content": "old"} for title, _, _ in reversed(PROPOSAL_SECTIONS)]
+    proposal[0]["fallback"] = True  # 2-Week Roadmap
+    del proposal[3]                 # Data & Model Plan
+
+    updated, rewritten = asyncio.run(client.regenerate_proposal_sections(
+        proposal, IDEA, {**IDEA, "mvpTime": "4 weeks"}, {"title": "Pet health"}
+    ))
+
+    assert [section["title"] for section in updated] == [title for title, _, _ in PROPOSAL_SECTIONS]
+    assert sorted(rewritten) == ["2-Week Roadmap", "Data & Model Plan", "MVP Scope"]
+    assert sorted(written) == [4, 6, 9]
+    assert updated[4]["content"] == "for 4 weeks" and updated[5]["content"] == "old"
+    assert client.call_counters["sections_reused"] == 7
+
+
+def test_fallback_proposal_is_rewritten_after_an_edit():
+    client = OpenAIClient(api_key="test", use_cache=False)
+    calls = []
+
+    async def complete(*args, **kwargs):
+        calls.append(kwargs.get("method"))
+        if len(calls) == 1:
+            raise RuntimeError("503 Service Unavailable")
+        return json.dumps({"title": "MVP Scope", "content": "written"})
+
+    client._complete = complete
+
+    async def run():
+        proposal = await client.generate_proposal(IDEA, {"title": "Pet health"})
+        return proposal, await client.regenerate_proposal_sections(
+            proposal, IDEA, {**IDEA, "recommended": False}, {"title": "Pet health"}
+        )
+
+    proposal, (updated, rewritten) = asyncio.run(run())
+    assert all(section["fallback"] for section in proposal)
+    # Nothing the prompts use changed, but every canned section is written again
+    assert len(rewritten) == len(PROPOSAL_SECTIONS) == len(calls) - 1
+
+
+def _sse(*events) -> bytes:
+    return b"".join(f"data: {json.dumps(event)}\n\n".encode() for event in events) + b"data: [DONE]\n\n"
+
+
+def _chunk(content=None, usage=None):
+    choices = [{"index": 0, "delta": {"content": content}, "finish_reason": None}] if content else []
+    return {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o",
+            "choices": choices, "usage": usage}
+
+
+def test_streamed_proposal_goes_through_quota_accounting():
+    document = json.dumps({"sections": [{"title": title, "content": "text"} for title, _, _ in PROPOSAL_SECTIONS]})
+    requests, closed = [], []
+
+    async def body():
+        try:
+            for i in range(0, len(document), 40):
+                yield _sse(_chunk(document[i:i + 40]))[:-len(b"data: [DONE]\n\n")]
+                await asyncio.sleep(0.001)
+            yield _sse(_chunk(usage={"prompt_tokens": 900, "completion_tokens": 2100, "total_tokens": 3000}))
+        finally:
+            closed.append(True)
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        if len(requests) == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "50"}, json={"error": {"code": "rate_limit_exceeded"}})
+        return httpx.Response(200, headers={"content-type": "text/event-stream", "x-ratelimit-limit-tokens": "6000000"},
+                              content=body())
+
+    client = OpenAIClient(api_key="test", use_cache=False, rate_limits={"gpt-4o": (6000, 600000)})
+    client.client = AsyncOpenAI(
+        api_key="test", max_retries=0, http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    async def run():
+        full = [section async for section in client.stream_proposal(IDEA, {"title": "Pet health"})]
+        # A client that disconnects after the first section
+        stream = client.stream_proposal({**IDEA, "title": "PetPal Pro"}, {"title": "Pet health"})
+        first = await stream.__anext__()
+        await stream.aclose()
+        return full, first
+
+    full, first = asyncio.run(run())
+    assert len(full) == len(PROPOSAL_SECTIONS) and first["title"] == "Problem Statement"
+    assert requests[1]["stream_options"] == {"include_usage": True}
+    assert client.usage["completion_tokens"] == 2100
+    stats = client.scheduler.get_stats()
+    assert stats["rate_limited"] == 1 and stats["models"]["gpt-4o"]["tpm"] == 6000000
+    # The disconnect says nothing about the model's health
+    assert client.router.get_stats()["health"]["gpt-4o"]["calls"] == 1
+    assert client.latencies.snapshot()["gpt-4o:generate_proposal"]["samples"] == 2
+    assert len(closed) == 2
+
+
+if __name__ == "__main__":
+    test_every_prompt_field_is_a_recorded_dependency()
+    test_small_edits_touch_few_sections()
+    test_only_affected_and_fallback_sections_are_rewritten()
+    test_fallback_proposal_is_rewritten_after_an_edit()
+    test_streamed_proposal_goes_through_quota_accounting()
+    print("✅ Proposal section tests passed")
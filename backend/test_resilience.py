@@ -0,0 +1,59 @@
+"""
+Unit test for the rate limiter, circuit breaker and source scoreboard
+"""
+
+import asyncio
+import time
+
+from resilience import TokenBucket, CircuitBreaker, SourceScoreboard
+
+
+def test_token_bucket_throttles_after_burst():
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # Two tokens from the burst, two more at 20/s
+    elapsed = asyncio.run(run())
+    assert 0.08 <= elapsed < 0.5
+    assert not TokenBucket(rate=1, capacity=1).try_acquire(2)
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()          # the half-open probe
+    assert not breaker.allow()      # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_scoreboard_drops_slow_source():
+    board = SourceScoreboard(latency_threshold=1.0, min_samples=3, drop_for=60)
+    for _ in range(3):
+        board.record("reddit", latency=0.2, ok=True)
+        board.record("github", latency=4.0, ok=True)
+
+    assert not board.is_dropped("reddit")
+    assert board.is_dropped("github")
+    assert board.snapshot()["github"]["dropped"]
+
+
+if __name__ == "__main__":
+    test_token_bucket_throttles_after_burst()
+    test_circuit_breaker_opens_and_half_opens()
+    test_scoreboard_drops_slow_source()
+    print("✅ Resilience tests passed")
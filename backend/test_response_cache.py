@@ -0,0 +1,102 @@
+"""
+Unit test for the two-tier response cache
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+
+from response_cache import ResponseCache, make_key
+
+
+def test_memory_and_disk_tiers():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache("serp", max_memory_entries=2, cache_dir=cache_dir)
+        key = make_key("serp_api1", "https://www.google.com/search?q=pets")
+
+        assert cache.get(key) is None
+        cache.set(key, [{"title": "Pets"}], ttl=60)
+        assert cache.get(key) == [{"title": "Pets"}]
+        cache.close()
+
+        # A fresh instance only has the disk tier
+        reopened = ResponseCache("serp", cache_dir=cache_dir)
+        assert reopened.get(key) == [{"title": "Pets"}]
+        assert reopened.get(key) == [{"title": "Pets"}]
+
+        stats = reopened.get_stats()
+        assert stats["disk_hits"] == 1
+        assert stats["memory_hits"] == 1
+        reopened.close()
+
+
+def test_ttl_and_lru_eviction():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache("serp", max_memory_entries=2, max_disk_entries=2, cache_dir=cache_dir)
+
+        cache.set("expired", 1, ttl=-1)
+        assert cache.get("expired") is None
+
+        cache.set("a", 1)
+        time.sleep(0.01)
+        cache.set("b", 2)
+        time.sleep(0.01)
+        cache.set("c", 3)
+        cache.flush()
+
+        # "a" fell out of both tiers, the two most recent survive
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] >= 2
+        cache.close()
+
+
+def test_disk_writes_are_batched():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache("llm", max_memory_entries=1, cache_dir=cache_dir, flush_interval=60, max_pending=10)
+        for i in range(5):
+            cache.set(f"k{i}", i)
+        assert cache._db.total_changes == 0
+        assert cache.get("k0") == 0  # out of memory, not written yet
+
+        cache.flush()
+        written = cache._db.total_changes
+        assert written == 5
+
+        # Disk hits only queue their access time
+        time.sleep(0.01)
+        touched_after = time.time()
+        for i in range(1, 5):
+            assert cache.get(f"k{i}") == i
+        assert cache._db.total_changes == written
+        assert cache.get_stats()["flushes"] == 1
+        cache.close()
+
+        db = sqlite3.connect(os.path.join(cache_dir, "llm.sqlite3"))
+        accessed = dict(db.execute("SELECT key, accessed_at FROM entries").fetchall())
+        db.close()
+        assert accessed["k0"] < touched_after
+        assert all(accessed[f"k{i}"] >= touched_after for i in range(1, 5))
+
+
+def test_queued_writes_are_flushed_without_further_calls():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache("llm", cache_dir=cache_dir, flush_interval=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache._db.total_changes == 0
+
+        time.sleep(0.3)
+        assert cache._db.total_changes == 2
+        assert cache.get_stats()["flushes"] == 1
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_memory_and_disk_tiers()
+    test_ttl_and_lru_eviction()
+    test_disk_writes_are_batched()
+    test_queued_writes_are_flushed_without_further_calls()
+    print("✅ Response cache tests passed")
@@ -0,0 +1,87 @@
+"""
+Unit test for the seen-URL store and delta collection
+"""
+
+import asyncio
+import tempfile
+
+from brightdata_integration import BrightDataCollector, SourceBatch
+from seen_store import SeenUrlStore
+
+DAY = 24 * 60 * 60
+
+
+def _items(*names):
+    return [{"title": name, "url": f"https://example.com/{name}?utm_source=x"} for name in names]
+
+
+def test_record_and_filter():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = SeenUrlStore(cache_dir=cache_dir)
+        assert store.last_crawl("Pets") is None
+
+        fresh = store.record("Pets", _items("a", "b", "a"), now=1000.0)
+        assert [item["title"] for item in fresh] == ["a", "b"]
+        assert store.last_crawl("  pets ") == 1000.0
+
+        # Tracking parameters don't make a URL new; filter_new records nothing
+        assert [item["title"] for item in store.filter_new("pets", _items("a", "c"), now=1001.0)] == ["c"]
+        assert store.filter_new("pets", _items("c"), now=1001.0) != []
+        assert store.filter_new("fitness", _items("a"), now=1001.0) != []
+        store.close()
+
+        reopened = SeenUrlStore(cache_dir=cache_dir)
+        assert [item["title"] for item in reopened.record("pets", _items("b", "c"), now=2000.0)] == ["c"]
+        assert reopened.count("pets", now=2000.0) == 3
+
+
+def test_urls_expire_after_ttl():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = SeenUrlStore(cache_dir=cache_dir, ttl=7 * DAY)
+        store.record("pets", _items("a"), now=0.0)
+        store.record("pets", _items("b"), now=5 * DAY)
+
+        assert store.filter_new("pets", _items("a", "b"), now=6 * DAY) == []
+        assert [item["title"] for item in store.filter_new("pets", _items("a", "b"), now=8 * DAY)] == ["a"]
+        assert store.count("pets", now=8 * DAY) == 1
+
+        assert [item["title"] for item in store.record("pets", _items("a", "b"), now=8 * DAY)] == ["a"]
+        store.close()
+
+        # "a" counts as seen again from its new first_seen
+        reopened = SeenUrlStore(cache_dir=cache_dir, ttl=7 * DAY)
+        assert [item["title"] for item in reopened.filter_new("pets", _items("a", "b"), now=13 * DAY)] == ["b"]
+
+
+def test_only_delta_runs_record_and_stamp_first_seen():
+    collector = BrightDataCollector(api_token="test", use_cache=False, seen_store=SeenUrlStore())
+    scraped = [_items("a", "b"), _items("a", "b", "c"), _items("a", "b", "c", "d")]
+
+    async def stream_trends(domain, **kwargs):
+        yield SourceBatch(source="google", status="completed", items=scraped.pop(0))
+
+    collector.stream_trends = stream_trends
+
+    async def run():
+        first = await collector.collect("pets", delta=True)
+        interactive = await collector.collect("pets", dedupe=False)
+        second = await collector.collect("pets", delta=True)
+        return first, interactive, second
+
+    first, interactive, second = asyncio.run(run())
+    assert [item["title"] for item in first.items] == ["a", "b"] and first.delta_since is None
+    assert all(item["first_seen"].endswith("+00:00") for item in first.items)
+
+    # The interactive run returns everything and leaves "c" for the next delta run
+    assert len(interactive.items) == 3 and interactive.new_items == 1
+    assert "first_seen" not in interactive.items[2]
+
+    assert [item["title"] for item in second.items] == ["c", "d"]
+    assert second.new_items == 2 and second.delta_since is not None
+
+
+if __name__ == "__main__":
+    test_record_and_filter()
+    test_urls_expire_after_ttl()
+    test_only_delta_runs_record_and_stamp_first_seen()
+    print("✅ Seen-URL store tests passed")
@@ -0,0 +1,159 @@
+"""
+Unit test for the semantic cache
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+from semantic_cache import SemanticCache
+from workflow import StartupHunterWorkflow
+
+
+def test_similar_requests_hit_and_survive_restart():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = SemanticCache("trends", threshold=0.9, cache_dir=cache_dir)
+        cache.store("pets", "pets", [1.0, 0.0, 0.2], {"trends": ["Pet insurance"]})
+
+        hit = cache.lookup([0.95, 0.05, 0.25])
+        assert hit["value"] == {"trends": ["Pet insurance"]}
+        assert hit["text"] == "pets" and hit["similarity"] > 0.9
+        assert cache.lookup([0.0, 1.0, 0.0]) is None
+        cache.close()
+
+        reopened = SemanticCache("trends", threshold=0.9, cache_dir=cache_dir)
+        assert reopened.lookup([1.0, 0.0, 0.2])["text"] == "pets"
+        assert reopened.get_stats()["hit_rate"] == 1.0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SemanticCache("ideas", threshold=0.99, max_entries=2)
+    cache.store("a", "a", [1.0, 0.0, 0.0], "A")
+    cache.store("b", "b", [0.0, 1.0, 0.0], "B")
+    assert cache.lookup([1.0, 0.0, 0.0])["value"] == "A"
+
+    cache.store("c", "c", [0.0, 0.0, 1.0], "C")
+    assert len(cache) == 2
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.lookup([1.0, 0.0, 0.0])["value"] == "A"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_partitions_do_not_share_hits():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = SemanticCache("ideas", threshold=0.9, cache_dir=cache_dir)
+        cache.store("a", "pets", [1.0, 0.0], "ideas for user A", partition="user-a")
+        assert cache.lookup([1.0, 0.0], "user-b") is None
+        assert cache.lookup([1.0, 0.0]) is None
+        cache.close()
+
+        reopened = SemanticCache("ideas", threshold=0.9, cache_dir=cache_dir)
+        assert reopened.lookup([1.0, 0.0], "user-a")["value"] == "ideas for user A"
+
+
+def test_ideas_are_not_shared_across_user_contexts():
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    workflow = StartupHunterWorkflow(semantic_cache=False)
+    workflow.idea_cache = SemanticCache("ideas", threshold=0.9)
+    generated = []
+
+    async def embed(text):
+        return [1.0, 0.0, 0.0]
+
+    async def generate_ideas(selected_trend, user_context, acontext_memory, regenerate=False):
+        generated.append(acontext_memory)
+        return [{"id": "idea-1", "title": f"Idea for {acontext_memory}"}]
+
+    workflow.openai.embed = embed
+    workflow.openai.generate_ideas = generate_ideas
+    trend = {"title": "Pet health", "painPoints": ["vet costs"]}
+    state = {"domain": "pets", "user_context": {"domain": "pets"}}
+
+    async def run():
+        first = await workflow._ideas_for(state, trend, "user: I am a vet")
+        other = await workflow._ideas_for(state, trend, "user: I run a pet shop")
+        again = await workflow._ideas_for(state, trend, "user: I am a vet")
+        return first, other, again
+
+    first, other, again = asyncio.run(run())
+    assert generated == ["user: I am a vet", "user: I run a pet shop"]
+    assert other[0]["title"] == "Idea for user: I run a pet shop"
+    assert again == first
+
+
+def test_fallback_ideas_are_not_cached():
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    workflow = StartupHunterWorkflow(semantic_cache=False)
+    workflow.idea_cache = SemanticCache("ideas", threshold=0.9)
+    calls = []
+
+    async def embed(text):
+        return [1.0, 0.0, 0.0]
+
+    async def complete_items(schema, **kwargs):
+        calls.append(kwargs["method"])
+        if len(calls) == 1:
+            raise RuntimeError("429 Too Many Requests")
+        return [{"id": "x", "title": "Vet chat", "tagline": "t", "reasoning": "r", "recommended": True}]
+
+    workflow.openai.embed = embed
+    workflow.openai._complete_items = complete_items
+    trend = {"title": "Pet health", "painPoints": ["vet costs"]}
+
+    async def run():
+        return [await workflow._ideas_for({"domain": "pets"}, trend, None) for _ in range(3)]
+
+    failed, recovered, cached = asyncio.run(run())
+    assert all(idea["fallback"] for idea in failed)
+    assert recovered[0]["title"] == "Vet chat" and "fallback" not in recovered[0]
+    assert cached == recovered
+    assert calls == ["generate_ideas", "generate_ideas"]
+
+
+def test_hits_queue_their_access_time():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = SemanticCache("trends", threshold=0.9, cache_dir=cache_dir, flush_interval=0.1)
+        cache.store("pets", "pets", [1.0, 0.0], "trends")
+        written = cache._db.total_changes
+        stored_at = time.time()
+
+        time.sleep(0.01)
+        for _ in range(5):
+            assert cache.lookup([1.0, 0.0])["value"] == "trends"
+        assert cache._db.total_changes == written
+
+        time.sleep(0.3)  # written by the timer, no further call needed
+        db = sqlite3.connect(os.path.join(cache_dir, "semantic_trends.sqlite3"))
+        (accessed_at,) = db.execute("SELECT accessed_at FROM entries").fetchone()
+        db.close()
+        assert accessed_at > stored_at
+        cache.close()
+
+
+def test_slow_embedding_skips_the_cache():
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    workflow = StartupHunterWorkflow(semantic_cache=False, embed_timeout=0.1)
+    cache = SemanticCache("ideas", threshold=0.9)
+    cache.store("pets", "pets", [1.0, 0.0], "ideas")
+
+    async def embed(text):
+        await asyncio.sleep(5)
+        return [1.0, 0.0]
+
+    workflow.openai.embed = embed
+    start = time.monotonic()
+    assert asyncio.run(workflow._semantic_lookup(cache, "pets", {})) == (None, None)
+    assert time.monotonic() - start < 1
+
+
+if __name__ == "__main__":
+    test_similar_requests_hit_and_survive_restart()
+    test_least_recently_used_entries_are_evicted()
+    test_partitions_do_not_share_hits()
+    test_ideas_are_not_shared_across_user_contexts()
+    test_fallback_ideas_are_not_cached()
+    test_hits_queue_their_access_time()
+    test_slow_embedding_skips_the_cache()
+    print("✅ Semantic cache tests passed")
@@ -0,0 +1,85 @@
+"""
+Unit test for single-flight request coalescing
+"""
+
+import asyncio
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_identical_requests_share_one_call():
+    async def run():
+        flight = SingleFlight("test")
+        calls = []
+
+        async def cluster(domain):
+            calls.append(domain)
+            await asyncio.sleep(0.02)
+            return f"trends for {domain}"
+
+        results = await asyncio.gather(
+            *[flight.run("fintech", lambda: cluster("fintech")) for _ in range(5)],
+            flight.run("health", lambda: cluster("health"))
+        )
+        assert results == ["trends for fintech"] * 5 + ["trends for health"]
+        assert calls == ["fintech", "health"]
+
+        # Finished calls are not reused: the next request starts a new one
+        await flight.run("fintech", lambda: cluster("fintech"))
+        assert calls.count("fintech") == 2
+        return flight.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["calls"] == 3 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+
+
+def test_one_waiter_leaving_keeps_the_call_alive():
+    async def run():
+        flight = SingleFlight("test")
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(0.05)
+                return "done"
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        leaver = asyncio.create_task(flight.run("k", slow))
+        stayer = asyncio.create_task(flight.run("k", slow))
+        await asyncio.sleep(0.01)
+        leaver.cancel()
+
+        assert await stayer == "done"
+        assert leaver.cancelled() and not cancelled
+
+        # When every waiter leaves, the shared call is cancelled too
+        only = asyncio.create_task(flight.run("k", slow))
+        await asyncio.sleep(0.01)
+        only.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled == [True] and flight.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_failure_reaches_every_waiter():
+    async def run():
+        flight = SingleFlight("test")
+
+        async def broken():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("rate limited")
+
+        return await asyncio.gather(flight.run("k", broken), flight.run("k", broken), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+if __name__ == "__main__":
+    test_concurrent_identical_requests_share_one_call()
+    test_one_waiter_leaving_keeps_the_call_alive()
+    test_failure_reaches_every_waiter()
+    print("✅ Single-flight tests passed")
@@ -0,0 +1,54 @@
+"""
+Unit test for the speculative pre-generation scheduler
+"""
+
+import asyncio
+
+from speculation import SpeculativeScheduler
+
+
+def test_claim_reuses_hit_and_cancels_other_guesses():
+    async def run():
+        scheduler = SpeculativeScheduler()
+        started = asyncio.Event()
+
+        async def ideas(name, delay):
+            started.set()
+            await asyncio.sleep(delay)
+            return [f"idea for {name}"]
+
+        scheduler.start("session-1", ("ideas", "trend-1"), lambda: ideas("trend-1", 0.05))
+        scheduler.start("session-1", ("ideas", "trend-2"), lambda: ideas("trend-2", 10))
+        assert not scheduler.start("session-1", ("ideas", "trend-1"), lambda: ideas("again", 0))
+        await started.wait()
+
+        # In flight: the claim waits for it, and the other guess is cancelled
+        assert await scheduler.claim("session-1", ("ideas", "trend-1")) == ["idea for trend-1"]
+        assert scheduler.in_flight == 0
+
+        assert await scheduler.claim("session-1", ("ideas", "trend-3")) is None
+        return scheduler.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["cancelled"] == 1
+
+
+def test_failed_guess_is_a_miss():
+    async def run():
+        scheduler = SpeculativeScheduler(max_tasks=1)
+
+        async def broken():
+            raise RuntimeError("rate limited")
+
+        scheduler.start("s", ("proposal", "idea-1"), broken)
+        assert not scheduler.start("s", ("proposal", "idea-2"), broken)  # at capacity
+        return await scheduler.claim("s", ("proposal", "idea-1")), scheduler.get_stats()
+
+    result, stats = asyncio.run(run())
+    assert result is None and stats["failed"] == 1
+
+
+if __name__ == "__main__":
+    test_claim_reuses_hit_and_cancels_other_guesses()
+    test_failed_guess_is_a_miss()
+    print("✅ Speculation tests passed")
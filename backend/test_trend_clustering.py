@@ -0,0 +1,50 @@
+"""
+Unit test for local trend pre-clustering
+"""
+
+from trend_clustering import pre_cluster
+
+TOPICS = {
+    "pets": ["dog walking app for busy owners", "cat litter subscription box", "vet telehealth for dogs and cats",
+             "pet insurance comparison for dog owners", "dog training videos for puppy owners"],
+    "payments": ["invoice payments for freelancers", "crypto payments api for merchants", "payroll payments for contractors",
+                 "recurring invoice payments for agencies", "merchant payments reconciliation tool"],
+    "devtools": ["open source kubernetes debugging cli", "kubernetes cost monitoring dashboard",
+                 "cli for kubernetes log search", "kubernetes deployment preview environments", "debugging cli for docker"],
+}
+SOURCES = ["Product Hunt", "GitHub", "Reddit r/startups", "Hacker News"]
+
+
+def _items():
+    items = []
+    for topic, titles in TOPICS.items():
+        for i, title in enumerate(titles):
+            items.append({"title": title, "snippet": f"{title} discussion", "url": f"https://example.com/{topic}/{i}",
+                          "source": SOURCES[i % len(SOURCES)], "rank": i + 1, "topic": topic})
+    return items
+
+
+def test_items_group_by_topic_with_representatives():
+    clusters = pre_cluster(_items(), n_clusters=3, representatives=3)
+
+    assert len(clusters) == 3
+    for cluster in clusters:
+        assert len({item["topic"] for item in cluster.items}) == 1
+        assert len(cluster.representatives) == 3
+        assert len({item["source"] for item in cluster.representatives}) == 3
+        assert cluster.terms
+
+    assert [c.cluster_id for c in clusters] == ["c1", "c2", "c3"]
+    assert pre_cluster(_items(), n_clusters=3)[0].items == clusters[0].items  # deterministic
+
+
+def test_small_inputs():
+    assert pre_cluster([]) == []
+    single = pre_cluster([{"title": "x", "snippet": ""}])
+    assert len(single) == 1 and len(single[0].items) == 1
+
+
+if __name__ == "__main__":
+    test_items_group_by_topic_with_representatives()
+    test_small_inputs()
+    print("✅ Trend clustering tests passed")
@@ -0,0 +1,83 @@
+"""
+Unit test for trend collection from the source registry
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from brightdata_integration import BrightDataCollector, TrendSource
+
+
+def _collector(handler, sources, **kwargs) -> BrightDataCollector:
+    collector = BrightDataCollector(
+        api_token="test", use_cache=False, track_seen=False, sources=sources, zone_rate_limit=1000, **kwargs
+    )
+    collector._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return collector
+
+
+def _search(request):
+    """(query, result offset) of a SERP request"""
+    url = httpx.URL(json.loads(request.content)["url"])
+    return url.params["q"], int(url.params.get("start", 0))
+
+
+def _organic(*names):
+    return {"organic": [{"title": name, "link": f"https://example.com/{name}", "snippet": ""} for name in names]}
+
+
+def test_global_deadline_returns_what_arrived():
+    async def handler(request):
+        query, _ = _search(request)
+        await asyncio.sleep({"fast": 0.0, "slow": 2.0, "stuck": 0.5}[query])
+        return httpx.Response(200, json=_organic(f"{query}-1", f"{query}-2"))
+
+    collector = _collector(handler, [
+        TrendSource(name="fast", label="Fast", query_template="fast", weight=1.0),
+        TrendSource(name="slow", label="Slow", query_template="slow", weight=2.0),
+        TrendSource(name="stuck", label="Stuck", query_template="stuck", deadline=0.1),
+    ])
+
+    start = time.monotonic()
+    result = asyncio.run(collector.collect("pets", deadline=0.3))
+
+    assert time.monotonic() - start < 1
+    assert [item["title"] for item in result.items] == ["fast-1", "fast-2"]
+    assert result.completed == ["fast"]
+    # One ran past its own deadline, one past the global one
+    assert sorted(result.timed_out) == ["slow", "stuck"]
+    assert not result.used_fallback
+
+
+def test_deep_collection_merges_pages_and_variants_by_rank():
+    results = {
+        ("pets trending", 0): _organic("a", "b"),
+        ("pets trending", 10): _organic("c"),
+        ("pets launch", 0): _organic("x", "a?utm_source=serp", "y"),
+        ("pets launch", 10): None,  # this page fails
+    }
+
+    def handler(request):
+        organic = results[_search(request)]
+        return httpx.Response(502) if organic is None else httpx.Response(200, json=organic)
+
+    source = TrendSource(
+        name="product_hunt", label="Product Hunt", query_template="{query} trending", variants=("{query} launch",)
+    )
+    collector = _collector(handler, [source])
+    items = asyncio.run(collector.collect("pets", pages=2, query_variants=1, dedupe=False)).items
+
+    # Rank 1 of every variant first, then rank 2, ...; later pages after the first
+    assert [item["title"] for item in items] == ["a", "x", "b", "y", "c"]
+    assert [item["rank"] for item in items] == [1, 1, 2, 3, 11]
+    # The same page found by two variants is kept once
+    assert sum(item["url"].startswith("https://example.com/a") for item in items) == 1
+
+
+if __name__ == "__main__":
+    test_global_deadline_returns_what_arrived()
+    test_deep_collection_merges_pages_and_variants_by_rank()
+    print("✅ Trend collection tests passed")
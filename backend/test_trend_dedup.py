@@ -0,0 +1,81 @@
+"""
+Unit test for raw trend deduplication
+"""
+
+from trend_dedup import canonicalize_url, dedupe_trends, TrendDeduplicator
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("http://www.Reddit.com/r/startups/comments/abc/?utm_source=share&utm_medium=web#top") == \
+        "https://reddit.com/r/startups/comments/abc"
+    assert canonicalize_url("https://github.com/org/repo?tab=readme&ref=producthunt") == \
+        "https://github.com/org/repo?tab=readme"
+
+
+def test_merges_url_and_near_duplicates():
+    items = [
+        {
+            "title": "Show HN: Open-source pet health tracker for dog owners",
+            "url": "https://news.ycombinator.com/item?id=1",
+            "snippet": "A tracker that reminds you of vet visits, vaccines and meds, 300 points",
+            "source": "Hacker News"
+        },
+        {
+            "title": "Show HN: Open-source pet health tracker for dog owners - Hacker News",
+            "url": "https://news.ycombinator.com/item?id=1&utm_source=twitter",
+            "snippet": "A tracker that reminds you of vet visits",
+            "source": "Hacker News"
+        },
+        {
+            "title": "Open-source pet health tracker for dog owners : r/startups - Reddit",
+            "url": "https://www.reddit.com/r/startups/comments/xyz/",
+            "snippet": "A tracker that reminds you of vet visits, vaccines and meds, 300 points",
+            "source": "Reddit r/startups"
+        },
+        {
+            "title": "AI bookkeeping for freelancers",
+            "url": "https://producthunt.com/posts/ledger",
+            "snippet": "Automatic receipts and invoices",
+            "source": "Product Hunt"
+        }
+    ]
+
+    unique = dedupe_trends(items)
+
+    assert [item["source"] for item in unique] == ["Hacker News", "Product Hunt"]
+    assert unique[0]["also_seen"] == [{"source": "Reddit r/startups", "url": "https://www.reddit.com/r/startups/comments/xyz/"}]
+    assert "url" in unique[1] and "also_seen" not in unique[1]
+    # Inputs are not mutated
+    assert "also_seen" not in items[0]
+
+
+def test_incremental_batches():
+    dedup = TrendDeduplicator()
+    first = dedup.extend([{"title": "Vector database benchmarks", "url": "https://a.com/x", "snippet": ""}])
+    second = dedup.extend([
+        {"title": "Vector database benchmarks", "url": "https://b.com/y", "snippet": ""},
+        {"title": "Rust web frameworks compared", "url": "https://c.com/z", "snippet": ""}
+    ])
+
+    assert len(first) == 1
+    assert [item["url"] for item in second] == ["https://c.com/z"]
+    assert dedup.duplicates_removed == 1
+
+
+def test_null_snippets_are_merged():
+    unique = dedupe_trends([
+        {"title": "Vet telehealth for rural pet owners", "url": "https://a.com/x", "snippet": None},
+        {"title": "Vet telehealth for rural pet owners", "url": "https://b.com/y", "snippet": "Video calls with vets"},
+        {"title": "Vet telehealth for rural pet owners", "url": "https://c.com/z", "snippet": None}
+    ])
+
+    assert len(unique) == 1
+    assert unique[0]["snippet"] == "Video calls with vets"
+
+
+if __name__ == "__main__":
+    test_canonicalize_url()
+    test_merges_url_and_near_duplicates()
+    test_incremental_batches()
+    test_null_snippets_are_merged()
+    print("✅ Trend dedup tests passed")
@@ -0,0 +1,200 @@
+"""
+Local Trend Pre-Clustering
+
+Groups raw trend items before the LLM sees them, so clustering cost no
+longer grows with the number of scraped items:
+- items are TF-IDF vectorized with NumPy (title, snippet and page text)
+- spherical k-means (k-means++ seeding, fixed seed) groups them by topic
+- a few representative items per cluster are picked, close to the centroid
+  and spread across sources
+
+The LLM then only names, describes and scores the clusters from their
+representatives and top terms.
+"""
+
+import re
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from page_enrichment import decompress_extract
+from prompt_builder import raw_item_relevance
+
+TOKEN = re.compile(r"[a-z][a-z0-9+#]{2,}")
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "your", "you", "are", "was", "were", "will",
+    "have", "has", "had", "not", "but", "can", "all", "any", "our", "out", "its", "into", "about",
+    "what", "when", "who", "how", "why", "which", "their", "them", "they", "there", "than", "then",
+    "more", "most", "just", "also", "use", "using", "new", "get", "one", "like", "best", "top",
+    "http", "https", "www", "com", "reddit", "github", "product", "hunt", "hacker", "news",
+    "show", "ask", "comments", "points", "ago", "hours", "days", "startup", "startups",
+}
+
+
+@dataclass
+class TrendCluster:
+    cluster_id: str
+    items: List[Dict[str, Any]]
+    representatives: List[Dict[str, Any]] = field(default_factory=list)
+    terms: List[str] = field(default_factory=list)
+    cohesion: float = 0.0
+
+    @property
+    def sources(self) -> Dict[str, int]:
+        return dict(Counter(item.get("source", "") for item in self.items))
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    # Titles count twice: they are the densest description of an item
+    title = item.get("title", "")
+    return " ".join([title, title, item.get("snippet", ""), decompress_extract(item)[:600]])
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def tfidf_matrix(texts: List[str], max_features: int = 2000, max_df: float = 0.6) -> Tuple[np.ndarray, List[str]]:
+    """Rows of L2-normalized sublinear TF-IDF vectors and the vocabulary"""
+    documents = [Counter(tokenize(text)) for text in texts]
+    document_frequency = Counter(term for counts in documents for term in counts)
+
+    # Terms in only one document can't link items and terms in most documents
+    # can't separate them; fall back to all terms for tiny inputs
+    ceiling = max(2, int(max_df * len(texts)))
+    shared = [term for term, df in document_frequency.items() if 1 < df <= ceiling] or list(document_frequency)
+    vocabulary = sorted(shared, key=lambda term: (-document_frequency[term], term))[:max_features]
+    index = {term: i for i, term in enumerate(vocabulary)}
+
+    matrix = np.zeros((len(texts), len(vocabulary)), dtype=np.float32)
+    for row, counts in enumerate(documents):
+        for term, count in counts.items():
+            column = index.get(term)
+            if column is not None:
+                matrix[row, column] = 1.0 + math.log(count)
+
+    idf = np.log((1 + len(texts)) / (1 + np.array([document_frequency[t] for t in vocabulary], dtype=np.float32))) + 1
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms, vocabulary
+
+
+def spherical_kmeans(
+    matrix: np.ndarray,
+    k: int,
+    iterations: int = 30,
+    seed: int = 7,
+    restarts: int = 4
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cosine k-means on unit rows; returns (labels, unit centroids)
+
+    Runs several seedings and keeps the one with the highest total
+    item-to-centroid similarity.
+    """
+    best, best_score = None, -np.inf
+    for attempt in range(restarts):
+        labels, centroids = _kmeans_run(matrix, k, iterations, seed + attempt)
+        score = float(np.sum(np.einsum("ij,ij->i", matrix, centroids[labels])))
+        if score > best_score:
+            best, best_score = (labels, centroids), score
+    return best
+
+
+def _kmeans_run(matrix: np.ndarray, k: int, iterations: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+
+    # k-means++ seeding on cosine distance
+    centroids = [matrix[rng.integers(n)]]
+    for _ in range(1, k):
+        distance = 1.0 - np.max(matrix @ np.array(centroids).T, axis=1)
+        distance = np.clip(distance, 0, None) ** 2
+        total = distance.sum()
+        choice = rng.choice(n, p=distance / total) if total > 0 else rng.integers(n)
+        centroids.append(matrix[choice])
+    centroids = np.array(centroids)
+
+    labels = np.full(n, -1)
+    for _ in range(iterations):
+        similarity = matrix @ centroids.T
+        new_labels = np.argmax(similarity, axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        for cluster in range(k):
+            members = matrix[labels == cluster]
+            if len(members):
+                centroid = members.sum(axis=0)
+            else:
+                # Re-seed an empty cluster with the item worst served by its centroid
+                centroid = matrix[int(np.argmin(similarity[np.arange(n), labels]))]
+            norm = np.linalg.norm(centroid)
+            centroids[cluster] = centroid / norm if norm else centroid
+
+    return labels, centroids
+
+
+def pre_cluster(
+    items: List[Dict[str, Any]],
+    n_clusters: int = 5,
+    representatives: int = 4,
+    top_terms: int = 6
+) -> List[TrendCluster]:
+    """
+    Group items into at most n_clusters topic clusters
+
+    Clusters are returned by total item relevance, best first.
+    """
+    if not items:
+        return []
+
+    matrix, vocabulary = tfidf_matrix([item_text(item) for item in items])
+    k = max(1, min(n_clusters, len(items)))
+    if matrix.shape[1] == 0:
+        labels, centroids = np.zeros(len(items), dtype=int), np.zeros((1, 0), dtype=np.float32)
+        k = 1
+    else:
+        labels, centroids = spherical_kmeans(matrix, k)
+
+    clusters = []
+    for cluster in range(k):
+        members = np.flatnonzero(labels == cluster)
+        if not len(members):
+            continue
+
+        similarity = matrix[members] @ centroids[cluster] if matrix.shape[1] else np.ones(len(members))
+        relevance = np.array([raw_item_relevance(items[i]) for i in members])
+        order = members[np.argsort(-(similarity * relevance))]
+
+        # Closest to the centroid first, one per source before any source gets a second
+        picked, per_source = [], Counter()
+        for limit in range(1, representatives + 1):
+            for i in order:
+                source = items[i].get("source", "")
+                if len(picked) < representatives and i not in picked and per_source[source] < limit:
+                    picked.append(i)
+                    per_source[source] += 1
+
+        terms = []
+        if matrix.shape[1]:
+            weights = matrix[members].sum(axis=0)
+            terms = [vocabulary[j] for j in np.argsort(-weights)[:top_terms] if weights[j] > 0]
+
+        clusters.append(TrendCluster(
+            cluster_id=f"c{len(clusters) + 1}",
+            items=[items[i] for i in members],
+            representatives=[items[i] for i in picked],
+            terms=terms,
+            cohesion=round(float(similarity.mean()), 3)
+        ))
+
+    clusters.sort(key=lambda c: sum(raw_item_relevance(item) for item in c.items), reverse=True)
+    for number, cluster in enumerate(clusters, start=1):
+        cluster.cluster_id = f"c{number}"
+    return clusters
@@ -0,0 +1,180 @@
+"""
+Trend Deduplication
+
+Removes duplicate raw trend items before clustering:
+- URLs are canonicalized (tracking params, fragments, www., trailing slash)
+- Near-duplicate titles/snippets are found with MinHash + LSH banding
+- Duplicates are merged into one record that keeps their evidence in "also_seen"
+"""
+
+import re
+import zlib
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import numpy as np
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "ref_url", "referrer", "source", "si", "share_id", "context"
+}
+
+# Site suffixes Google appends to result titles ("... : r/startups - Reddit")
+TITLE_SUFFIX = re.compile(
+    r"\s*(?:[-|:·–—]\s*)+(?:r/\w+\s*[-|]?\s*)?(?:reddit|github|product\s*hunt|hacker\s*news)\s*$",
+    re.IGNORECASE
+)
+NON_WORD = re.compile(r"[^\w\s]+")
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different links to the same page compare equal"""
+    if not url:
+        return ""
+
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    host = (parts.hostname or "").lower()
+    for prefix in ("www.", "m.", "old.", "mobile."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=False)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or ""
+
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def normalize_text(text: str) -> str:
+    text = TITLE_SUFFIX.sub("", text or "")
+    return " ".join(NON_WORD.sub(" ", text.lower()).split())
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    words = text.split()
+    if len(words) < size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class TrendDeduplicator:
+    """
+    Incremental near-duplicate index
+
+    Items can be added in batches (e.g. per streamed source); each call returns
+    only the records that were new.
+    """
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 64, bands: int = 16, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+        self.records: List[Dict[str, Any]] = []
+        self.duplicates_removed = 0
+        self._signatures: List[Optional[np.ndarray]] = []
+        self._by_url: Dict[str, int] = {}
+        self._by_title: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the word shingles of text"""
+        tokens = shingles(text)
+        if not tokens:
+            return None
+
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+        return ((self._a * hashes + self._b) % _MERSENNE_PRIME).min(axis=1)
+
+    def add(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Add one item; return its record if new, None if it was merged into an existing one"""
+        url = canonicalize_url(item.get("url", ""))
+        title = normalize_text(item.get("title", ""))
+        signature = self.signature(f"{title} {normalize_text(item.get('snippet', ''))}")
+
+        match = self._find(url, title, signature)
+        if match is not None:
+            self._merge(self.records[match], item)
+            self.duplicates_removed += 1
+            return None
+
+        record = dict(item)
+        index = len(self.records)
+        self.records.append(record)
+        self._signatures.append(signature)
+
+        if url:
+            self._by_url[url] = index
+        if title:
+            self._by_title.setdefault(title, index)
+        if signature is not None:
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, []).append(index)
+
+        return record
+
+    def extend(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add a batch of items and return the ones that were new"""
+        added = []
+        for item in items:
+            record = self.add(item)
+            if record is not None:
+                added.append(record)
+        return added
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _find(self, url: str, title: str, signature: Optional[np.ndarray]) -> Optional[int]:
+        if url and url in self._by_url:
+            return self._by_url[url]
+        if title and title in self._by_title:
+            return self._by_title[title]
+        if signature is None:
+            return None
+
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        best, best_score = None, self.threshold
+        for index in candidates:
+            score = float(np.mean(self._signatures[index] == signature))
+            if score >= best_score:
+                best, best_score = index, score
+        return best
+
+    def _merge(self, record: Dict[str, Any], duplicate: Dict[str, Any]):
+        """Keep the duplicate's evidence on the surviving record"""
+        evidence = {"source": duplicate.get("source", ""), "url": duplicate.get("url", "")}
+        same_page = canonicalize_url(evidence["url"]) == canonicalize_url(record.get("url", ""))
+        if not same_page and evidence not in record.get("also_seen", []):
+            record.setdefault("also_seen", []).append(evidence)
+        # SERP results can carry "snippet": null
+        if len(duplicate.get("snippet") or "") > len(record.get("snippet") or ""):
+            record["snippet"] = duplicate["snippet"]
+
+
+def dedupe_trends(items: List[Dict[str, Any]], threshold: float = 0.6) -> List[Dict[str, Any]]:
+    """Return items with URL and near-duplicate title/snippet duplicates merged"""
+    dedup = TrendDeduplicator(threshold=threshold)
+    dedup.extend(items)
+    return dedup.records
@@ -4,7 +4,7 @@ Startup Hunter LangGraph Workflow
 Orchestrates the 6-stage pipeline with state management
 """
 
-from typing import TypedDict, Annotated, List, Dict, Any, Optional
+from typing import TypedDict, Annotated, List, Dict, Any, Optional, Tuple, AsyncIterator
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 import operator
@@ -13,18 +13,26 @@ import subprocess
 import os
 import time
 import signal
+import contextlib
 from pathlib import Path
 
-from brightdata_integration import BrightDataCollector
-from openai_integration import OpenAIClient
+from brightdata_integration import BrightDataCollector, CollectionResult
+from openai_integration import OpenAIClient, close_shared_http_client
 from acontext_integration import AcontextClient
 from actionbook_integration import ActionBookClient
+from evidence_validator import EvidenceValidator
+from semantic_cache import SemanticCache
+from response_cache import ResponseCache, DEFAULT_CACHE_DIR, make_key
+from opportunity_scoring import ScoringWeights, DEFAULT_WEIGHTS, rank_trends
+from speculation import SpeculativeScheduler
+from seen_store import normalize_domain
 
 
 class WorkflowState(TypedDict):
     stage: str
     domain: Optional[str]
     raw_trends: List[Dict[str, Any]]
+    collection_report: Optional[Dict[str, Any]]
     clustered_trends: List[Dict[str, Any]]
     selected_trend: Optional[Dict[str, Any]]
     ideas: List[Dict[str, Any]]
@@ -34,6 +42,9 @@ class WorkflowState(TypedDict):
     test_report: Optional[Dict[str, Any]]
     user_context: Dict[str, Any]
     acontext_memory: Optional[str]
+    regenerate: bool
+    tenant_id: Optional[str]
+    latency_tier: Optional[str]
     session_id: Optional[str]
     error: Optional[str]
     mvp_server_pid: Optional[int]
@@ -42,11 +53,70 @@ class WorkflowState(TypedDict):
 
 class StartupHunterWorkflow:
     
-    def __init__(self):
+    def __init__(
+        self,
+        early_cluster_min_items: int = 20,
+        enrich_pages: int = 0,
+        validate_evidence: bool = True,
+        semantic_cache: bool = True,
+        domain_similarity: float = 0.85,
+        trend_similarity: float = 0.92,
+        embed_timeout: float = 1.5,
+        parallel_proposal: bool = False,
+        speculate: bool = False,
+        speculate_top_k: int = 2,
+        hedge_llm: bool = False,
+        shadow_rate: float = 0.0
+    ):
+        """
+        Args:
+            early_cluster_min_items: In collect_and_cluster, start clustering as
+                soon as this many raw items have streamed in instead of waiting
+                for every source (0 waits for all sources)
+            enrich_pages: Fetch the main text of this many top result pages
+                before clustering (0 disables page enrichment)
+            validate_evidence: Drop dead evidence URLs from clustered trends
+            semantic_cache: Reuse trends/ideas of earlier requests that mean
+                nearly the same thing (e.g. "pets" and "pet care")
+            domain_similarity: Cosine similarity above which a past domain's trends are reused
+            trend_similarity: Cosine similarity above which a past trend's ideas are reused
+            embed_timeout: Seconds the semantic cache lookup may spend embedding
+                the request before the stage goes on without the cache
+            parallel_proposal: Generate the proposal as an outline plus concurrent
+                per-section calls instead of one long completion
+            speculate: Pre-generate ideas for the top trends and the proposal for
+                the recommended idea while the user is still reading
+            speculate_top_k: Trends whose ideas are pre-generated
+            hedge_llm: Re-send LLM calls that are slower than 95% of recent ones
+                and take whichever answer comes first
+            shadow_rate: Share of LLM calls also run through the other model,
+                logged to shadow_eval.jsonl in the cache directory
+        """
+        self.early_cluster_min_items = early_cluster_min_items
+        self.enrich_pages = enrich_pages
+        self.parallel_proposal = parallel_proposal
+        self.speculate_top_k = speculate_top_k
+        self.embed_timeout = embed_timeout
+        self.speculation = SpeculativeScheduler() if speculate else None
         self.brightdata = BrightDataCollector()
-        self.openai = OpenAIClient()
+        self.openai = OpenAIClient(
+            hedge=hedge_llm,
+            shadow_rate=shadow_rate,
+            shadow_log=os.path.join(DEFAULT_CACHE_DIR, "shadow_eval.jsonl") if shadow_rate else None
+        )
         self.acontext = AcontextClient()
         self.actionbook = ActionBookClient()
+        self.evidence_validator = EvidenceValidator() if validate_evidence else None
+        self.trend_cache = SemanticCache(
+            "trends", threshold=domain_similarity, default_ttl=6 * 60 * 60, cache_dir=DEFAULT_CACHE_DIR
+        ) if semantic_cache else None
+        self.idea_cache = SemanticCache(
+            "ideas", threshold=trend_similarity, default_ttl=24 * 60 * 60, cache_dir=DEFAULT_CACHE_DIR
+        ) if semantic_cache else None
+        # Per-tenant opportunity scoring weights, kept across restarts and written through
+        self.scoring_weights = ResponseCache(
+            "scoring_weights", default_ttl=365 * 24 * 60 * 60, cache_dir=DEFAULT_CACHE_DIR, flush_interval=0
+        )
         self.checkpointer = MemorySaver()
         self.active_servers = {}
         
@@ -79,19 +149,24 @@ class StartupHunterWorkflow:
         domain = state.get("domain", "")
         
         try:
-            raw_trends = await self.brightdata.collect_all_trends(domain)
+            collection = await self.brightdata.collect(domain)
+            raw_trends = collection.items
+            
+            if self.enrich_pages and not collection.used_fallback:
+                await self.brightdata.enrich(raw_trends, top_n=self.enrich_pages)
             
             if state.get("session_id"):
                 await self.acontext.store_message(
                     session_id=state["session_id"],
                     role="assistant",
                     content=f"Collected {len(raw_trends)} trends from web scraping",
-                    meta={"stage": "trends", "count": len(raw_trends)}
+                    meta={"stage": "trends", "count": len(raw_trends), "sources": collection.report()}
                 )
             
             return {
                 **state,
                 "raw_trends": raw_trends,
+                "collection_report": collection.report(),
                 "stage": "trends_collected"
             }
         
@@ -108,9 +183,14 @@ class StartupHunterWorkflow:
         domain = state.get("domain", "")
         
         try:
-            clustered_trends = self.openai.cluster_trends(raw_trends, domain)
+            clustered_trends = await self.openai.cluster_trends(
+                raw_trends, domain, regenerate=state.get("regenerate", False)
+            )
+            
+            clustered_trends = rank_trends(clustered_trends, self.weights_for(state.get("tenant_id")))
             
-            clustered_trends.sort(key=lambda x: x.get("score", 0), reverse=True)
+            if self.evidence_validator is not None:
+                await self.evidence_validator.validate_trends(clustered_trends)
             
             if state.get("session_id"):
                 await self.acontext.store_message(
@@ -133,8 +213,113 @@ class StartupHunterWorkflow:
                 "stage": "error"
             }
     
-    async def _generate_ideas(self, state: WorkflowState) -> WorkflowState:
-        """Stage 3: Generate startup ideas using OpenAI + Acontext"""
+    async def _collect_and_cluster(self, state: WorkflowState) -> WorkflowState:
+        """
+        Stages 1+2 overlapped: stream raw trends and start clustering as soon
+        as early_cluster_min_items have arrived
+        
+        Sources that finish while clustering is running still land in
+        raw_trends; the collection is cancelled once clustering returns.
+        Only a clustering of every collected item goes into the semantic
+        cache, so sources slower than the snapshot aren't left out for hours.
+        """
+        domain = state.get("domain", "")
+        
+        request_text = f"Startup trends in: {normalize_domain(domain)}"
+        hit, vector = await self._semantic_lookup(self.trend_cache, request_text, state)
+        if hit:
+            cached = hit["value"]
+            report = {
+                **cached["collection_report"],
+                "semantic_cache": {"matched": hit["text"], "similarity": hit["similarity"]}
+            }
+            if state.get("session_id"):
+                await self.acontext.store_message(
+                    session_id=state["session_id"],
+                    role="assistant",
+                    content=f"Identified {len(cached['clustered_trends'])} trending opportunities",
+                    meta={"stage": "trends", "trends": cached["clustered_trends"], "sources": report}
+                )
+            return {
+                **state,
+                "raw_trends": cached["raw_trends"],
+                "clustered_trends": rank_trends(cached["clustered_trends"], self.weights_for(state.get("tenant_id"))),
+                "collection_report": report,
+                "stage": "trends_ready"
+            }
+        
+        collection = CollectionResult(items=[])
+        enough = asyncio.Event()
+        
+        async def consume():
+            stream = self.brightdata.stream_trends(domain)
+            try:
+                async with contextlib.aclosing(stream):
+                    async for batch in stream:
+                        collection.add(batch)
+                        if self.early_cluster_min_items and len(collection.items) >= self.early_cluster_min_items:
+                            enough.set()
+            finally:
+                # Also wakes the waiter when the stream fails, so the error is raised below
+                enough.set()
+        
+        consumer = asyncio.create_task(consume())
+        try:
+            await enough.wait()
+            if consumer.done() and consumer.exception():
+                raise consumer.exception()
+            
+            snapshot = list(collection.items)
+            if self.enrich_pages and not collection.used_fallback:
+                await self.brightdata.enrich(snapshot, top_n=self.enrich_pages)
+            clustered = await self._cluster_trends({**state, "raw_trends": snapshot})
+            complete = consumer.done() and len(snapshot) == len(collection.items)
+        except Exception as e:
+            return {
+                **state,
+                "error": f"Failed to collect trends: {str(e)}",
+                "stage": "error"
+            }
+        finally:
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+        
+        report = collection.report()
+        report["clustered_items"] = len(snapshot)
+        
+        # Canned data from a failed scan or LLM call must not be served to later requests
+        if (
+            vector is not None
+            and complete
+            and not clustered.get("error")
+            and not collection.used_fallback
+            and not any(trend.get("fallback") for trend in clustered["clustered_trends"])
+        ):
+            self.trend_cache.store(
+                make_key(request_text), request_text, vector,
+                {
+                    "raw_trends": collection.items,
+                    "clustered_trends": clustered["clustered_trends"],
+                    "collection_report": report
+                }
+            )
+        
+        if state.get("session_id"):
+            await self.acontext.store_message(
+                session_id=state["session_id"],
+                role="assistant",
+                content=f"Collected {len(collection.items)} trends from web scraping",
+                meta={"stage": "trends", "count": len(collection.items), "sources": report}
+            )
+        
+        return {
+            **clustered,
+            "raw_trends": collection.items,
+            "collection_report": report
+        }
+    
+    async def _generate_ideas(self, state: WorkflowState, prefetched: Optional[List[Dict[str, Any]]] = None) -> WorkflowState:
+        """Stage 3: Generate startup ideas using OpenAI + Acontext (prefetched: speculative result to use)"""
         selected_trend = state.get("selected_trend")
         user_context = state.get("user_context", {})
         
@@ -151,11 +336,10 @@ class StartupHunterWorkflow:
                 messages = await self.acontext.get_messages(state["session_id"], limit=20)
                 acontext_memory = self._format_acontext_memory(messages)
             
-            ideas = self.openai.generate_ideas(
-                selected_trend=selected_trend,
-                user_context=user_context,
-                acontext_memory=acontext_memory
-            )
+            if prefetched is not None:
+                ideas = prefetched
+            else:
+                ideas = await self._ideas_for(state, selected_trend, acontext_memory)
             
             if state.get("session_id"):
                 await self.acontext.store_message(
@@ -179,10 +363,44 @@ class StartupHunterWorkflow:
                 "stage": "error"
             }
     
-    async def _generate_proposal(self, state: WorkflowState) -> WorkflowState:
-        """Stage 4: Generate detailed proposal using OpenAI"""
+    async def _ideas_for(
+        self,
+        state: WorkflowState,
+        trend: Dict[str, Any],
+        acontext_memory: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Ideas for a trend from the semantic cache or OpenAI (no side effects on the session)"""
+        request_text = self._trend_request_text(trend, state.get("domain"))
+        # Ideas are personalised, so only requests with the same user context share them
+        context = make_key(state.get("user_context") or {}, acontext_memory or "")
+        hit, vector = await self._semantic_lookup(self.idea_cache, request_text, state, partition=context)
+        if hit:
+            return hit["value"]
+        
+        ideas = await self.openai.generate_ideas(
+            selected_trend=trend,
+            user_context=state.get("user_context", {}),
+            acontext_memory=acontext_memory,
+            regenerate=state.get("regenerate", False)
+        )
+        if vector is not None and ideas and not any(idea.get("fallback") for idea in ideas):
+            self.idea_cache.store(make_key(request_text, context), request_text, vector, ideas, partition=context)
+        return ideas
+    
+    async def _proposal_for(self, state: WorkflowState, idea: Dict[str, Any]) -> List[Dict[str, str]]:
+        generate = (
+            self.openai.generate_proposal_parallel if self.parallel_proposal
+            else self.openai.generate_proposal
+        )
+        return await generate(
+            selected_idea=idea,
+            trend_context=state.get("selected_trend") or {},
+            regenerate=state.get("regenerate", False)
+        )
+    
+    async def _generate_proposal(self, state: WorkflowState, prefetched: Optional[List[Dict[str, str]]] = None) -> WorkflowState:
+        """Stage 4: Generate detailed proposal using OpenAI (prefetched: speculative result to use)"""
         selected_idea = state.get("selected_idea")
-        selected_trend = state.get("selected_trend")
         
         if not selected_idea:
             return {
@@ -192,10 +410,7 @@ class StartupHunterWorkflow:
             }
         
         try:
-            proposal = self.openai.generate_proposal(
-                selected_idea=selected_idea,
-                trend_context=selected_trend or {}
-            )
+            proposal = prefetched if prefetched is not None else await self._proposal_for(state, selected_idea)
             
             if state.get("session_id"):
                 await self.acontext.store_message(
@@ -218,6 +433,96 @@ class StartupHunterWorkflow:
                 "stage": "error"
             }
     
+    async def stream_proposal(
+        self,
+        state: WorkflowState,
+        prefetched: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Stage 4, streamed: yield proposal sections as the model completes them
+        
+        state is updated in place once the proposal is complete, the same way
+        run_stage("generate_proposal") would update it. A prefetched
+        (speculative) proposal is yielded as is.
+        """
+        selected_idea = state.get("selected_idea")
+        if not selected_idea:
+            state.update({"error": "No idea selected", "stage": "error"})
+            return
+        
+        proposal = []
+        if prefetched is not None:
+            sections = prefetched
+        else:
+            sections = self.openai.stream_proposal(
+                selected_idea=selected_idea,
+                trend_context=state.get("selected_trend") or {},
+                regenerate=state.get("regenerate", False)
+            )
+        
+        if isinstance(sections, list):
+            for section in sections:
+                proposal.append(section)
+                yield section
+        else:
+            async for section in sections:
+                proposal.append(section)
+                yield section
+        
+        state.update({"proposal": proposal, "stage": "proposal_ready", "error": None})
+        
+        if state.get("session_id"):
+            await self.acontext.store_message(
+                session_id=state["session_id"],
+                role="assistant",
+                content=f"Generated {len(proposal)}-section proposal",
+                meta={"stage": "proposal", "idea": selected_idea}
+            )
+    
+    async def edit_idea(self, state: WorkflowState, changes: Dict[str, Any]) -> Tuple[WorkflowState, List[str]]:
+        """
+        Apply edits to the selected idea and update its proposal, rewriting
+        only the sections that depend on an edited field
+        
+        Returns:
+            (updated state, titles of the rewritten sections)
+        """
+        selected_idea = state.get("selected_idea")
+        if not selected_idea:
+            return {**state, "error": "No idea selected", "stage": "error"}, []
+        if not state.get("proposal"):
+            return {**state, "error": "No proposal available", "stage": "error"}, []
+        
+        idea = {**selected_idea, **changes}
+        try:
+            proposal, rewritten = await self.openai.regenerate_proposal_sections(
+                proposal=state["proposal"],
+                previous_idea=selected_idea,
+                selected_idea=idea,
+                trend_context=state.get("selected_trend") or {},
+                regenerate=state.get("regenerate", False)
+            )
+        except Exception as e:
+            return {**state, "error": f"Failed to update proposal: {str(e)}", "stage": "error"}, []
+        
+        if state.get("session_id"):
+            await self.acontext.store_message(
+                session_id=state["session_id"],
+                role="assistant",
+                content=f"Rewrote {len(rewritten)} of {len(proposal)} proposal sections after editing {', '.join(sorted(changes))}",
+                meta={"stage": "proposal", "idea": idea, "rewritten": rewritten}
+            )
+        
+        ideas = [idea if i.get("id") == idea.get("id") else i for i in state.get("ideas", [])]
+        return {
+            **state,
+            "selected_idea": idea,
+            "ideas": ideas,
+            "proposal": proposal,
+            "stage": "proposal_ready",
+            "error": None
+        }, rewritten
+    
     async def _build_mvp(self, state: WorkflowState) -> WorkflowState:
         proposal = state.get("proposal", [])
         
@@ -483,10 +788,145 @@ class StartupHunterWorkflow:
         
         return count
     
+    async def _semantic_lookup(
+        self,
+        cache: Optional[SemanticCache],
+        text: str,
+        state: WorkflowState,
+        partition: str = ""
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Look a request up in a semantic cache
+        
+        Returns the hit (or None) and the request's embedding so a miss can
+        be stored under it afterwards. Embedding failures and embeddings
+        slower than embed_timeout just skip the cache.
+        """
+        if cache is None:
+            return None, None
+        
+        try:
+            vector = await asyncio.wait_for(self.openai.embed(text), timeout=self.embed_timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Semantic cache skipped, embedding took over {self.embed_timeout}s")
+            return None, None
+        except Exception as e:
+            print(f"⚠️  Semantic cache skipped, embedding failed: {e}")
+            return None, None
+        
+        if state.get("regenerate"):
+            return None, vector
+        
+        hit = cache.lookup(vector, partition)
+        if hit:
+            print(f"♻️  Reusing result of \"{hit['text']}\" (similarity {hit['similarity']:.2f})")
+        return hit, vector
+    
+    def _trend_request_text(self, trend: Dict[str, Any], domain: Optional[str]) -> str:
+        """What a trend is about, as text to embed (ids and scores left out)"""
+        pain_points = "; ".join(str(p) for p in (trend.get("painPoints") or [])[:5])
+        return f"Domain: {normalize_domain(domain)}\nTrend: {trend.get('title', '')}\nPain points: {pain_points}"
+    
+    def speculate_ideas(self, scope: str, state: WorkflowState):
+        """Start generating ideas for the top trends in the background (no-op unless speculate)"""
+        if self.speculation is None or state.get("error"):
+            return
+        
+        snapshot = dict(state)
+        
+        async def ideas_for(trend):
+            acontext_memory = None
+            if snapshot.get("session_id"):
+                messages = await self.acontext.get_messages(snapshot["session_id"], limit=20)
+                acontext_memory = self._format_acontext_memory(messages)
+            return await self._ideas_for(snapshot, trend, acontext_memory)
+        
+        for trend in (state.get("clustered_trends") or [])[:self.speculate_top_k]:
+            self.speculation.start(scope, ("ideas", trend.get("id", "")), lambda trend=trend: ideas_for(trend))
+    
+    def speculate_proposal(self, scope: str, state: WorkflowState):
+        """Start generating the proposal of the recommended idea in the background"""
+        if self.speculation is None or state.get("error"):
+            return
+        
+        ideas = state.get("ideas") or []
+        idea = next((i for i in ideas if i.get("recommended")), ideas[0] if ideas else None)
+        if idea is None:
+            return
+        
+        snapshot = dict(state)
+        self.speculation.start(scope, ("proposal", idea.get("id", "")), lambda: self._proposal_for(snapshot, idea))
+    
+    async def claim_speculation(self, scope: str, stage: str, item_id: str) -> Optional[Any]:
+        """
+        Speculative result for the user's pick (None on a miss)
+        
+        Waits for it if still in flight and cancels the scope's other guesses.
+        """
+        if self.speculation is None:
+            return None
+        return await self.speculation.claim(scope, (stage, item_id))
+    
+    def cancel_speculation(self, scope: str):
+        if self.speculation is not None:
+            self.speculation.cancel(scope)
+    
+    def weights_for(self, tenant_id: Optional[str]) -> ScoringWeights:
+        """Scoring weights of a tenant (the default formula if it has none)"""
+        if not tenant_id:
+            return DEFAULT_WEIGHTS
+        stored = self.scoring_weights.get(tenant_id)
+        return ScoringWeights.from_dict(stored) if stored else DEFAULT_WEIGHTS
+    
+    def set_weights(self, tenant_id: str, weights: ScoringWeights):
+        self.scoring_weights.set(tenant_id, weights.to_dict())
+    
+    def rerank_trends(self, state: WorkflowState, weights: Optional[ScoringWeights] = None) -> List[Dict[str, Any]]:
+        """
+        Re-score and re-order the session's clustered trends without calling the LLM
+        
+        Uses the tenant's weights unless weights are given. Updates state in place.
+        """
+        weights = weights or self.weights_for(state.get("tenant_id"))
+        state["clustered_trends"] = rank_trends(state.get("clustered_trends") or [], weights)
+        return state["clustered_trends"]
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit rates of the LLM, SERP and semantic caches"""
+        return {
+            "llm": self.openai.cache_stats(),
+            "serp": self.brightdata.cache_stats(),
+            "semantic_trends": self.trend_cache.get_stats() if self.trend_cache is not None else {},
+            "semantic_ideas": self.idea_cache.get_stats() if self.idea_cache is not None else {},
+            "speculation": self.speculation.get_stats() if self.speculation is not None else {},
+            "llm_calls": self.openai.call_stats(),
+            "in_flight": {
+                "llm": self.openai.in_flight_stats(),
+                "brightdata": self.brightdata.in_flight_stats()
+            }
+        }
+    
+    async def aclose(self):
+        """Release pooled HTTP connections held by the integrations and write out queued cache rows"""
+        if self.speculation is not None:
+            self.speculation.cancel_all()
+        await self.brightdata.aclose()
+        if self.evidence_validator is not None:
+            await self.evidence_validator.aclose()
+        await close_shared_http_client()
+        
+        caches = [self.openai.cache, self.brightdata.cache, self.scoring_weights, self.trend_cache, self.idea_cache]
+        if self.evidence_validator is not None:
+            caches.append(self.evidence_validator.cache)
+        for cache in caches:
+            if cache is not None:
+                cache.flush()
+    
     async def run_stage(
         self,
         stage: str,
-        state: WorkflowState
+        state: WorkflowState,
+        prefetched: Optional[Any] = None
     ) -> WorkflowState:
         """
         Run a specific stage of the workflow
@@ -494,6 +934,7 @@ class StartupHunterWorkflow:
         Args:
             stage: Stage name (collect_trends, cluster_trends, generate_ideas, etc.)
             state: Current workflow state
+            prefetched: Speculative result for generate_ideas/generate_proposal
         
         Returns:
             Updated workflow state
@@ -502,10 +943,12 @@ class StartupHunterWorkflow:
             return await self._collect_trends(state)
         elif stage == "cluster_trends":
             return await self._cluster_trends(state)
+        elif stage == "collect_and_cluster":
+            return await self._collect_and_cluster(state)
         elif stage == "generate_ideas":
-            return await self._generate_ideas(state)
+            return await self._generate_ideas(state, prefetched)
         elif stage == "generate_proposal":
-            return await self._generate_proposal(state)
+            return await self._generate_proposal(state, prefetched)
         elif stage == "build_mvp":
             return await self._build_mvp(state)
         elif stage == "test_mvp":